@@ -1,44 +1,78 @@
 from __future__ import annotations
 
-from typing import Callable, Iterable
+from typing import Callable, Iterable, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from api.deps import DBSession  # se já existir, senão ajuste o import
+from api.deps import DBSession, AsyncDBSession  # se já existir, senão ajuste o import
 from config import JWT_SECRET_KEY, JWT_ALGORITHM
 from infra.models import UserORM, UserRole
+from services.auth_cache import AuthUser, USER_CACHE, remember_user
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = DBSession,
-) -> UserORM:
-    cred_exc = HTTPException(
+def _credentials_error() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Token inválido ou expirado.",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _claims(token: str) -> tuple[int, Optional[str], Optional[int]]:
+    """
+    (user_id, role, iat) de um JWT válido.
+    """
     try:
         payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
         sub = payload.get("sub")
         if not sub:
-            raise cred_exc
-        user_id = int(sub)
-    except (JWTError, ValueError):
-        raise cred_exc
+            raise _credentials_error()
+        iat = payload.get("iat")
+        return int(sub), payload.get("role"), int(iat) if iat is not None else None
+    except (JWTError, ValueError, TypeError):
+        raise _credentials_error()
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = DBSession,
+) -> AuthUser:
+    # cache/claim do token primeiro: a sessão só abre conexão se precisar ler
+    user_id, role, iat = _claims(token)
+    cached = USER_CACHE.lookup(user_id, role=role, issued_at=iat)
+    if cached is not None:
+        return cached
 
     user = db.get(UserORM, user_id)
     if not user:
-        raise cred_exc
-    return user
+        raise _credentials_error()
+    return remember_user(user)
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = AsyncDBSession,
+) -> AuthUser:
+    # mesma checagem, para os routers async (sem thread do threadpool)
+    user_id, role, iat = _claims(token)
+    cached = USER_CACHE.lookup(user_id, role=role, issued_at=iat)
+    if cached is not None:
+        return cached
+
+    user = await db.get(UserORM, user_id)
+    if not user:
+        raise _credentials_error()
+    return remember_user(user)
+
 
 def require_roles(*allowed: UserRole) -> Callable:
     allowed_set = set(allowed)
 
-    def dep(user: UserORM = Depends(get_current_user)) -> UserORM:
+    def dep(user: AuthUser = Depends(get_current_user)) -> AuthUser:
         if user.role not in allowed_set:
             raise HTTPException(status_code=403, detail="Sem permissão.")
         return user
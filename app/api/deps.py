@@ -1,5 +1,6 @@
 from fastapi import Depends
 from sqlalchemy.orm import Session
-from infra.db import get_db
+from infra.db import get_db, get_async_db
 
-DBSession = Depends(get_db)
\ No newline at end of file
+DBSession = Depends(get_db)
+AsyncDBSession = Depends(get_async_db)
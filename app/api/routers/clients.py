@@ -1,18 +1,22 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from typing import Optional
 
-from api.deps import DBSession
+from api.deps import DBSession, AsyncDBSession
 from infra.models import ClientORM
 from schemas.clients import ClientCreate, ClientUpdate, ClientOut
+from services.pagination import keyset_page, keyset_page_async, NEXT_CURSOR_HEADER
 
 from fastapi import Depends
-from api.auth_deps import get_current_user
+from api.auth_deps import get_current_user, get_current_user_async
 
 router = APIRouter(dependencies=[Depends(get_current_user)])
+# GETs async (DB_ASYNC_READS=1), montados antes do router sync no main
+async_router = APIRouter(dependencies=[Depends(get_current_user_async)])
 
 
 
@@ -48,13 +52,7 @@ def create_client(payload: ClientCreate, db: Session = DBSession):
     return client
 
 
-@router.get("", response_model=list[ClientOut])
-def list_clients(
-    db: Session = DBSession,
-    q: Optional[str] = Query(default=None, description="Busca por nome/telefone/cpf"),
-    limit: int = Query(default=50, ge=1, le=200),
-    offset: int = Query(default=0, ge=0),
-):
+def _list_stmt(q: Optional[str]):
     stmt = select(ClientORM).order_by(ClientORM.id.desc())
 
     if q:
@@ -67,9 +65,48 @@ def list_clients(
             (ClientORM.phone.ilike(f"%{q_phone}%")) |
             (ClientORM.cpf.ilike(f"%{q_cpf}%"))
         )
+    return stmt
+
+
+@router.get("", response_model=list[ClientOut])
+def list_clients(
+    response: Response,
+    db: Session = DBSession,
+    q: Optional[str] = Query(default=None, description="Busca por nome/telefone/cpf"),
+    limit: int = Query(default=50, ge=1, le=200),
+    offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="Cursor da página anterior (header X-Next-Cursor); ignora offset"),
+):
+    try:
+        clients, next_cursor = keyset_page(
+            db, _list_stmt(q), scope="clients", cols=[ClientORM.id],
+            limit=limit, cursor=cursor, offset=offset,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return clients
 
-    stmt = stmt.limit(limit).offset(offset)
-    clients = db.execute(stmt).scalars().all()
+
+@async_router.get("", response_model=list[ClientOut])
+async def list_clients_async(
+    response: Response,
+    db: AsyncSession = AsyncDBSession,
+    q: Optional[str] = Query(default=None, description="Busca por nome/telefone/cpf"),
+    limit: int = Query(default=50, ge=1, le=200),
+    offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="Cursor da página anterior (header X-Next-Cursor); ignora offset"),
+):
+    try:
+        clients, next_cursor = await keyset_page_async(
+            db, _list_stmt(q), scope="clients", cols=[ClientORM.id],
+            limit=limit, cursor=cursor, offset=offset,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return clients
 
 
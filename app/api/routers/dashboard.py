@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Depends
+from sqlalchemy.orm import Session
+
+from api.deps import DBSession
+from api.auth_deps import get_current_user
+from infra.models import UserRole
+from services.auth_cache import AuthUser
+from schemas.dashboard import DashboardSummaryOut
+from services.dashboard_service import dashboard_summary
+
+router = APIRouter(dependencies=[Depends(get_current_user)])
+
+
+@router.get("/summary", response_model=DashboardSummaryOut)
+def get_dashboard_summary(
+    db: Session = DBSession,
+    user: AuthUser = Depends(get_current_user),
+    date_from: Optional[date] = Query(default=None),
+    date_to: Optional[date] = Query(default=None),
+):
+    try:
+        return dashboard_summary(
+            db,
+            date_from=date_from,
+            date_to=date_to,
+            include_finance=(user.role == UserRole.ADMIN),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,15 +1,15 @@
 from __future__ import annotations
 
-from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Response
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from api.deps import DBSession
-from infra.models import FinanceORM, FinanceStatus, WppSendStatus
+from infra.models import FinanceORM, FinanceStatus
 from schemas.finance import FinanceCreate, FinanceUpdate, FinancePay, FinanceOut
+from services.pagination import keyset_page, NEXT_CURSOR_HEADER
 from api.auth_deps import require_roles
 from infra.models import UserRole
 from fastapi import Depends
@@ -37,11 +37,6 @@ def create_finance(
         status=status,
         description=payload.description,
         notes=payload.notes,
-        wpp_status=WppSendStatus.PENDING,
-        wpp_tries=0,
-        wpp_last_error=None,
-        wpp_sent_at=None,
-        wpp_next_retry_at=None,
     )
     db.add(row)
     db.flush()
@@ -50,14 +45,20 @@ def create_finance(
 
 @router.get("", response_model=list[FinanceOut])
 def list_finance(
+    response: Response,
     db: Session = DBSession,
     _user = Depends(require_roles(UserRole.ADMIN)),
     status: Optional[str] = Query(default=None, description="PENDING|PAID|CANCELED"),
     company: Optional[str] = Query(default=None),
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="Cursor da página anterior (header X-Next-Cursor); ignora offset"),
 ):
-    stmt = select(FinanceORM).order_by(FinanceORM.due_date.asc(), FinanceORM.id.asc())
+    stmt = (
+        select(FinanceORM)
+        .options(selectinload(FinanceORM.reminder))
+        .order_by(FinanceORM.due_date.asc(), FinanceORM.id.asc())
+    )
 
     if status:
         try:
@@ -69,8 +70,16 @@ def list_finance(
     if company:
         stmt = stmt.where(FinanceORM.company.ilike(f"%{company}%"))
 
-    stmt = stmt.limit(limit).offset(offset)
-    return db.execute(stmt).scalars().all()
+    try:
+        items, next_cursor = keyset_page(
+            db, stmt, scope="finance", cols=[FinanceORM.due_date, FinanceORM.id],
+            limit=limit, cursor=cursor, offset=offset, desc=False,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return items
 
 
 @router.get("/{finance_id}", response_model=FinanceOut)
@@ -114,13 +123,9 @@ def pay_finance(finance_id: int, payload: FinancePay, db: Session = DBSession, _
     if not row:
         raise HTTPException(status_code=404, detail="Finance não encontrado.")
 
-    # marca como pago
+    # marca como pago: a API passa a mostrar wpp_status=SENT, e o lembrete
+    # que ainda não saiu é cancelado na fila pelo worker
     row.status = FinanceStatus.PAID
 
-    row.wpp_status = WppSendStatus.SENT
-    row.wpp_sent_at = payload.paid_at or datetime.utcnow()
-    row.wpp_next_retry_at = None
-    row.wpp_last_error = None
-
     db.flush()
     return row
\ No newline at end of file
@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from fastapi import APIRouter
+
+from infra.db import engine, REPLICA
+from infra.pool import pool_stats
+
+router = APIRouter()
+
+
+@router.get("/db")
+def db_pool():
+    # sem auth: para o monitoramento (só contadores do pool, nada do banco)
+    return {**pool_stats(engine), "replica": REPLICA.stats()}
@@ -1,29 +1,202 @@
 from __future__ import annotations
-from fastapi import APIRouter, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import select
+from datetime import date, datetime
 from typing import Optional
 
-from api.deps import DBSession
-from infra.models import InstallmentORM
-from schemas.installments import InstallmentOut, InstallmentPay
+from api.deps import DBSession, AsyncDBSession
+from infra.models import InstallmentORM, InstallmentStatus, PromissoryORM, SaleORM
+from schemas.installments import InstallmentOut, InstallmentPay, InstallmentExpandedOut
 from services.sales_service import pay_installment
+from services.pagination import keyset_page, keyset_page_async, NEXT_CURSOR_HEADER
 
 from fastapi import Depends
-from api.auth_deps import get_current_user
+from api.auth_deps import get_current_user, get_current_user_async
 
 router = APIRouter(dependencies=[Depends(get_current_user)])
+# GETs async (DB_ASYNC_READS=1), montados antes do router sync no main
+async_router = APIRouter(dependencies=[Depends(get_current_user_async)])
 
+INCLUDE_OPTIONS = {"promissory", "client", "product"}
 
-@router.get("", response_model=list[InstallmentOut])
+# ordem -> (colunas da chave, desc por coluna)
+ORDERINGS = {
+    "promissory": ((InstallmentORM.promissory_id, InstallmentORM.number), (True, False)),
+    # janelas de vencimento: segue ix_installments_due (due_date, status)
+    "due_date": ((InstallmentORM.due_date, InstallmentORM.id), (False, False)),
+}
+ORDER_PATTERN = "^(" + "|".join(ORDERINGS) + ")$"
+# página quando só o cursor vem; sem limit nem cursor a lista sai inteira
+# (como antes da paginação: o front pede todas as parcelas da promissória)
+DEFAULT_PAGE_LIMIT = 200
+
+
+def _parse_include(include: Optional[str]) -> set[str]:
+    if not include:
+        return set()
+    parts = {p.strip().lower() for p in include.split(",") if p.strip()}
+    invalid = parts - INCLUDE_OPTIONS
+    if invalid:
+        raise HTTPException(status_code=422, detail=f"include inválido: {', '.join(sorted(invalid))}.")
+    return parts
+
+
+def _expand(inst: InstallmentORM, include: set[str]) -> InstallmentExpandedOut:
+    data = InstallmentOut.model_validate(inst).model_dump()
+    if not include:
+        return InstallmentExpandedOut(**data)
+
+    prom = inst.promissory
+    if "promissory" in include:
+        data["promissory"] = prom
+    if "client" in include:
+        data["client"] = prom.client if prom else None
+    if "product" in include:
+        product = None
+        if prom is not None:
+            product = prom.product
+            if product is None and prom.sale is not None:
+                product = prom.sale.product
+        data["product"] = product
+    return InstallmentExpandedOut(**data)
+
+
+def _list_stmt(
+    *,
+    promissory_id: Optional[int],
+    client_id: Optional[int],
+    status: Optional[InstallmentStatus],
+    due_from: Optional[date],
+    due_to: Optional[date],
+    overdue: bool,
+    inc: set[str],
+    order: str,
+):
+    if order not in ORDERINGS:
+        raise HTTPException(status_code=422, detail="order inválido (promissory|due_date).")
+    cols, desc = ORDERINGS[order]
+
+    stmt = select(InstallmentORM).order_by(
+        *[c.desc() if d else c.asc() for c, d in zip(cols, desc)]
+    )
+
+    if promissory_id is not None:
+        stmt = stmt.where(InstallmentORM.promissory_id == promissory_id)
+
+    if client_id is not None:
+        stmt = stmt.join(PromissoryORM, PromissoryORM.id == InstallmentORM.promissory_id).where(
+            PromissoryORM.client_id == client_id
+        )
+
+    if status is not None:
+        stmt = stmt.where(InstallmentORM.status == status)
+
+    if due_from is not None:
+        stmt = stmt.where(InstallmentORM.due_date >= due_from)
+    if due_to is not None:
+        stmt = stmt.where(InstallmentORM.due_date <= due_to)
+
+    if overdue:
+        stmt = stmt.where(
+            InstallmentORM.due_date < datetime.utcnow().date(),
+            InstallmentORM.status == InstallmentStatus.PENDING,
+        )
+
+    # expansões carregadas em lote (1 query por relação, sem N+1; no
+    # AsyncSession não existe lazy load, então isso é obrigatório lá)
+    if inc:
+        opts = [selectinload(InstallmentORM.promissory)]
+        if "client" in inc:
+            opts.append(selectinload(InstallmentORM.promissory).selectinload(PromissoryORM.client))
+        if "product" in inc:
+            opts.append(selectinload(InstallmentORM.promissory).selectinload(PromissoryORM.product))
+            opts.append(
+                selectinload(InstallmentORM.promissory)
+                .selectinload(PromissoryORM.sale)
+                .selectinload(SaleORM.product)
+            )
+        stmt = stmt.options(*opts)
+
+    return stmt, cols, desc
+
+
+@router.get("", response_model=list[InstallmentExpandedOut], response_model_exclude_unset=True)
 def list_installments(
+    response: Response,
     db: Session = DBSession,
     promissory_id: Optional[int] = Query(default=None),
+    client_id: Optional[int] = Query(default=None),
+    status: Optional[InstallmentStatus] = Query(default=None, description="PENDING|PAID|CANCELED"),
+    due_from: Optional[date] = Query(default=None),
+    due_to: Optional[date] = Query(default=None),
+    overdue: bool = Query(default=False, description="Só PENDING com vencimento antes de hoje"),
+    include: Optional[str] = Query(default=None, description="promissory,client,product"),
+    order: str = Query(default="promissory", pattern=ORDER_PATTERN, description="promissory|due_date"),
+    limit: Optional[int] = Query(default=None, ge=1, le=1000, description="Sem limit nem cursor: todas"),
+    offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="Cursor da página anterior (header X-Next-Cursor); ignora offset"),
 ):
-    stmt = select(InstallmentORM).order_by(InstallmentORM.promissory_id.desc(), InstallmentORM.number.asc())
-    if promissory_id is not None:
-        stmt = stmt.where(InstallmentORM.promissory_id == promissory_id)
-    return db.execute(stmt).scalars().all()
+    inc = _parse_include(include)
+    stmt, cols, desc = _list_stmt(
+        promissory_id=promissory_id, client_id=client_id, status=status,
+        due_from=due_from, due_to=due_to, overdue=overdue, inc=inc, order=order,
+    )
+
+    if limit is None and cursor is None:
+        return [_expand(i, inc) for i in db.execute(stmt.offset(offset)).scalars().all()]
+
+    try:
+        items, next_cursor = keyset_page(
+            db, stmt, scope=f"installments:{order}", cols=cols,
+            limit=limit or DEFAULT_PAGE_LIMIT, cursor=cursor, offset=offset, desc=desc,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    return [_expand(i, inc) for i in items]
+
+
+@async_router.get("", response_model=list[InstallmentExpandedOut], response_model_exclude_unset=True)
+async def list_installments_async(
+    response: Response,
+    db: AsyncSession = AsyncDBSession,
+    promissory_id: Optional[int] = Query(default=None),
+    client_id: Optional[int] = Query(default=None),
+    status: Optional[InstallmentStatus] = Query(default=None, description="PENDING|PAID|CANCELED"),
+    due_from: Optional[date] = Query(default=None),
+    due_to: Optional[date] = Query(default=None),
+    overdue: bool = Query(default=False, description="Só PENDING com vencimento antes de hoje"),
+    include: Optional[str] = Query(default=None, description="promissory,client,product"),
+    order: str = Query(default="promissory", pattern=ORDER_PATTERN, description="promissory|due_date"),
+    limit: Optional[int] = Query(default=None, ge=1, le=1000, description="Sem limit nem cursor: todas"),
+    offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="Cursor da página anterior (header X-Next-Cursor); ignora offset"),
+):
+    inc = _parse_include(include)
+    stmt, cols, desc = _list_stmt(
+        promissory_id=promissory_id, client_id=client_id, status=status,
+        due_from=due_from, due_to=due_to, overdue=overdue, inc=inc, order=order,
+    )
+
+    if limit is None and cursor is None:
+        return [_expand(i, inc) for i in (await db.execute(stmt.offset(offset))).scalars().all()]
+
+    try:
+        items, next_cursor = await keyset_page_async(
+            db, stmt, scope=f"installments:{order}", cols=cols,
+            limit=limit or DEFAULT_PAGE_LIMIT, cursor=cursor, offset=offset, desc=desc,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    return [_expand(i, inc) for i in items]
+
 
 @router.post("/{inst_id}/pay", response_model=InstallmentOut)
 def pay(inst_id: int, payload: InstallmentPay, db: Session = DBSession):
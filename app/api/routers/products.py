@@ -1,22 +1,31 @@
 from __future__ import annotations
 
+import os
+import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
 from decimal import Decimal
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Query, UploadFile, File, Form, Depends
+from fastapi import APIRouter, HTTPException, Query, UploadFile, File, Form, Depends, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
-from api.deps import DBSession
-from api.auth_deps import get_current_user
+from api.deps import DBSession, AsyncDBSession
+from api.auth_deps import get_current_user, get_current_user_async
 
 from infra.models import ProductORM, ProductStatus, ProductImageORM
 from schemas.products import ProductUpdate, ProductOut
+from services.pagination import keyset_page, keyset_page_async, NEXT_CURSOR_HEADER
 
+from services.image_pipeline import build_variants
 from infra.storage import (
+    put_fileobj,
     put_bytes,
+    variant_key,
     delete_object,
     presign_get_url,
     make_image_key,
@@ -24,9 +33,17 @@ from infra.storage import (
 )
 
 router = APIRouter(dependencies=[Depends(get_current_user)])
+# GETs async (DB_ASYNC_READS=1), montados antes do router sync no main
+async_router = APIRouter(dependencies=[Depends(get_current_user_async)])
 
 ALLOWED_CT = {"image/jpeg", "image/png", "image/webp"}
 
+# pool compartilhado: limita uploads simultâneos no processo todo
+_UPLOAD_POOL = ThreadPoolExecutor(
+    max_workers=int(os.getenv("UPLOAD_MAX_WORKERS", "8")),
+    thread_name_prefix="upload",
+)
+
 
 def normalize_plate(plate: str) -> str:
     return plate.strip().upper().replace("-", "").replace(" ", "")
@@ -50,33 +67,161 @@ def _safe_ext(upload: UploadFile) -> str:
 def _presign_images(product: ProductORM, expires_seconds: int) -> None:
     """
     product.images[].url no DB guarda a KEY (ex: "products/12/abc.jpg").
-    Aqui convertemos para URL assinada na resposta, sem salvar no DB.
+    Aqui convertemos para URL assinada na resposta, sem salvar no DB
+    (set_committed_value não marca o objeto como alterado, então o commit
+    do get_db não grava a URL assinada no lugar da KEY).
     """
     if not getattr(product, "images", None):
         return
     for im in product.images:
-        ref = (im.url or "").strip()
-        if not ref:
-            continue
-        # se já for http(s), mantém (compatibilidade)
-        if ref.startswith("http://") or ref.startswith("https://"):
-            continue
-        im.url = presign_get_url(ref, expires_seconds=expires_seconds)
+        for attr in ("url", "thumb_url", "medium_url"):
+            ref = (getattr(im, attr, None) or "").strip()
+            if not ref:
+                continue
+            # se já for http(s), mantém (compatibilidade)
+            if ref.startswith("http://") or ref.startswith("https://"):
+                continue
+            set_committed_value(im, attr, presign_get_url(ref, expires_seconds=expires_seconds))
 
 
-@router.get("/{product_id}", response_model=ProductOut)
-def get_product(product_id: int, db: Session = DBSession):
-    stmt = (
+def _file_size(f) -> int:
+    f.seek(0, os.SEEK_END)
+    size = f.tell()
+    f.seek(0)
+    return size
+
+
+def _store_image(img: UploadFile, key: str, uploaded_keys: list[str], abort: threading.Event) -> dict[str, Optional[str]]:
+    """
+    Sobe a original e as variantes (thumb/medium/offer).
+    Falha nas variantes não derruba o cadastro: fica só a original
+    e o front/worker caem para ela.
+    Cada key enviada entra em uploaded_keys na hora (o chamador limpa o
+    bucket se o cadastro falhar); com `abort` setado para no próximo passo.
+    """
+    stored: dict[str, Optional[str]] = {}
+    if abort.is_set():
+        return stored
+
+    stored["url"] = put_fileobj(
+        fileobj=img.file,
+        content_type=(img.content_type or "application/octet-stream"),
+        key=key,
+    )
+    uploaded_keys.append(stored["url"])
+
+    if abort.is_set():
+        return stored
+    try:
+        variants = build_variants(img.file)
+    except Exception as e:
+        print(f"[products] variantes não geradas para {key}: {e}")
+        return stored
+
+    for name, v in variants.items():
+        if abort.is_set():
+            return stored
+        try:
+            stored[f"{name}_url"] = put_bytes(
+                content=v.content,
+                content_type=v.content_type,
+                key=variant_key(key, name, v.ext),
+            )
+            uploaded_keys.append(stored[f"{name}_url"])
+        except Exception as e:
+            print(f"[products] falha ao enviar variante {name} de {key}: {e}")
+    return stored
+
+
+def _upload_images(jobs: list[tuple[UploadFile, str]], uploaded_keys: list[str]) -> list[dict]:
+    """
+    Sobe as imagens em paralelo (streaming do arquivo temporário do upload)
+    com prazo total UPLOAD_DEADLINE_SECONDS. Toda key enviada vai para
+    uploaded_keys, para o chamador limpar o bucket se algo falhar.
+    Retorna, na ordem de jobs, as keys de cada imagem (original + variantes).
+
+    No timeout, cancela o que não começou e espera até
+    UPLOAD_ABORT_GRACE_SECONDS os uploads em andamento pararem no próximo
+    passo. Um PUT que ainda não voltou não segura o 504: as keys que ele
+    subir depois são apagadas em background quando ele terminar.
+    """
+    deadline = float(os.getenv("UPLOAD_DEADLINE_SECONDS", "30"))
+    grace = float(os.getenv("UPLOAD_ABORT_GRACE_SECONDS", "2"))
+
+    abort = threading.Event()
+    futures = [_UPLOAD_POOL.submit(_store_image, img, key, uploaded_keys, abort) for img, key in jobs]
+    _, pending = wait(futures, timeout=deadline)
+
+    if pending:
+        abort.set()
+        for fut in pending:
+            fut.cancel()
+        _, late = wait(pending, timeout=grace)
+        if late:
+            # o chamador apaga o que já está em uploaded_keys; o resto fica aqui
+            _cleanup_late_uploads(late, uploaded_keys, start=len(uploaded_keys))
+        raise HTTPException(status_code=504, detail="Tempo esgotado ao enviar imagens.")
+
+    for fut in futures:
+        if fut.exception() is not None:
+            raise fut.exception()
+
+    return [fut.result() for fut in futures]
+
+
+def _cleanup_late_uploads(late, uploaded_keys: list[str], *, start: int) -> None:
+    """
+    Quando o último upload atrasado terminar (na thread dele), apaga as keys
+    que entraram em uploaded_keys a partir de `start`.
+    """
+    lock = threading.Lock()
+    remaining = [len(late)]
+
+    def _done(_fut) -> None:
+        with lock:
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+        for k in uploaded_keys[start:]:
+            try:
+                delete_object(k)
+            except Exception as e:
+                print(f"[products] falha ao limpar upload atrasado {k}: {e}")
+
+    for fut in late:
+        fut.add_done_callback(_done)
+
+
+def _product_stmt(product_id: int):
+    return (
         select(ProductORM)
         .options(selectinload(ProductORM.images))
         .where(ProductORM.id == product_id)
     )
-    product = db.execute(stmt).scalars().first()
+
+
+def _presign_expires() -> int:
+    return int(os.getenv("S3_PRESIGN_EXPIRES_SECONDS", "3600"))
+
+
+@router.get("/{product_id}", response_model=ProductOut)
+def get_product(product_id: int, db: Session = DBSession):
+    product = db.execute(_product_stmt(product_id)).scalars().first()
     if not product:
         raise HTTPException(status_code=404, detail="Produto não encontrado.")
 
-    expires = int((__import__("os").getenv("S3_PRESIGN_EXPIRES_SECONDS", "3600")))
-    _presign_images(product, expires_seconds=expires)
+    _presign_images(product, expires_seconds=_presign_expires())
+    return product
+
+
+@async_router.get("/{product_id}", response_model=ProductOut)
+async def get_product_async(product_id: int, db: AsyncSession = AsyncDBSession):
+    product = (await db.execute(_product_stmt(product_id))).scalars().first()
+    if not product:
+        raise HTTPException(status_code=404, detail="Produto não encontrado.")
+
+    # presign é só assinatura local (cache em memória), não bloqueia em rede
+    _presign_images(product, expires_seconds=_presign_expires())
     return product
 
 
@@ -223,29 +368,29 @@ def create_product(
     uploaded_keys: list[str] = []
 
     try:
-        # ✅ upload bucket + salva KEY no DB
-        for idx, img in enumerate(images, start=1):
+        # valida tudo antes de subir qualquer arquivo
+        jobs: list[tuple[UploadFile, str]] = []
+        for img in images:
             ext = _safe_ext(img)
             if not ext:
                 raise HTTPException(status_code=415, detail="Extensão inválida para imagem.")
 
-            filename = random_filename(ext)
-            key = make_image_key(product.id, filename)
-
-            content = img.file.read()
-            if not content:
+            if _file_size(img.file) == 0:
                 raise HTTPException(status_code=422, detail="Arquivo de imagem vazio.")
 
-            stored_key = put_bytes(
-                content=content,
-                content_type=(img.content_type or "application/octet-stream"),
-                key=key,
-            )
-            uploaded_keys.append(stored_key)
+            filename = random_filename(ext)
+            jobs.append((img, make_image_key(product.id, filename)))
+
+        # ✅ upload bucket (em paralelo) + salva KEYs no DB
+        stored = _upload_images(jobs, uploaded_keys)
 
+        for idx, keys in enumerate(stored, start=1):
             db.add(ProductImageORM(
                 product_id=product.id,
-                url=stored_key,   # ✅ DB guarda KEY
+                url=keys["url"],   # ✅ DB guarda KEY
+                thumb_url=keys.get("thumb_url"),
+                medium_url=keys.get("medium_url"),
+                offer_url=keys.get("offer_url"),
                 position=idx,
             ))
 
@@ -282,14 +427,7 @@ def create_product(
         raise HTTPException(status_code=500, detail="Erro ao salvar produto/imagens.")
 
 
-@router.get("", response_model=list[ProductOut])
-def list_products(
-    db: Session = DBSession,
-    q: Optional[str] = Query(default=None, description="Busca por marca/modelo/placa/chassi"),
-    status: Optional[str] = Query(default=None, description="IN_STOCK|RESERVED|SOLD"),
-    limit: int = Query(default=50, ge=1, le=200),
-    offset: int = Query(default=0, ge=0),
-):
+def _list_stmt(q: Optional[str], status: Optional[str]):
     stmt = (
         select(ProductORM)
         .options(selectinload(ProductORM.images))
@@ -314,11 +452,57 @@ def list_products(
             (ProductORM.plate.ilike(f"%{qp}%")) |
             (ProductORM.chassi.ilike(f"%{qc}%"))
         )
+    return stmt
 
-    stmt = stmt.limit(limit).offset(offset)
-    products = db.execute(stmt).scalars().all()
 
-    expires = int((__import__("os").getenv("S3_PRESIGN_EXPIRES_SECONDS", "3600")))
+@router.get("", response_model=list[ProductOut])
+def list_products(
+    response: Response,
+    db: Session = DBSession,
+    q: Optional[str] = Query(default=None, description="Busca por marca/modelo/placa/chassi"),
+    status: Optional[str] = Query(default=None, description="IN_STOCK|RESERVED|SOLD"),
+    limit: int = Query(default=50, ge=1, le=200),
+    offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="Cursor da página anterior (header X-Next-Cursor); ignora offset"),
+):
+    try:
+        products, next_cursor = keyset_page(
+            db, _list_stmt(q, status), scope="products", cols=[ProductORM.id],
+            limit=limit, cursor=cursor, offset=offset,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    expires = _presign_expires()
+    for p in products:
+        _presign_images(p, expires_seconds=expires)
+
+    return products
+
+
+@async_router.get("", response_model=list[ProductOut])
+async def list_products_async(
+    response: Response,
+    db: AsyncSession = AsyncDBSession,
+    q: Optional[str] = Query(default=None, description="Busca por marca/modelo/placa/chassi"),
+    status: Optional[str] = Query(default=None, description="IN_STOCK|RESERVED|SOLD"),
+    limit: int = Query(default=50, ge=1, le=200),
+    offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="Cursor da página anterior (header X-Next-Cursor); ignora offset"),
+):
+    try:
+        products, next_cursor = await keyset_page_async(
+            db, _list_stmt(q, status), scope="products", cols=[ProductORM.id],
+            limit=limit, cursor=cursor, offset=offset,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    expires = _presign_expires()
     for p in products:
         _presign_images(p, expires_seconds=expires)
 
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from typing import Optional
@@ -8,6 +8,7 @@ from api.deps import DBSession
 from infra.models import PromissoryORM, PromissoryStatus
 from schemas.promissories import PromissoryOut
 from services.sales_service import issue_promissory, cancel_promissory
+from services.pagination import keyset_page, NEXT_CURSOR_HEADER
 
 from fastapi import Depends
 from api.auth_deps import get_current_user
@@ -17,10 +18,12 @@ router = APIRouter(dependencies=[Depends(get_current_user)])
 
 @router.get("", response_model=list[PromissoryOut])
 def list_promissories(
+    response: Response,
     db: Session = DBSession,
     status: Optional[str] = Query(default=None, description="DRAFT|ISSUED|CANCELED|PAID"),
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="Cursor da página anterior (header X-Next-Cursor); ignora offset"),
 ):
     stmt = select(PromissoryORM).order_by(PromissoryORM.id.desc())
     if status:
@@ -29,8 +32,16 @@ def list_promissories(
         except Exception:
             raise HTTPException(status_code=400, detail="Status inválido.")
         stmt = stmt.where(PromissoryORM.status == st)
-    stmt = stmt.limit(limit).offset(offset)
-    return db.execute(stmt).scalars().all()
+    try:
+        items, next_cursor = keyset_page(
+            db, stmt, scope="promissories", cols=[PromissoryORM.id],
+            limit=limit, cursor=cursor, offset=offset,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return items
 
 @router.get("/{prom_id}", response_model=PromissoryOut)
 def get_promissory(prom_id: int, db: Session = DBSession):
@@ -1,19 +1,22 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import date
 from typing import Optional
-from api.deps import DBSession
+from api.deps import DBSession, AsyncDBSession
 from schemas.sales import SaleCreate, SaleOut, SaleStatusUpdate
 from schemas.promissories import PromissoryOut
-from services.sales_service import create_sale, list_sales, update_sale_status
+from services.sales_service import create_sale, list_sales, list_sales_async, update_sale_status
 from infra.models import PaymentType
 
 from fastapi import Depends
-from api.auth_deps import get_current_user
+from api.auth_deps import get_current_user, get_current_user_async
 
 router = APIRouter(dependencies=[Depends(get_current_user)])
+# GETs async (DB_ASYNC_READS=1), montados antes do router sync no main
+async_router = APIRouter(dependencies=[Depends(get_current_user_async)])
 
 
 @router.patch("/{sale_id}/status", response_model=SaleOut)
@@ -51,6 +54,25 @@ def create_sale_endpoint(payload: SaleCreate, db: Session = DBSession):
     if prom:
         resp["promissory"] = PromissoryOut.model_validate(prom)
     return resp
+
+
+def _payment_type(payment_type: Optional[str]) -> Optional[PaymentType]:
+    try:
+        return PaymentType(payment_type) if payment_type is not None else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _sales_response(items, total, next_cursor, page: int, page_size: int) -> dict:
+    return {
+        "items": [SaleOut.model_validate(s) for s in items],
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "next_cursor": next_cursor,
+    }
+
+
 @router.get("", response_model=dict)
 def list_sales_endpoint(
     db: Session = DBSession,
@@ -62,27 +84,58 @@ def list_sales_endpoint(
     payment_type: Optional[str] = Query(None),
     date_from: Optional[date] = Query(None),
     date_to: Optional[date] = Query(None),
+    cursor: Optional[str] = Query(None, description="next_cursor da página anterior; ignora page"),
+    include_total: bool = Query(True, description="False pula o COUNT(*)"),
 ):
     try:
-        pt = PaymentType(payment_type) if payment_type is not None else None
+        items, total, next_cursor = list_sales(
+            db,
+            page=page,
+            page_size=page_size,
+            client_id=client_id,
+            user_id=user_id,
+            product_id=product_id,
+            payment_type=_payment_type(payment_type),
+            date_from=date_from,
+            date_to=date_to,
+            cursor=cursor,
+            include_total=include_total,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return _sales_response(items, total, next_cursor, page, page_size)
+
 
-        items, total = list_sales(
+@async_router.get("", response_model=dict)
+async def list_sales_endpoint_async(
+    db: AsyncSession = AsyncDBSession,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=200),
+    client_id: Optional[int] = Query(None),
+    user_id: Optional[int] = Query(None),
+    product_id: Optional[int] = Query(None),
+    payment_type: Optional[str] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    cursor: Optional[str] = Query(None, description="next_cursor da página anterior; ignora page"),
+    include_total: bool = Query(True, description="False pula o COUNT(*)"),
+):
+    try:
+        items, total, next_cursor = await list_sales_async(
             db,
             page=page,
             page_size=page_size,
             client_id=client_id,
             user_id=user_id,
             product_id=product_id,
-            payment_type=pt,
+            payment_type=_payment_type(payment_type),
             date_from=date_from,
             date_to=date_to,
+            cursor=cursor,
+            include_total=include_total,
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    return {
-        "items": [SaleOut.model_validate(s) for s in items],
-        "total": total,
-        "page": page,
-        "page_size": page_size,
-    }
\ No newline at end of file
+    return _sales_response(items, total, next_cursor, page, page_size)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from typing import Optional
@@ -9,6 +9,8 @@ from api.deps import DBSession
 from infra.models import UserORM, UserRole
 from schemas.users import UserCreate, UserOut
 from services.security import hash_password
+from services.auth_cache import invalidate_user
+from services.pagination import keyset_page, NEXT_CURSOR_HEADER
 
 from api.auth_deps import get_current_user
 
@@ -32,15 +34,20 @@ def create_user(payload: UserCreate, db: Session = DBSession):
     )
     db.add(user)
     db.flush()
+    # id novo, mas um token antigo com esse id (usuário removido) não pode
+    # valer pelo claim/cache
+    invalidate_user(user.id)
     return user
 
 
 @router.get("", response_model=list[UserOut])
 def list_users(
+    response: Response,
     db: Session = DBSession,
     q: Optional[str] = Query(default=None, description="Busca por nome ou email"),
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="Cursor da página anterior (header X-Next-Cursor); ignora offset"),
 ):
     stmt = select(UserORM).order_by(UserORM.id.desc())
 
@@ -51,5 +58,13 @@ def list_users(
             (UserORM.email.ilike(f"%{qn}%"))
         )
 
-    stmt = stmt.limit(limit).offset(offset)
-    return db.execute(stmt).scalars().all()
\ No newline at end of file
+    try:
+        items, next_cursor = keyset_page(
+            db, stmt, scope="users", cols=[UserORM.id],
+            limit=limit, cursor=cursor, offset=offset,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return items
@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Optional
 import os
 
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "change-me")
@@ -7,6 +8,8 @@ JWT_EXPIRES_MINUTES = int(os.getenv("JWT_EXPIRES_MINUTES", "60"))
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    # réplica de leitura (opcional): GETs e relatórios, ver infra/replica.py
+    DATABASE_READ_URL: Optional[str] = None
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -1,17 +1,27 @@
 from __future__ import annotations
 
-from typing import Generator
+import os
+import threading
+from typing import AsyncGenerator, Generator, Optional
 
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 
 from config import settings
+from infra.notify import register_wakeup_notifications
+from infra.pool import engine_options, install_transaction_timeouts
+from infra.replica import ReplicaHealth, RoutingSession
 
+# pool/timeouts por env (ver infra/pool.py)
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True,
-    future=True
+    future=True,
+    **engine_options(settings.DATABASE_URL),
 )
+install_transaction_timeouts(engine)
 
 # session factory
 SessionLocal = sessionmaker(
@@ -22,13 +32,150 @@ SessionLocal = sessionmaker(
     class_=Session,
 )
 
-def get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
+# réplica de leitura (DATABASE_READ_URL): mesmo pool/timeouts do primário
+replica_engine = None
+if settings.DATABASE_READ_URL:
+    replica_engine = create_engine(
+        settings.DATABASE_READ_URL,
+        future=True,
+        **engine_options(settings.DATABASE_READ_URL),
+    )
+    install_transaction_timeouts(replica_engine)
+
+REPLICA = ReplicaHealth(replica_engine)
+
+# sessão dos GETs: no Postgres a transação abre como BEGIN READ ONLY (o
+# driver marca a conexão no checkout, sem SET TRANSACTION a mais) e
+# qualquer escrita vira erro. Vai para a réplica quando ela está em dia
+read_engine = engine.execution_options(postgresql_readonly=True)
+
+ReadSessionLocal = sessionmaker(
+    autoflush=False,
+    autocommit=False,
+    expire_on_commit=False,
+    class_=RoutingSession,
+    primary=read_engine,
+    replica=replica_engine.execution_options(postgresql_readonly=True) if replica_engine is not None else None,
+    health=REPLICA,
+)
+
+# NOTIFY para o worker quando finance/installments/sales mudam (só Postgres)
+register_wakeup_notifications(SessionLocal)
+
+READ_ONLY_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+_WROTE = "db_wrote"
+
+
+def track_writes(session_factory) -> None:
+    """
+    Marca session.info[_WROTE] quando a sessão grava algo (flush ou
+    insert/update/delete/text direto), para o get_db só commitar quando
+    precisa.
+    """
+    @event.listens_for(session_factory, "after_flush")
+    def _after_flush(session, flush_context) -> None:
+        session.info[_WROTE] = True
+
+    @event.listens_for(session_factory, "do_orm_execute")
+    def _on_execute(state) -> None:
+        # text()/DML contam como escrita; só SELECT não
+        if not state.is_select:
+            state.session.info[_WROTE] = True
+
+
+track_writes(SessionLocal)
+
+
+def needs_commit(db: Session) -> bool:
+    return bool(db.new or db.dirty or db.deleted or db.info.get(_WROTE))
+
+
+def read_session(*, max_lag_seconds: Optional[float] = None) -> Session:
+    """
+    Sessão só leitura fora da API (relatórios, worker). max_lag_seconds
+    troca a tolerância de atraso da réplica (padrão: a dos GETs).
+    """
+    return ReadSessionLocal(max_lag_seconds=max_lag_seconds)
+
+
+def get_db(request: Request) -> Generator[Session, None, None]:
+    """
+    Uma sessão por request (auth e handler dividem a mesma).
+    - GET/HEAD/OPTIONS: sessão só leitura, nunca commita;
+    - demais: commit só se o handler gravou algo.
+    Request que não usou o banco (401, 422...) ou só leu termina no close,
+    que devolve a conexão ao pool sem COMMIT.
+    """
+    read_only = request.method in READ_ONLY_METHODS
+    db = (ReadSessionLocal if read_only else SessionLocal)()
     try:
         yield db
-        db.commit()
+        if not read_only and needs_commit(db):
+            db.commit()
     except Exception:
         db.rollback()
         raise
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# ---------------------------------------------------------------------------
+# caminho async (só leitura): DB_ASYNC_READS=1 troca os GETs mais chamados
+# (produtos, vendas, parcelas, clientes) por versões async, que esperam o
+# banco sem prender thread do threadpool
+# ---------------------------------------------------------------------------
+
+_ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def async_reads_enabled() -> bool:
+    return os.getenv("DB_ASYNC_READS", "0").strip() == "1"
+
+
+def async_database_url() -> str:
+    """
+    DATABASE_ASYNC_URL, ou o DATABASE_URL com o driver async
+    (postgresql+psycopg2 -> postgresql+asyncpg, sqlite -> sqlite+aiosqlite).
+    """
+    url = os.getenv("DATABASE_ASYNC_URL", "").strip()
+    if url:
+        return url
+    u = make_url(settings.DATABASE_URL)
+    driver = _ASYNC_DRIVERS.get(u.get_backend_name())
+    if driver is None:
+        raise RuntimeError(f"sem driver async para {u.get_backend_name()}: defina DATABASE_ASYNC_URL")
+    return u.set(drivername=f"{u.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+_ASYNC_SESSION = None
+_ASYNC_SESSION_LOCK = threading.Lock()
+
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    """
+    Engine/sessionmaker async criados na 1ª chamada (asyncpg só é
+    importado com o caminho async ligado).
+    """
+    global _ASYNC_SESSION
+    factory = _ASYNC_SESSION
+    if factory is not None:
+        return factory
+
+    with _ASYNC_SESSION_LOCK:
+        if _ASYNC_SESSION is None:
+            url = async_database_url()
+            async_engine = create_async_engine(url, **engine_options(url, is_async=True))
+            install_transaction_timeouts(async_engine.sync_engine)
+            _ASYNC_SESSION = async_sessionmaker(
+                bind=async_engine,
+                autoflush=False,
+                expire_on_commit=False,
+                class_=AsyncSession,
+            )
+        return _ASYNC_SESSION
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    # endpoints async só leem: sem commit, o close faz o rollback
+    async with get_async_sessionmaker()() as db:
+        yield db
@@ -7,11 +7,11 @@ from typing import Optional, List
 
 from sqlalchemy import (
     String, Integer, DateTime, Date, Numeric, ForeignKey, Text,
-    Enum as SAEnum, UniqueConstraint, Index, func
+    Enum as SAEnum, UniqueConstraint, Index, func, text, and_
 )
 
 from sqlalchemy.orm import (
-    DeclarativeBase, Mapped, mapped_column, relationship
+    DeclarativeBase, Mapped, mapped_column, relationship, foreign
 )
 
 
@@ -61,6 +61,7 @@ class WppSendStatus(str, enum.Enum):
     SENDING = "SENDING"
     SENT = "SENT"
     FAILED = "FAILED"
+    CANCELED = "CANCELED"  # lembrete perdeu o motivo antes de sair (ex.: conta paga)
 
 # models
 class UserORM(Base):
@@ -159,6 +160,11 @@ class ProductImageORM(Base):
     # caminho/URL servida pela API (ex: "/static/products/123/abc.jpg")
     url: Mapped[str] = mapped_column(String(500), nullable=False)
 
+    # variantes geradas no upload (KEYs no bucket; NULL = só existe a original)
+    thumb_url: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    medium_url: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    offer_url: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+
     # 1..4 (ordem)
     position: Mapped[int] = mapped_column(Integer, nullable=False)
 
@@ -175,6 +181,7 @@ class SaleORM(Base):
         UniqueConstraint("product_id", name="uq_sales_product_id"), # unica venda por produto
         Index("ix_sales_status", "status"),
         Index("ix_sales_payment_type", "payment_type"),
+        Index("ix_sales_created_at_id", "created_at", "id"),  # keyset da listagem
     )
 
     id:Mapped[int]=mapped_column(Integer, primary_key=True)
@@ -221,6 +228,7 @@ class PromissoryORM(Base):
         UniqueConstraint("public_id", name="uq_promissories_public_id"),
         UniqueConstraint("sale_id", name="uq_promissories_sale_id"), #0..1 por venda
         Index("ix_promissories_status", "status"),
+        Index("ix_promissories_client_id", "client_id"),
     )
 
     id:Mapped[int]=mapped_column(Integer, primary_key=True)
@@ -264,8 +272,13 @@ class InstallmentORM(Base):
     __table_args__ = (
         UniqueConstraint("promissory_id", "number", name="uq_installments_promissory_number"),
         Index("ix_installments_due", "due_date", "status"),
-        Index("ix_installments_wpp_due", "wa_due_status", "wa_due_next_retry_at"),
-        Index("ix_installments_wpp_overdue", "wa_overdue_status", "wa_overdue_next_retry_at"),
+        # Postgres: só parcelas em aberto (as pagas são a maior parte com o
+        # tempo); no SQLite, composto com o status na frente
+        Index(
+            "ix_installments_pending_due", "due_date",
+            postgresql_where=text("status = 'PENDING'"),
+        ).ddl_if(dialect="postgresql"),
+        Index("ix_installments_status_due", "status", "due_date").ddl_if(dialect="sqlite"),
     )
 
     id:Mapped[int]=mapped_column(Integer, primary_key=True)
@@ -286,28 +299,6 @@ class InstallmentORM(Base):
     paid_amount:Mapped[Optional[Decimal]]=mapped_column(Numeric(12, 2), nullable=True)
     note:Mapped[Optional[str]]=mapped_column(Text, nullable=True)
 
-    # lembrete whatsapp "vence em breve..."
-    wa_due_status:Mapped[WppSendStatus]=mapped_column(
-        SAEnum(WppSendStatus, name="wpp_installment_due_status"),
-        nullable=False,
-        default=WppSendStatus.PENDING,
-    )
-    wa_due_tries:Mapped[int]=mapped_column(Integer, nullable=False, default=0)
-    wa_due_last_error:Mapped[Optional[str]]=mapped_column(Text, nullable=True)
-    wa_due_sent_at:Mapped[Optional[datetime]]=mapped_column(DateTime(timezone=True), nullable=True)
-    wa_due_next_retry_at:Mapped[Optional[datetime]]=mapped_column(DateTime(timezone=True), nullable=True)
-
-    # cobrança quando tiver vencida
-    wa_overdue_status:Mapped[WppSendStatus]=mapped_column(
-        SAEnum(WppSendStatus, name="wpp_installment_overdue_status"),
-        nullable=False,
-        default=WppSendStatus.PENDING,
-    )
-    wa_overdue_tries:Mapped[int]=mapped_column(Integer, nullable=False, default=0)
-    wa_overdue_last_error:Mapped[Optional[str]]=mapped_column(Text, nullable=True)
-    wa_overdue_sent_at:Mapped[Optional[datetime]]=mapped_column(DateTime(timezone=True), nullable=True)
-    wa_overdue_next_retry_at:Mapped[Optional[datetime]]=mapped_column(DateTime(timezone=True), nullable=True)
-
     created_at:Mapped[datetime]=mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
@@ -318,7 +309,11 @@ class FinanceORM(Base):
     __tablename__ = "finance"
     __table_args__ = (
         Index("ix_finance_due_status", "due_date", "status"),
-        Index("ix_finance_wpp", "wpp_status", "wpp_next_retry_at"),
+        Index(
+            "ix_finance_pending_due", "due_date",
+            postgresql_where=text("status = 'PENDING'"),
+        ).ddl_if(dialect="postgresql"),
+        Index("ix_finance_status_due", "status", "due_date").ddl_if(dialect="sqlite"),
     )
 
     id:Mapped[int]=mapped_column(Integer, primary_key=True)
@@ -333,17 +328,6 @@ class FinanceORM(Base):
         default=FinanceStatus.PENDING,
     )
 
-    # controle do envio no whatsapp
-    wpp_status:Mapped[WppSendStatus]=mapped_column(
-        SAEnum(WppSendStatus, name="wpp_finance_status"),
-        nullable=False,
-        default=WppSendStatus.PENDING,
-    )
-    wpp_tries:Mapped[int]=mapped_column(Integer, nullable=False, default=0)
-    wpp_last_error:Mapped[Optional[str]]=mapped_column(Text, nullable=True)
-    wpp_sent_at:Mapped[Optional[datetime]]=mapped_column(DateTime(timezone=True), nullable=True)
-    wpp_next_retry_at:Mapped[Optional[datetime]]=mapped_column(DateTime(timezone=True), nullable=True)
-
     description:Mapped[Optional[str]]=mapped_column(String(200), nullable=True)
     notes:Mapped[Optional[str]]=mapped_column(Text, nullable=True)
 
@@ -351,6 +335,51 @@ class FinanceORM(Base):
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
 
+    # lembrete no whatsapp (fila outbound_messages); só leitura
+    reminder:Mapped[Optional["OutboundMessageORM"]]=relationship(
+        primaryjoin=lambda: and_(
+            OutboundMessageORM.kind == FINANCE_REMINDER_KIND,
+            OutboundMessageORM.ref_table == FinanceORM.__tablename__,
+            foreign(OutboundMessageORM.ref_id) == FinanceORM.id,
+        ),
+        viewonly=True,
+        uselist=False,
+    )
+
+    # campos wpp_* da API: vêm da mensagem na fila, nos valores de antes
+    # da fila (o front lê): conta paga = SENT (o pagamento encerra o
+    # lembrete), sem mensagem ou mensagem cancelada = PENDING. wpp_sent_at
+    # só quando o lembrete saiu de fato (pago sem envio fica None)
+    @property
+    def wpp_status(self) -> WppSendStatus:
+        if self.status == FinanceStatus.PAID:
+            return WppSendStatus.SENT
+        if self.reminder is None or self.reminder.status == WppSendStatus.CANCELED:
+            return WppSendStatus.PENDING
+        return self.reminder.status
+
+    @property
+    def wpp_tries(self) -> int:
+        return self.reminder.tries if self.reminder else 0
+
+    @property
+    def wpp_last_error(self) -> Optional[str]:
+        if self.status != FinanceStatus.PAID and self.reminder and self.reminder.status == WppSendStatus.FAILED:
+            return self.reminder.last_error
+        return None
+
+    @property
+    def wpp_sent_at(self) -> Optional[datetime]:
+        if self.reminder and self.reminder.status == WppSendStatus.SENT:
+            return self.reminder.sent_at
+        return None
+
+    @property
+    def wpp_next_retry_at(self) -> Optional[datetime]:
+        if self.status != FinanceStatus.PAID and self.reminder and self.reminder.status == WppSendStatus.FAILED:
+            return self.reminder.next_attempt_at
+        return None
+
 class IntegrationTokenORM(Base):
     __tablename__ = "integration_tokens"
 
@@ -358,4 +387,67 @@ class IntegrationTokenORM(Base):
     access_token: Mapped[str | None] = mapped_column(Text, nullable=True)
     token_type: Mapped[str | None] = mapped_column(String(20), nullable=True)
     expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
\ No newline at end of file
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+
+
+class JobLockORM(Base):
+    """
+    Trava de job diário entre réplicas do worker (ex.: ofertas).
+    done_date = último dia concluído; locked_by/locked_until = quem está rodando agora.
+    """
+    __tablename__ = "job_locks"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    done_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
+    locked_by: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    locked_until: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+
+
+FINANCE_REMINDER_KIND = "finance_due"
+
+
+class OutboundMessageORM(Base):
+    """
+    Fila de saída do whatsapp. Cada etapa do worker grava aqui a mensagem
+    já renderizada; um consumidor só faz claim/envio/backoff de todas.
+    (kind, ref_table, ref_id) é único: uma linha por lembrete; se foi
+    CANCELED e o motivo volta, a mesma linha volta para PENDING.
+    next_attempt_at = quando pode sair (em SENDING é o fim do lease).
+    """
+    __tablename__ = "outbound_messages"
+    __table_args__ = (
+        UniqueConstraint("kind", "ref_table", "ref_id", name="uq_outbound_messages_ref"),
+        # parcial: a varredura da fila só enxerga o que ainda não saiu
+        Index(
+            "ix_outbound_messages_pending", "next_attempt_at",
+            postgresql_where=text("status IN ('PENDING', 'SENDING', 'FAILED')"),
+        ).ddl_if(dialect="postgresql"),
+        # SQLite só usa índice parcial se o WHERE repetir o literal, e as
+        # consultas usam bind params: lá vai o índice composto comum
+        Index("ix_outbound_messages_status_kind", "status", "kind", "next_attempt_at").ddl_if(dialect="sqlite"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    kind: Mapped[str] = mapped_column(String(40), nullable=False)
+    ref_table: Mapped[str] = mapped_column(String(40), nullable=False)
+    ref_id: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    recipient: Mapped[str] = mapped_column(String(80), nullable=False)
+    body: Mapped[str] = mapped_column(Text, nullable=False)
+
+    status: Mapped[WppSendStatus] = mapped_column(
+        SAEnum(WppSendStatus, name="outbound_status"),
+        nullable=False,
+        default=WppSendStatus.PENDING,
+    )
+    tries: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    claimed_by: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    claimed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
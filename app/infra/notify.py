@@ -0,0 +1,125 @@
+# app/infra/notify.py
+"""
+Acorda o worker quando algo relevante muda (PostgreSQL LISTEN/NOTIFY).
+
+- Emissão: listener after_flush na sessão; insert/update de finance,
+  installments ou sales gera `pg_notify('worker_wakeup', '<tabelas>')`.
+  O NOTIFY só é entregue no commit (rollback descarta).
+  O estado do envio fica em outbound_messages (não observada), então o
+  próprio worker não se acorda em loop.
+- Espera: WakeupListener.wait(timeout) bloqueia no LISTEN até chegar
+  notificação ou dar o timeout. Fora do Postgres (SQLite) é só um sleep,
+  e o polling continua como antes.
+"""
+from __future__ import annotations
+
+import select
+import time
+from typing import List, Set
+
+from sqlalchemy import event, text
+
+from infra.pool import pgbouncer_mode
+
+WAKEUP_CHANNEL = "worker_wakeup"
+
+_WATCHED_TABLES = {"finance", "installments", "sales"}
+
+
+def wakeup_tables(session) -> Set[str]:
+    tables = set()
+    for obj in session.new:
+        name = getattr(getattr(obj, "__table__", None), "name", None)
+        if name in _WATCHED_TABLES:
+            tables.add(name)
+
+    for obj in session.dirty:
+        name = getattr(getattr(obj, "__table__", None), "name", None)
+        if name in _WATCHED_TABLES and session.is_modified(obj):
+            tables.add(name)
+    return tables
+
+
+def _after_flush(session, flush_context) -> None:
+    tables = wakeup_tables(session)
+    if not tables:
+        return
+    conn = session.connection()
+    if conn.dialect.name != "postgresql":
+        return
+    conn.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": WAKEUP_CHANNEL, "payload": ",".join(sorted(tables))},
+    )
+
+
+def register_wakeup_notifications(session_factory) -> None:
+    if not event.contains(session_factory, "after_flush", _after_flush):
+        event.listen(session_factory, "after_flush", _after_flush)
+
+
+class WakeupListener:
+    """
+    Conexão dedicada (fora do pool) em LISTEN no canal do worker.
+    Se a conexão cair, volta para sleep e reconecta na próxima espera.
+    """
+
+    def __init__(self, engine, *, channel: str = WAKEUP_CHANNEL, debounce_seconds: float = 0.2):
+        self.engine = engine
+        self.channel = channel
+        self.debounce = debounce_seconds
+        self._conn = None
+
+    @property
+    def enabled(self) -> bool:
+        # PgBouncer em transaction pooling não entrega NOTIFY de volta
+        return self.engine.dialect.name == "postgresql" and not pgbouncer_mode()
+
+    def _connect(self):
+        raw = self.engine.raw_connection()
+        raw.detach()  # não devolve ao pool: fica presa no LISTEN
+        conn = raw.driver_connection
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f'LISTEN "{self.channel}"')
+        return conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+        self._conn = None
+
+    def _drain(self, timeout: float) -> List[str]:
+        conn = self._conn
+        if not conn.notifies and select.select([conn], [], [], max(0.0, timeout)) == ([], [], []):
+            return []
+        conn.poll()
+        out = [n.payload for n in conn.notifies]
+        conn.notifies.clear()
+        return out
+
+    def wait(self, timeout: float) -> List[str]:
+        """
+        Espera até `timeout` segundos. Retorna os payloads recebidos
+        ([] = acordou pelo timeout).
+        """
+        if not self.enabled:
+            time.sleep(timeout)
+            return []
+
+        try:
+            if self._conn is None:
+                self._conn = self._connect()
+            payloads = self._drain(timeout)
+            if payloads and self.debounce > 0:
+                # rajada (ex.: venda com 24 parcelas em vários commits): junta num ciclo só
+                payloads += self._drain(self.debounce)
+            return payloads
+        except Exception as e:
+            print(f"[notify] LISTEN indisponível, usando polling: {e}")
+            self.close()
+            time.sleep(timeout)
+            return []
@@ -0,0 +1,189 @@
+# app/infra/pool.py
+"""
+Pool de conexões do engine (API e worker).
+
+Env (valem para Postgres; SQLite fica com o pool padrão do SQLAlchemy):
+  DB_POOL_SIZE=20 / DB_MAX_OVERFLOW=20: até 40 conexões, o mesmo número
+    de threads do threadpool do FastAPI, então request não fica esperando
+    conexão atrás de outro request
+  DB_POOL_TIMEOUT=10: segundos esperando conexão livre antes de erro
+  DB_POOL_RECYCLE=1800: recicla conexão mais velha que isso (firewall/LB
+    derrubando conexão ociosa)
+  DB_POOL_PRE_PING=0: SELECT 1 a cada checkout (desligado: o recycle já
+    cobre conexão velha e o pre-ping custa um round trip por request)
+  DB_PGBOUNCER=0: 1 = atrás do PgBouncer em transaction pooling: NullPool
+    (o pool é o do PgBouncer) e sem prepared statements no servidor
+  DB_STATEMENT_TIMEOUT_MS=30000 / DB_IDLE_IN_TX_TIMEOUT_MS=60000:
+    statement_timeout e idle_in_transaction_session_timeout (0 desliga)
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+
+def _int_env(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def pgbouncer_mode() -> bool:
+    return os.getenv("DB_PGBOUNCER", "0").strip() == "1"
+
+
+class PoolMetrics:
+    """
+    Contadores do pool desde o start do processo (tempo de espera por
+    conexão, timeouts). O estado atual (em uso, overflow) vem do próprio pool.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def record(self, waited: float, *, timeout: bool = False) -> None:
+        with self._lock:
+            if timeout:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(1000 * self.wait_total / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(1000 * self.wait_max, 3),
+            }
+
+
+POOL_METRICS = PoolMetrics()
+
+
+class _TimedCheckout:
+    """
+    Mede quanto cada checkout esperou por conexão livre (inclui abrir
+    conexão nova quando o pool ainda não encheu).
+    """
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            POOL_METRICS.record(time.perf_counter() - t0, timeout=True)
+            raise
+        POOL_METRICS.record(time.perf_counter() - t0)
+        return conn
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def _timeouts() -> dict:
+    out = {
+        "statement_timeout": _int_env("DB_STATEMENT_TIMEOUT_MS", 30000),
+        "idle_in_transaction_session_timeout": _int_env("DB_IDLE_IN_TX_TIMEOUT_MS", 60000),
+    }
+    return {k: v for k, v in out.items() if v > 0}
+
+
+def _connect_args(driver: str) -> dict:
+    args: dict = {}
+    if pgbouncer_mode():
+        # transaction pooling: a conexão do servidor muda a cada transação,
+        # prepared statement de uma não existe na outra (psycopg2 não usa)
+        if driver == "psycopg":
+            args["prepare_threshold"] = None
+        elif driver == "asyncpg":
+            args["statement_cache_size"] = 0
+            args["prepared_statement_cache_size"] = 0
+        return args
+
+    # direto no Postgres: timeouts no startup da conexão, sem round trip
+    timeouts = _timeouts()
+    if timeouts and driver in ("psycopg2", "psycopg"):
+        args["options"] = " ".join(f"-c {k}={v}" for k, v in timeouts.items())
+    elif timeouts and driver == "asyncpg":
+        args["server_settings"] = {k: str(v) for k, v in timeouts.items()}
+    return args
+
+
+def engine_options(url: str, *, is_async: bool = False) -> dict:
+    """
+    kwargs do create_engine (ou create_async_engine) para `url`.
+    """
+    u = make_url(url)
+    if u.get_backend_name() != "postgresql":
+        return {"pool_pre_ping": True}
+
+    opts = {"connect_args": _connect_args(u.get_driver_name())}
+    if pgbouncer_mode():
+        opts["poolclass"] = NullPool
+        return opts
+
+    opts.update(
+        poolclass=TimedAsyncQueuePool if is_async else TimedQueuePool,
+        pool_size=_int_env("DB_POOL_SIZE", 20),
+        max_overflow=_int_env("DB_MAX_OVERFLOW", 20),
+        pool_timeout=_int_env("DB_POOL_TIMEOUT", 10),
+        pool_recycle=_int_env("DB_POOL_RECYCLE", 1800),
+        pool_pre_ping=os.getenv("DB_POOL_PRE_PING", "0").strip() == "1",
+    )
+    return opts
+
+
+def install_transaction_timeouts(engine) -> None:
+    """
+    PgBouncer (transaction pooling) não repassa o `options` do startup e
+    SET de sessão vazaria para outro cliente: aplica SET LOCAL no início
+    de cada transação. Sem PgBouncer não faz nada (já veio no connect).
+    """
+    if not pgbouncer_mode() or engine.dialect.name != "postgresql":
+        return
+    timeouts = _timeouts()
+    if not timeouts:
+        return
+    # um SET por execute: o asyncpg não aceita vários comandos juntos
+    sqls = [f"SET LOCAL {k} = {v}" for k, v in timeouts.items()]
+
+    @event.listens_for(engine, "begin")
+    def _set_local(conn) -> None:
+        for sql in sqls:
+            conn.exec_driver_sql(sql)
+
+
+def pool_stats(engine) -> dict:
+    pool = engine.pool
+    out = {"pool": type(pool).__name__, "pgbouncer": pgbouncer_mode()}
+    if isinstance(pool, QueuePool):
+        out.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            # negativo enquanto o pool ainda não abriu pool_size conexões
+            overflow=pool.overflow(),
+            max_overflow=pool._max_overflow,
+        )
+    out.update(POOL_METRICS.snapshot())
+    return out
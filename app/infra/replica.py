@@ -0,0 +1,165 @@
+# app/infra/replica.py
+"""
+Réplica de leitura (DATABASE_READ_URL, opcional).
+
+Sessões só leitura (GETs da API, relatório de produtos, scan da oferta do
+dia no worker) vão para a réplica quando ela responde e o atraso está
+dentro da tolerância; senão caem no primário. Escrita é sempre no primário.
+
+Env:
+  DB_REPLICA_MAX_LAG_SECONDS=10: atraso aceito nos GETs da API
+  DB_REPLICA_REPORT_MAX_LAG_SECONDS=300: atraso aceito em relatórios/worker
+  DB_REPLICA_CHECK_SECONDS=5: intervalo entre medições do atraso; réplica
+    que falhou (medição ou conexão) fica fora até a próxima
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+# em dia quando já aplicou tudo que recebeu; senão, idade da última
+# transação aplicada (no primário ocioso ela envelhece sem ser atraso)
+LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+
+def max_lag_seconds() -> float:
+    return float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "10"))
+
+
+def report_max_lag_seconds() -> float:
+    return float(os.getenv("DB_REPLICA_REPORT_MAX_LAG_SECONDS", "300"))
+
+
+class ReplicaHealth:
+    """
+    Atraso da réplica, medido no máximo a cada check_seconds (uma thread
+    mede, as outras usam o último valor). lag None = fora do ar.
+    """
+
+    def __init__(self, engine: Optional[Engine], *, check_seconds: Optional[float] = None) -> None:
+        self.engine = engine
+        self.check_seconds = (
+            check_seconds if check_seconds is not None
+            else float(os.getenv("DB_REPLICA_CHECK_SECONDS", "5"))
+        )
+        self.routed = 0
+        self.fallbacks = 0
+        self.connect_errors = 0
+        self.last_error: Optional[str] = None
+        self._lag: Optional[float] = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+        if engine is not None:
+            event.listen(engine, "handle_error", self._on_error)
+
+    def _on_error(self, ctx) -> None:
+        # falha ao conectar (connection None) ou conexão caída no meio de
+        # um request: os próximos vão para o primário sem esperar a medição
+        if ctx.connection is None or ctx.is_disconnect:
+            self.connect_errors += 1
+            self.mark_down(ctx.original_exception)
+
+    def mark_down(self, error: BaseException) -> None:
+        self._lag = None
+        self._checked_at = time.monotonic()
+        # só a classe: stats() sai no /health/db sem auth, e a mensagem do
+        # driver traz host/porta/usuário/banco
+        self.last_error = type(error).__name__
+
+    def _measure(self) -> float:
+        with self.engine.connect() as conn:
+            if conn.dialect.name == "postgresql":
+                return float(conn.exec_driver_sql(LAG_SQL).scalar() or 0)
+            # SQLite (testes locais): só confere que abre
+            conn.exec_driver_sql("SELECT 1")
+            return 0.0
+
+    def lag(self) -> Optional[float]:
+        if self.engine is None:
+            return None
+        if time.monotonic() - self._checked_at < self.check_seconds:
+            return self._lag
+        if not self._lock.acquire(blocking=False):
+            return self._lag
+        try:
+            self._lag = self._measure()
+            self.last_error = None
+        except Exception as e:
+            self.mark_down(e)
+        finally:
+            self._checked_at = time.monotonic()
+            self._lock.release()
+        return self._lag
+
+    def usable(self, max_lag: float) -> bool:
+        lag = self.lag()
+        return lag is not None and lag <= max_lag
+
+    def stats(self) -> dict:
+        return {
+            "configured": self.engine is not None,
+            "lag_seconds": self._lag,
+            "routed": self.routed,
+            "fallbacks": self.fallbacks,
+            "connect_errors": self.connect_errors,
+            "last_error": self.last_error,
+        }
+
+
+class RoutingSession(Session):
+    """
+    Sessão só leitura que escolhe o banco na 1ª query: réplica se estiver
+    usável com max_lag_seconds, senão primário. A escolha vale até o
+    close (uma conexão e uma transação por sessão).
+    """
+
+    def __init__(
+        self,
+        *args,
+        primary: Engine,
+        replica: Optional[Engine] = None,
+        health: Optional[ReplicaHealth] = None,
+        max_lag_seconds: Optional[float] = None,
+        **kw,
+    ) -> None:
+        super().__init__(*args, **kw)
+        self.primary = primary
+        self.replica = replica
+        self.health = health
+        self.max_lag_seconds = max_lag_seconds
+        self._target: Optional[Engine] = None
+
+    def _choose(self) -> Engine:
+        if self.replica is None or self.health is None:
+            self.info["db_route"] = "primary"
+            return self.primary
+        max_lag = self.max_lag_seconds if self.max_lag_seconds is not None else max_lag_seconds()
+        if self.health.usable(max_lag):
+            self.health.routed += 1
+            self.info["db_route"] = "replica"
+            return self.replica
+        self.health.fallbacks += 1
+        self.info["db_route"] = "primary"
+        return self.primary
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._target is None:
+            self._target = self._choose()
+        return self._target
+
+    def close(self) -> None:
+        super().close()
+        self._target = None
@@ -0,0 +1,87 @@
+# app/infra/schema.py
+"""
+Revisão do schema (Alembic).
+
+O schema é criado/alterado só pelas migrations (`alembic upgrade head`,
+ou `python -m init_db`). No startup a API apenas confere se o banco está
+na revisão esperada pelo código: uma consulta em alembic_version.
+
+DB_SCHEMA_CHECK:
+  strict (padrão): banco fora do head derruba o startup
+  warn: só avisa
+  off: não confere (testes, que montam o banco com create_all)
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Optional
+
+from alembic import command
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect
+
+APP_DIR = Path(__file__).resolve().parent.parent
+BASELINE_REVISION = "0001_baseline"
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+def alembic_config(url: Optional[str] = None) -> Config:
+    cfg = Config(str(APP_DIR / "alembic.ini"))
+    cfg.set_main_option("script_location", str(APP_DIR / "migrations"))
+    if url:
+        cfg.set_main_option("sqlalchemy.url", url)
+    return cfg
+
+
+def head_revision() -> str:
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def current_revision(engine) -> Optional[str]:
+    with engine.connect() as conn:
+        return MigrationContext.configure(conn).get_current_revision()
+
+
+def upgrade_to_head(engine) -> None:
+    """
+    Aplica as migrations. Banco criado pelo create_all antigo (tem tabelas,
+    não tem alembic_version) é carimbado no baseline antes.
+
+    connect() e não begin(): a transação tem que ser a do env.py, senão o
+    autocommit_block do 0003 (CREATE INDEX CONCURRENTLY) não consegue
+    commitar em volta e o upgrade quebra no Postgres.
+    """
+    cfg = alembic_config()
+    with engine.connect() as conn:
+        cfg.attributes["connection"] = conn
+        cfg.attributes["configure_logger"] = False
+        tables = set(inspect(conn).get_table_names())
+        # fecha a transação aberta pelo inspect antes de entregar ao Alembic
+        conn.rollback()
+        if "alembic_version" not in tables and "users" in tables:
+            print(f"[schema] banco sem alembic_version: carimbando {BASELINE_REVISION}")
+            command.stamp(cfg, BASELINE_REVISION)
+        command.upgrade(cfg, "head")
+
+
+def check_schema(engine) -> None:
+    mode = os.getenv("DB_SCHEMA_CHECK", "strict").strip().lower()
+    if mode == "off":
+        return
+
+    current, head = current_revision(engine), head_revision()
+    if current == head:
+        print(f"[startup] schema na revisão {current}")
+        return
+
+    msg = f"schema do banco em {current or '(sem migrations)'}, código espera {head}: rode `alembic upgrade head`"
+    if mode == "warn":
+        print(f"[startup] ⚠️ {msg}")
+        return
+    raise SchemaOutOfDate(msg)
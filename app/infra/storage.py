@@ -1,7 +1,11 @@
 from __future__ import annotations
 
 import os
+import threading
+import time
 import uuid
+from collections import OrderedDict
+from typing import BinaryIO, Optional
 
 import boto3
 from botocore.config import Config
@@ -11,6 +15,69 @@ class StorageError(RuntimeError):
     pass
 
 
+class _PresignCache:
+    """
+    LRU com TTL para URLs assinadas (KEY -> URL).
+    A URL é reaproveitada até um pouco antes de expirar, então listagens
+    repetidas não reassinam as mesmas imagens.
+    """
+
+    def __init__(self, maxsize: int, margin_seconds: int) -> None:
+        self.maxsize = maxsize
+        self.margin_seconds = margin_seconds
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[tuple[str, int], tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, expires_seconds: int) -> Optional[str]:
+        with self._lock:
+            item = self._data.get((key, expires_seconds))
+            if item is None or item[1] <= time.monotonic():
+                self.misses += 1
+                return None
+            self._data.move_to_end((key, expires_seconds))
+            self.hits += 1
+            return item[0]
+
+    def put(self, key: str, expires_seconds: int, url: str) -> None:
+        ttl = expires_seconds - self.margin_seconds
+        if self.maxsize <= 0 or ttl <= 0:
+            return
+        with self._lock:
+            self._data[(key, expires_seconds)] = (url, time.monotonic() + ttl)
+            self._data.move_to_end((key, expires_seconds))
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            for k in [k for k in self._data if k[0] == key]:
+                del self._data[k]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# margem: a URL servida ainda vale pelo menos isso no navegador
+_PRESIGN_CACHE = _PresignCache(
+    maxsize=int(os.getenv("S3_PRESIGN_CACHE_SIZE", "5000")),
+    margin_seconds=int(os.getenv("S3_PRESIGN_CACHE_MARGIN_SECONDS", "300")),
+)
+
+
 def _get_env(name: str) -> str:
     v = os.getenv(name, "").strip()
     if not v:
@@ -18,22 +85,64 @@ def _get_env(name: str) -> str:
     return v
 
 
-def _s3_client():
-    endpoint = _get_env("S3_ENDPOINT")
-    access_key = _get_env("S3_ACCESS_KEY_ID")
-    secret_key = _get_env("S3_SECRET_ACCESS_KEY")
-    region = os.getenv("S3_REGION", "auto").strip() or "auto"
-
-    return boto3.client(
-        "s3",
-        endpoint_url=endpoint,
-        aws_access_key_id=access_key,
-        aws_secret_access_key=secret_key,
-        region_name=region,
-        config=Config(signature_version="s3v4"),
+_S3_CLIENT = None
+_S3_CLIENT_LOCK = threading.Lock()
+
+
+def _s3_config() -> Config:
+    return Config(
+        signature_version="s3v4",
+        max_pool_connections=int(os.getenv("S3_MAX_POOL_CONNECTIONS", "20")),
+        connect_timeout=float(os.getenv("S3_CONNECT_TIMEOUT_SECONDS", "5")),
+        read_timeout=float(os.getenv("S3_READ_TIMEOUT_SECONDS", "30")),
+        retries={
+            "max_attempts": int(os.getenv("S3_MAX_ATTEMPTS", "3")),
+            "mode": os.getenv("S3_RETRY_MODE", "standard"),
+        },
     )
 
 
+def _s3_client():
+    """
+    Client único por processo (criado na 1ª chamada).
+    Clients do botocore são thread-safe e mantêm o pool de conexões,
+    então API e worker reaproveitam conexões em vez de abrir uma por chamada.
+    """
+    global _S3_CLIENT
+    client = _S3_CLIENT
+    if client is not None:
+        return client
+
+    with _S3_CLIENT_LOCK:
+        if _S3_CLIENT is None:
+            endpoint = _get_env("S3_ENDPOINT")
+            access_key = _get_env("S3_ACCESS_KEY_ID")
+            secret_key = _get_env("S3_SECRET_ACCESS_KEY")
+            region = os.getenv("S3_REGION", "auto").strip() or "auto"
+
+            # boto3.client() usa a sessão default, que não é thread-safe na criação
+            _S3_CLIENT = boto3.session.Session().client(
+                "s3",
+                endpoint_url=endpoint,
+                aws_access_key_id=access_key,
+                aws_secret_access_key=secret_key,
+                region_name=region,
+                config=_s3_config(),
+            )
+        return _S3_CLIENT
+
+
+def reset_s3_client() -> None:
+    """
+    Descarta o client compartilhado (ex.: testes que trocam S3_* do ambiente).
+    As URLs em cache foram assinadas pelo client antigo, então saem junto.
+    """
+    global _S3_CLIENT
+    with _S3_CLIENT_LOCK:
+        _S3_CLIENT = None
+    _PRESIGN_CACHE.clear()
+
+
 def bucket_name() -> str:
     return _get_env("S3_BUCKET")
 
@@ -46,6 +155,14 @@ def random_filename(ext: str) -> str:
     return f"{uuid.uuid4().hex}{ext}"
 
 
+def variant_key(key: str, variant: str, ext: str) -> str:
+    """
+    "products/12/abc.jpg" -> "products/12/abc.thumb.webp"
+    """
+    base, _, _ = key.rpartition(".")
+    return f"{base or key}.{variant}{ext}"
+
+
 def put_bytes(*, content: bytes, content_type: str, key: str) -> str:
     """
     Upload privado. Retorna a KEY (não URL).
@@ -60,6 +177,22 @@ def put_bytes(*, content: bytes, content_type: str, key: str) -> str:
     return key
 
 
+def put_fileobj(*, fileobj: BinaryIO, content_type: str, key: str) -> str:
+    """
+    Upload privado lendo direto do arquivo (ex.: SpooledTemporaryFile do
+    UploadFile), sem carregar o conteúdo inteiro em memória. Retorna a KEY.
+    """
+    fileobj.seek(0)
+    s3 = _s3_client()
+    s3.put_object(
+        Bucket=bucket_name(),
+        Key=key,
+        Body=fileobj,
+        ContentType=content_type,
+    )
+    return key
+
+
 def get_bytes(key: str) -> bytes:
     s3 = _s3_client()
     obj = s3.get_object(Bucket=bucket_name(), Key=key)
@@ -67,14 +200,29 @@ def get_bytes(key: str) -> bytes:
 
 
 def presign_get_url(key: str, expires_seconds: int = 3600) -> str:
+    cached = _PRESIGN_CACHE.get(key, expires_seconds)
+    if cached is not None:
+        return cached
+
     s3 = _s3_client()
-    return s3.generate_presigned_url(
+    url = s3.generate_presigned_url(
         "get_object",
         Params={"Bucket": bucket_name(), "Key": key},
         ExpiresIn=expires_seconds,
     )
+    _PRESIGN_CACHE.put(key, expires_seconds, url)
+    return url
+
+
+def presign_cache_stats() -> dict:
+    return _PRESIGN_CACHE.stats()
+
+
+def clear_presign_cache() -> None:
+    _PRESIGN_CACHE.clear()
 
 
 def delete_object(key: str) -> None:
+    _PRESIGN_CACHE.invalidate(key)
     s3 = _s3_client()
     s3.delete_object(Bucket=bucket_name(), Key=key)
@@ -1,12 +1,12 @@
 from infra.db import engine
-from infra.models import Base
+from infra.schema import upgrade_to_head
 from sqlalchemy.orm import Session
 from infra.models import UserORM
 from services.security import hash_password  # ou sua função
 
 def main():
-    Base.metadata.create_all(bind=engine)
-    print("Tabelas criadas!")
+    upgrade_to_head(engine)
+    print("Schema atualizado (alembic head)!")
 
 if __name__ == "__main__":
     main()
@@ -3,17 +3,24 @@ from __future__ import annotations
 
 import base64
 import os
+import threading
 import time
 from dataclasses import dataclass
-from typing import Iterable, Union, List, Optional
+from datetime import datetime, timezone
+from typing import Callable, Iterable, Union, List, Optional, TypeVar
 
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # carrega .env quando rodar script/worker fora do FastAPI
 load_dotenv()
 
 
+T = TypeVar("T")
+
+
 class BlibsendError(RuntimeError):
     pass
 
@@ -25,6 +32,107 @@ class _TokenCache:
 
 
 _TOKEN_CACHE: Optional[_TokenCache] = None
+_TOKEN_LOCK = threading.Lock()
+
+PROVIDER = "blibsend"
+
+
+class _Retry(Retry):
+    """
+    Retry do urllib3 com teto no Retry-After (um 429 com "Retry-After: 3600"
+    não pode travar o worker por uma hora).
+    """
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, float(os.getenv("BLIBSEND_RETRY_AFTER_MAX_SECONDS", "30")))
+
+
+_HTTP: Optional[requests.Session] = None
+_HTTP_LOCK = threading.Lock()
+
+
+class _SendRetry(_Retry):
+    """
+    Envio de mensagem (POST não idempotente): só repete 429/503 com
+    Retry-After, que é o próprio Blibsend dizendo que não processou.
+    502/504 vêm do gateway e não provam que o envio não aconteceu.
+    """
+
+    RETRY_AFTER_STATUS_CODES = frozenset({429, 503})
+
+
+def _retry_policy(*, send: bool = False) -> Retry:
+    attempts = int(os.getenv("BLIBSEND_MAX_RETRIES", "3"))
+    return (_SendRetry if send else _Retry)(
+        total=attempts,
+        connect=attempts,
+        # timeout de leitura pode significar "já enviou", então não repete
+        # (evita mensagem duplicada)
+        read=0,
+        status=attempts,
+        # signin/GETs são idempotentes: repetem também 502/504 e 429/503
+        # sem Retry-After; no envio nada entra pela forcelist
+        status_forcelist=() if send else (429, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "POST"}),
+        backoff_factor=float(os.getenv("BLIBSEND_RETRY_BACKOFF_SECONDS", "0.5")),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
+def _http() -> requests.Session:
+    """
+    Session única por processo: keep-alive + pool de conexões, em vez de
+    um handshake TCP/TLS novo a cada mensagem (requests.post solto).
+    /messages/* usa a política de retry do envio (_SendRetry).
+    """
+    global _HTTP
+    session = _HTTP
+    if session is not None:
+        return session
+
+    with _HTTP_LOCK:
+        if _HTTP is None:
+            pool = max(1, int(os.getenv("BLIBSEND_POOL_SIZE", os.getenv("BLIBSEND_MAX_CONCURRENCY", "8"))))
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool, max_retries=_retry_policy())
+            send_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool, max_retries=_retry_policy(send=True))
+            # mesmo PoolManager: envio e signin dividem as conexões keep-alive
+            send_adapter.poolmanager = adapter.poolmanager
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.mount(f"{_base_url()}/messages/", send_adapter)
+            session.headers.update({"User-Agent": "wi_motos/1.0"})
+            _HTTP = session
+        return _HTTP
+
+
+def reset_http_session() -> None:
+    """
+    Fecha a Session compartilhada (a próxima chamada relê as envs).
+    """
+    global _HTTP
+    with _HTTP_LOCK:
+        if _HTTP is not None:
+            _HTTP.close()
+        _HTTP = None
+
+
+def _timeout(read_env: str = "BLIBSEND_READ_TIMEOUT_SECONDS", read_default: str = "25") -> tuple:
+    return (
+        float(os.getenv("BLIBSEND_CONNECT_TIMEOUT_SECONDS", "5")),
+        float(os.getenv(read_env, read_default)),
+    )
+
+
+def _post(url: str, **kwargs) -> requests.Response:
+    try:
+        return _http().post(url, **kwargs)
+    except requests.RequestException as e:
+        raise BlibsendError(f"Erro de comunicação com Blibsend: {e}") from e
 
 
 def _base_url() -> str:
@@ -72,7 +180,7 @@ def signin() -> _TokenCache:
         "User-Agent": "wi_motos/1.0",
     }
 
-    resp = requests.post(url, headers=headers, timeout=25)
+    resp = _post(url, headers=headers, timeout=_timeout())
 
     if resp.status_code >= 300:
         raise BlibsendError(f"Falha no signin ({resp.status_code}): {resp.text[:300]}")
@@ -96,14 +204,140 @@ def signin() -> _TokenCache:
     return cache
 
 
-def get_token() -> str:
+def _refresh_margin() -> float:
+    return float(os.getenv("BLIBSEND_TOKEN_REFRESH_MARGIN_SECONDS", "300"))
+
+
+def _persist_enabled() -> bool:
+    return os.getenv("BLIBSEND_TOKEN_PERSIST", "1").strip().lower() not in ("0", "false", "no")
+
+
+def _token_db():
+    # import tardio: o módulo também é usado por scripts sem banco configurado
+    from infra.db import SessionLocal
+    return SessionLocal()
+
+
+def _to_epoch(dt: Optional[datetime]) -> float:
+    if dt is None:
+        return 0.0
+    if dt.tzinfo is None:  # SQLite devolve sem fuso; gravamos em UTC
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _signin_shared(bad_token: Optional[str]) -> _TokenCache:
     """
-    Retorna Bearer token válido, renovando quando necessário.
+    Token compartilhado via integration_tokens: usa o do banco se ainda
+    estiver bom (outro processo já renovou); senão faz signin e grava.
+    No Postgres o FOR UPDATE na linha do provider segura os outros
+    processos até o novo token estar gravado.
     """
     global _TOKEN_CACHE
-    if _TOKEN_CACHE and _TOKEN_CACHE.expires_at_epoch > time.time():
-        return _TOKEN_CACHE.token
-    return signin().token
+    from infra.models import IntegrationTokenORM
+
+    db = _token_db()
+    try:
+        row = db.get(IntegrationTokenORM, PROVIDER, with_for_update=True)
+        if (
+            row is not None
+            and row.access_token
+            and row.access_token != bad_token
+            and _to_epoch(row.expires_at) - _refresh_margin() > time.time()
+        ):
+            _TOKEN_CACHE = _TokenCache(token=row.access_token, expires_at_epoch=_to_epoch(row.expires_at))
+            db.rollback()
+            return _TOKEN_CACHE
+
+        cache = signin()
+        if row is None:
+            row = IntegrationTokenORM(provider=PROVIDER)
+            db.add(row)
+        row.access_token = cache.token
+        row.token_type = "Bearer"
+        row.expires_at = datetime.fromtimestamp(cache.expires_at_epoch, tz=timezone.utc)
+        row.updated_at = datetime.now(timezone.utc)
+        try:
+            db.commit()
+        except Exception as e:
+            # ex.: outro processo inseriu a linha ao mesmo tempo; o token vale igual
+            db.rollback()
+            print(f"[blibsend] não consegui gravar token: {e}")
+        return cache
+    finally:
+        db.close()
+
+
+def _refresh_token(bad_token: Optional[str] = None) -> str:
+    """
+    Renovação single-flight: só uma thread faz signin; as outras esperam
+    o lock e reaproveitam o token novo.
+    """
+    global _TOKEN_CACHE
+    with _TOKEN_LOCK:
+        cache = _TOKEN_CACHE
+        if cache and cache.token != bad_token and cache.expires_at_epoch - _refresh_margin() > time.time():
+            return cache.token  # outra thread já renovou
+
+        try:
+            if _persist_enabled():
+                try:
+                    return _signin_shared(bad_token).token
+                except BlibsendError:
+                    raise
+                except Exception as e:
+                    print(f"[blibsend] token store indisponível, usando só memória: {e}")
+            return signin().token
+        except BlibsendError:
+            # renovação antecipada falhou mas o token atual ainda vale: segue com ele
+            if cache and cache.token != bad_token and cache.expires_at_epoch > time.time():
+                return cache.token
+            raise
+
+
+def get_token() -> str:
+    """
+    Retorna Bearer token válido, renovando quando necessário
+    (BLIBSEND_TOKEN_REFRESH_MARGIN_SECONDS antes de expirar).
+    """
+    cache = _TOKEN_CACHE
+    if cache and cache.expires_at_epoch - _refresh_margin() > time.time():
+        return cache.token
+    return _refresh_token()
+
+
+MESSAGE_MAX_CHARS = 3000  # seguro pra não estourar
+
+
+def chunk_items(items: Iterable[T], size_of: Callable[[T], int], max_chars: int = MESSAGE_MAX_CHARS) -> List[List[T]]:
+    """
+    Agrupa itens em ordem, sem quebrar nenhum, em blocos de até max_chars
+    (um item maior que o limite sai sozinho).
+    """
+    chunks: List[List[T]] = []
+    buf: List[T] = []
+    size = 0
+
+    for item in items:
+        n = size_of(item)
+        if size + n > max_chars and buf:
+            chunks.append(buf)
+            buf = []
+            size = 0
+        buf.append(item)
+        size += n
+
+    if buf:
+        chunks.append(buf)
+    return chunks
+
+
+def chunk_text(text: str, max_chars: int = MESSAGE_MAX_CHARS) -> List[str]:
+    """
+    Quebra texto em mensagens de até max_chars, só em fim de linha.
+    """
+    chunks = ["".join(c).strip() for c in chunk_items(text.splitlines(True), len, max_chars)]  # preserva \n
+    return [c for c in chunks if c]
 
 
 def _normalize_to(to: Union[str, Iterable[str]]) -> List[str]:
@@ -137,14 +371,13 @@ def send_whatsapp_text(*, to: Union[str, Iterable[str]], body: str) -> dict:
         "body": body,
     }
 
-    resp = requests.post(url, json=payload, headers=headers, timeout=25)
+    resp = _post(url, json=payload, headers=headers, timeout=_timeout())
 
     if resp.status_code == 401:
         # token pode ter expirado/invalidado: renova uma vez e tenta novamente
-        signin()
-        token = get_token()
+        token = _refresh_token(bad_token=token)
         headers = _auth_headers(token)
-        resp = requests.post(url, json=payload, headers=headers, timeout=25)
+        resp = _post(url, json=payload, headers=headers, timeout=_timeout())
 
     if resp.status_code in (200, 201):
         try:
@@ -184,14 +417,14 @@ def send_whatsapp_group_file_datauri(*, to_group: str, type_: str, title: str, b
     }
 
     # timeout maior pq base64 pode ser pesado
-    resp = requests.post(url, json=payload, headers=headers, timeout=60)
+    timeout = _timeout("BLIBSEND_FILE_READ_TIMEOUT_SECONDS", "60")
+    resp = _post(url, json=payload, headers=headers, timeout=timeout)
 
     if resp.status_code == 401:
         # token expirou/invalidou: renova 1x e tenta novamente
-        signin()
-        token = get_token()
+        token = _refresh_token(bad_token=token)
         headers = _auth_headers(token)
-        resp = requests.post(url, json=payload, headers=headers, timeout=60)
+        resp = _post(url, json=payload, headers=headers, timeout=timeout)
 
     if resp.status_code in (200, 201):
         try:
@@ -0,0 +1,121 @@
+# app/integrations/blibsend_dispatch.py
+"""
+Envio concorrente de mensagens Blibsend com limite de taxa por destino.
+
+O worker monta a lista de mensagens, dispatch_texts() envia em paralelo
+(BLIBSEND_MAX_CONCURRENCY threads) respeitando um token bucket por destino,
+e devolve os resultados na thread do chamador, conforme forem terminando,
+para o write-back no DB (Session não é thread-safe).
+
+Limites:
+  BLIBSEND_RATE_PER_SECOND=10   (padrão por destino)
+  BLIBSEND_RATE_BURST=20
+  BLIBSEND_RATE_LIMITS="5583999999999=1/3,120363...@g.us=0.2"   (dest=taxa[/burst])
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple, TypeVar
+
+from integrations.blibsend import BlibsendError, send_whatsapp_text
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second: float, burst: float):
+        self.rate = float(rate_per_second)
+        self.capacity = max(1.0, float(burst))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Bloqueia até ter 1 token disponível.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate if self.rate > 0 else 1.0
+            time.sleep(wait)
+
+
+def _parse_limits(raw: str) -> Dict[str, Tuple[float, Optional[float]]]:
+    out = {}
+    for part in (raw or "").split(","):
+        if "=" not in part:
+            continue
+        dest, spec = part.rsplit("=", 1)
+        rate, _, burst = spec.partition("/")
+        try:
+            out[dest.strip()] = (float(rate), float(burst) if burst else None)
+        except ValueError:
+            print(f"[dispatch] BLIBSEND_RATE_LIMITS inválido, ignorando: {part!r}")
+    return out
+
+
+_BUCKETS: Dict[str, TokenBucket] = {}
+_BUCKETS_LOCK = threading.Lock()
+
+
+def bucket_for(dest: str) -> TokenBucket:
+    with _BUCKETS_LOCK:
+        b = _BUCKETS.get(dest)
+        if b is None:
+            rate = float(os.getenv("BLIBSEND_RATE_PER_SECOND", "10"))
+            burst = float(os.getenv("BLIBSEND_RATE_BURST", "20"))
+            override = _parse_limits(os.getenv("BLIBSEND_RATE_LIMITS", "")).get(dest)
+            if override:
+                rate = override[0]
+                burst = override[1] if override[1] is not None else max(1.0, rate)
+            b = _BUCKETS[dest] = TokenBucket(rate, burst)
+        return b
+
+
+def reset_rate_limits() -> None:
+    """
+    Esquece os buckets (relê as envs na próxima mensagem).
+    """
+    with _BUCKETS_LOCK:
+        _BUCKETS.clear()
+
+
+def _send_one(send: Callable[..., dict], to: str, body: str) -> None:
+    bucket_for(to).acquire()
+    try:
+        send(to=to, body=body)
+    except BlibsendError:
+        raise
+    except Exception as e:
+        # erro de rede (requests) vira falha da linha, não derruba o lote
+        raise BlibsendError(f"Erro de comunicação: {e}") from e
+
+
+def dispatch_texts(
+    messages: Sequence[Tuple[T, str, str]],
+    *,
+    send: Callable[..., dict] = send_whatsapp_text,
+    max_workers: Optional[int] = None,
+) -> Iterator[Tuple[T, Optional[BlibsendError]]]:
+    """
+    messages: (ref, to, body). Gera (ref, None) no sucesso ou (ref, erro),
+    na ordem em que os envios terminam.
+    """
+    if not messages:
+        return
+
+    workers = max_workers or int(os.getenv("BLIBSEND_MAX_CONCURRENCY", "8"))
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(messages)))) as pool:
+        futures = {pool.submit(_send_one, send, to, body): ref for ref, to, body in messages}
+        for fut in as_completed(futures):
+            err = fut.exception()
+            yield futures[fut], err
@@ -7,17 +7,19 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
-from infra.db import engine
-from infra.models import Base
+from infra.db import engine, async_reads_enabled
+from infra.schema import check_schema
 
-from api.routers.clients import router as clients_router
-from api.routers.products import router as products_router
-from api.routers.sales import router as sales_router
+from api.routers.clients import router as clients_router, async_router as clients_async_router
+from api.routers.products import router as products_router, async_router as products_async_router
+from api.routers.sales import router as sales_router, async_router as sales_async_router
 from api.routers.promissories import router as promissories_router
-from api.routers.installments import router as installments_router
+from api.routers.installments import router as installments_router, async_router as installments_async_router
 from api.routers.users import router as users_router
 from api.routers.finance import router as finance_router
 from api.routers.auth import router as auth_router
+from api.routers.dashboard import router as dashboard_router
+from api.routers.health import router as health_router
 
 
 # ✅ Em produção (Railway + bucket), NÃO use uploads local.
@@ -31,9 +33,9 @@ app = FastAPI(title="Moto Store API")
 
 @app.on_event("startup")
 def _startup() -> None:
-    print("[startup] creating tables...")
-    Base.metadata.create_all(bind=engine)
-    print("[startup] tables created/checked")
+    # tabelas/índices vêm das migrations (alembic upgrade head); aqui só
+    # confere a revisão, sem inspecionar tabela por tabela
+    check_schema(engine)
 
     # ✅ só cria pasta se for usar uploads local
     if USE_LOCAL_UPLOADS:
@@ -58,9 +60,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
+# ✅ DB_ASYNC_READS=1: GETs de leitura async (AsyncSession/asyncpg). Montados
+# antes dos sync, então a rota async ganha no mesmo método+path (o /docs
+# continua mostrando a sync, que tem os mesmos parâmetros)
+if async_reads_enabled():
+    app.include_router(clients_async_router, prefix="/clients", tags=["clients"], include_in_schema=False)
+    app.include_router(products_async_router, prefix="/products", tags=["products"], include_in_schema=False)
+    app.include_router(sales_async_router, prefix="/sales", tags=["sales"], include_in_schema=False)
+    app.include_router(installments_async_router, prefix="/installments", tags=["installments"], include_in_schema=False)
+
 app.include_router(clients_router, prefix="/clients", tags=["clients"])
 app.include_router(products_router, prefix="/products", tags=["products"])
 app.include_router(sales_router, prefix="/sales", tags=["sales"])
@@ -69,3 +81,5 @@ app.include_router(installments_router, prefix="/installments", tags=["installme
 app.include_router(users_router, prefix="/users", tags=["users"])
 app.include_router(finance_router, prefix="/finance", tags=["finance"])
 app.include_router(auth_router, prefix="/auth", tags=["auth"])
+app.include_router(dashboard_router, prefix="/dashboard", tags=["dashboard"])
+app.include_router(health_router, prefix="/health", tags=["health"])
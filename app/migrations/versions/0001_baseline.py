@@ -0,0 +1,200 @@
+"""baseline: schema criado pelo create_all antes das migrations
+
+Bancos que já existiam (create_all no startup) entram aqui com
+`alembic stamp 0001_baseline` — o init_db.py faz isso sozinho.
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-17
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+ENUMS = (
+    "user_role", "product_status", "payment_type", "sale_status", "promissory_status",
+    "installment_status", "finance_status",
+    "wpp_installment_due_status", "wpp_installment_overdue_status", "wpp_finance_status",
+)
+
+
+def upgrade() -> None:
+    op.create_table('clients',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=140), nullable=False),
+        sa.Column('phone', sa.String(length=11), nullable=False),
+        sa.Column('cpf', sa.String(length=11), nullable=True),
+        sa.Column('address', sa.String(length=255), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_clients_phone', 'clients', ['phone'], unique=False)
+    op.create_table('finance',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('company', sa.String(length=120), nullable=False),
+        sa.Column('amount', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('due_date', sa.Date(), nullable=False),
+        sa.Column('status', sa.Enum('PENDING', 'PAID', 'CANCELED', name='finance_status'), nullable=False),
+        sa.Column('wpp_status', sa.Enum('PENDING', 'SENDING', 'SENT', 'FAILED', name='wpp_finance_status'), nullable=False),
+        sa.Column('wpp_tries', sa.Integer(), nullable=False),
+        sa.Column('wpp_last_error', sa.Text(), nullable=True),
+        sa.Column('wpp_sent_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('wpp_next_retry_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('description', sa.String(length=200), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_finance_due_status', 'finance', ['due_date', 'status'], unique=False)
+    op.create_index('ix_finance_wpp', 'finance', ['wpp_status', 'wpp_next_retry_at'], unique=False)
+    op.create_table('integration_tokens',
+        sa.Column('provider', sa.String(length=50), nullable=False),
+        sa.Column('access_token', sa.Text(), nullable=True),
+        sa.Column('token_type', sa.String(length=20), nullable=True),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('provider')
+    )
+    op.create_table('products',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('brand', sa.String(length=60), nullable=False),
+        sa.Column('model', sa.String(length=80), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('plate', sa.String(length=7), nullable=True),
+        sa.Column('chassi', sa.String(length=30), nullable=False),
+        sa.Column('km', sa.Integer(), nullable=True),
+        sa.Column('color', sa.String(length=30), nullable=False),
+        sa.Column('cost_price', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('sale_price', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('status', sa.Enum('IN_STOCK', 'RESERVED', 'SOLD', name='product_status'), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('chassi'),
+        sa.UniqueConstraint('plate')
+    )
+    op.create_index('ix_products_brand_model', 'products', ['brand', 'model'], unique=False)
+    op.create_index('ix_products_status', 'products', ['status'], unique=False)
+    op.create_table('users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=120), nullable=False),
+        sa.Column('email', sa.String(length=160), nullable=False),
+        sa.Column('password_hash', sa.String(length=255), nullable=False),
+        sa.Column('role', sa.Enum('ADMIN', 'STAFF', name='user_role'), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email', name='uq_users_email')
+    )
+    op.create_table('product_images',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('url', sa.String(length=500), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('product_id', 'position', name='uq_product_images_product_position')
+    )
+    op.create_index('ix_product_images_product_id', 'product_images', ['product_id'], unique=False)
+    op.create_table('sales',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('public_id', sa.String(length=32), nullable=False),
+        sa.Column('client_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('total', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('discount', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('entry_amount', sa.Numeric(precision=12, scale=2), nullable=True),
+        sa.Column('payment_type', sa.Enum('CASH', 'PIX', 'CARD', 'PROMISSORY', name='payment_type'), nullable=False),
+        sa.Column('status', sa.Enum('DRAFT', 'CONFIRMED', 'CANCELED', name='sale_status'), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['client_id'], ['clients.id'], ),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('product_id', name='uq_sales_product_id'),
+        sa.UniqueConstraint('public_id', name='uq_sales_public_id')
+    )
+    op.create_index('ix_sales_payment_type', 'sales', ['payment_type'], unique=False)
+    op.create_index('ix_sales_status', 'sales', ['status'], unique=False)
+    op.create_table('promissories',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('public_id', sa.String(length=32), nullable=False),
+        sa.Column('sale_id', sa.Integer(), nullable=True),
+        sa.Column('client_id', sa.Integer(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=True),
+        sa.Column('total', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('entry_amount', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('status', sa.Enum('DRAFT', 'ISSUED', 'CANCELED', 'PAID', name='promissory_status'), nullable=False),
+        sa.Column('issued_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('snapshot_json', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['client_id'], ['clients.id'], ),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+        sa.ForeignKeyConstraint(['sale_id'], ['sales.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('public_id', name='uq_promissories_public_id'),
+        sa.UniqueConstraint('sale_id', name='uq_promissories_sale_id')
+    )
+    op.create_index('ix_promissories_status', 'promissories', ['status'], unique=False)
+    op.create_table('installments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('promissory_id', sa.Integer(), nullable=False),
+        sa.Column('number', sa.Integer(), nullable=False),
+        sa.Column('due_date', sa.Date(), nullable=False),
+        sa.Column('amount', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('status', sa.Enum('PENDING', 'PAID', 'CANCELED', name='installment_status'), nullable=False),
+        sa.Column('paid_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('paid_amount', sa.Numeric(precision=12, scale=2), nullable=True),
+        sa.Column('note', sa.Text(), nullable=True),
+        sa.Column('wa_due_status', sa.Enum('PENDING', 'SENDING', 'SENT', 'FAILED', name='wpp_installment_due_status'), nullable=False),
+        sa.Column('wa_due_tries', sa.Integer(), nullable=False),
+        sa.Column('wa_due_last_error', sa.Text(), nullable=True),
+        sa.Column('wa_due_sent_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('wa_due_next_retry_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('wa_overdue_status', sa.Enum('PENDING', 'SENDING', 'SENT', 'FAILED', name='wpp_installment_overdue_status'), nullable=False),
+        sa.Column('wa_overdue_tries', sa.Integer(), nullable=False),
+        sa.Column('wa_overdue_last_error', sa.Text(), nullable=True),
+        sa.Column('wa_overdue_sent_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('wa_overdue_next_retry_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['promissory_id'], ['promissories.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('promissory_id', 'number', name='uq_installments_promissory_number')
+    )
+    op.create_index('ix_installments_due', 'installments', ['due_date', 'status'], unique=False)
+    op.create_index('ix_installments_wpp_due', 'installments', ['wa_due_status', 'wa_due_next_retry_at'], unique=False)
+    op.create_index('ix_installments_wpp_overdue', 'installments', ['wa_overdue_status', 'wa_overdue_next_retry_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_installments_wpp_overdue', table_name='installments')
+    op.drop_index('ix_installments_wpp_due', table_name='installments')
+    op.drop_index('ix_installments_due', table_name='installments')
+    op.drop_table('installments')
+    op.drop_index('ix_promissories_status', table_name='promissories')
+    op.drop_table('promissories')
+    op.drop_index('ix_sales_status', table_name='sales')
+    op.drop_index('ix_sales_payment_type', table_name='sales')
+    op.drop_table('sales')
+    op.drop_index('ix_product_images_product_id', table_name='product_images')
+    op.drop_table('product_images')
+    op.drop_table('users')
+    op.drop_index('ix_products_status', table_name='products')
+    op.drop_index('ix_products_brand_model', table_name='products')
+    op.drop_table('products')
+    op.drop_table('integration_tokens')
+    op.drop_index('ix_finance_wpp', table_name='finance')
+    op.drop_index('ix_finance_due_status', table_name='finance')
+    op.drop_table('finance')
+    op.drop_index('ix_clients_phone', table_name='clients')
+    op.drop_table('clients')
+    if op.get_bind().dialect.name == "postgresql":
+        for name in ENUMS:
+            op.execute(f"DROP TYPE IF EXISTS {name}")
@@ -0,0 +1,217 @@
+"""variantes de imagem, job_locks e fila outbound_messages
+
+- product_images: thumb_url / medium_url / offer_url
+- job_locks (trava do job diário entre réplicas do worker)
+- outbound_messages, com os lembretes já ENVIADOS copiados das colunas
+  antigas (o resto o worker enfileira de novo, já renderizado)
+- remove wa_due_* / wa_overdue_* de installments e wpp_* de finance
+
+Idempotente com bancos que já passaram por create_all de versões novas
+(tabela/coluna que já existe é pulada). Por inspecionar o banco, não
+roda em modo offline (--sql).
+
+Revision ID: 0002_outbound_messages
+Revises: 0001_baseline
+Create Date: 2026-10-17
+"""
+from __future__ import annotations
+
+import os
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_outbound_messages"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+SEND_STATUSES = ("PENDING", "SENDING", "SENT", "FAILED")
+
+# (tabela, prefixo das colunas antigas, kind na fila, tipo enum antigo)
+LEGACY_REMINDERS = (
+    ("finance", "wpp_", "finance_due", "wpp_finance_status"),
+    ("installments", "wa_due_", "installment_due_soon", "wpp_installment_due_status"),
+    ("installments", "wa_overdue_", "installment_overdue", "wpp_installment_overdue_status"),
+)
+LEGACY_INDEXES = (
+    ("finance", "ix_finance_wpp"),
+    ("installments", "ix_installments_wpp_due"),
+    ("installments", "ix_installments_wpp_overdue"),
+)
+
+
+def _inspector():
+    return sa.inspect(op.get_bind())
+
+
+def _has_table(name: str) -> bool:
+    return _inspector().has_table(name)
+
+
+def _columns(table: str) -> set:
+    return {c["name"] for c in _inspector().get_columns(table)}
+
+
+def _indexes(table: str) -> set:
+    return {ix["name"] for ix in _inspector().get_indexes(table)}
+
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def upgrade() -> None:
+    existing = _columns("product_images")
+    with op.batch_alter_table("product_images") as batch:
+        for col in ("thumb_url", "medium_url", "offer_url"):
+            if col not in existing:
+                batch.add_column(sa.Column(col, sa.String(length=500), nullable=True))
+
+    if not _has_table("job_locks"):
+        op.create_table(
+            "job_locks",
+            sa.Column("name", sa.String(length=50), nullable=False),
+            sa.Column("done_date", sa.Date(), nullable=True),
+            sa.Column("locked_by", sa.String(length=100), nullable=True),
+            sa.Column("locked_until", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+            sa.PrimaryKeyConstraint("name"),
+        )
+
+    if not _has_table("outbound_messages"):
+        op.create_table(
+            "outbound_messages",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("kind", sa.String(length=40), nullable=False),
+            sa.Column("ref_table", sa.String(length=40), nullable=False),
+            sa.Column("ref_id", sa.Integer(), nullable=False),
+            sa.Column("recipient", sa.String(length=80), nullable=False),
+            sa.Column("body", sa.Text(), nullable=False),
+            sa.Column(
+                "status",
+                sa.Enum(*SEND_STATUSES, "CANCELED", name="outbound_status"),
+                nullable=False,
+            ),
+            sa.Column("tries", sa.Integer(), nullable=False),
+            sa.Column("last_error", sa.Text(), nullable=True),
+            sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("claimed_by", sa.String(length=100), nullable=True),
+            sa.Column("claimed_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("kind", "ref_table", "ref_id", name="uq_outbound_messages_ref"),
+        )
+        # tabela nova: índice da fila direto, sem CONCURRENTLY
+        if _is_postgres():
+            op.create_index(
+                "ix_outbound_messages_pending", "outbound_messages", ["next_attempt_at"],
+                postgresql_where=sa.text("status IN ('PENDING', 'SENDING', 'FAILED')"),
+            )
+        else:
+            op.create_index(
+                "ix_outbound_messages_status_kind", "outbound_messages", ["status", "kind", "next_attempt_at"],
+            )
+
+    _backfill_sent_reminders()
+    _drop_legacy_columns()
+
+
+def _backfill_sent_reminders() -> None:
+    """
+    Lembrete já ENVIADO vira linha SENT na fila, senão o produtor mandaria
+    de novo. FAILED/PENDING/SENDING ficam de fora: o worker re-enfileira.
+    """
+    sent = "CAST('SENT' AS outbound_status)" if _is_postgres() else "'SENT'"
+    to = os.getenv("BLIBSEND_DEFAULT_TO", "").strip()
+
+    for table, prefix, kind, _ in LEGACY_REMINDERS:
+        if f"{prefix}status" not in _columns(table):
+            continue
+        op.get_bind().execute(
+            sa.text(
+                f"""
+                INSERT INTO outbound_messages
+                    (kind, ref_table, ref_id, recipient, body, status, tries, next_attempt_at, sent_at)
+                SELECT :kind, :ref_table, t.id, :to, '', {sent}, COALESCE(t.{prefix}tries, 0),
+                       COALESCE(t.{prefix}sent_at, CURRENT_TIMESTAMP), t.{prefix}sent_at
+                FROM {table} t
+                WHERE t.{prefix}status = 'SENT'
+                  AND NOT EXISTS (
+                    SELECT 1 FROM outbound_messages m
+                    WHERE m.kind = :kind AND m.ref_table = :ref_table AND m.ref_id = t.id
+                  )
+                """
+            ),
+            {"kind": kind, "ref_table": table, "to": to},
+        )
+
+
+def _drop_legacy_columns() -> None:
+    for table, index in LEGACY_INDEXES:
+        if index in _indexes(table):
+            op.drop_index(index, table_name=table)
+
+    for table in ("finance", "installments"):
+        existing = _columns(table)
+        legacy = [
+            f"{prefix}{col}"
+            for t, prefix, _, _ in LEGACY_REMINDERS if t == table
+            for col in ("status", "tries", "last_error", "sent_at", "next_retry_at", "claimed_at")
+            if f"{prefix}{col}" in existing
+        ]
+        if legacy:
+            with op.batch_alter_table(table) as batch:
+                for col in legacy:
+                    batch.drop_column(col)
+
+    if _is_postgres():
+        for _, _, _, enum_name in LEGACY_REMINDERS:
+            op.execute(f"DROP TYPE IF EXISTS {enum_name}")
+
+
+def downgrade() -> None:
+    """
+    Volta as colunas antigas (estado SENT recuperado da fila) e remove as
+    tabelas novas.
+    """
+    postgres = _is_postgres()
+    for table, prefix, kind, enum_name in LEGACY_REMINDERS:
+        status = sa.Enum(*SEND_STATUSES, name=enum_name)
+        if postgres:
+            status.create(op.get_bind(), checkfirst=True)
+        with op.batch_alter_table(table) as batch:
+            batch.add_column(sa.Column(f"{prefix}status", status, nullable=False, server_default="PENDING"))
+            batch.add_column(sa.Column(f"{prefix}tries", sa.Integer(), nullable=False, server_default="0"))
+            batch.add_column(sa.Column(f"{prefix}last_error", sa.Text(), nullable=True))
+            batch.add_column(sa.Column(f"{prefix}sent_at", sa.DateTime(timezone=True), nullable=True))
+            batch.add_column(sa.Column(f"{prefix}next_retry_at", sa.DateTime(timezone=True), nullable=True))
+
+        op.get_bind().execute(
+            sa.text(
+                f"""
+                UPDATE {table} SET {prefix}status = 'SENT', {prefix}sent_at = (
+                    SELECT m.sent_at FROM outbound_messages m
+                    WHERE m.kind = :kind AND m.ref_table = :ref_table AND m.ref_id = {table}.id
+                )
+                WHERE id IN (
+                    SELECT ref_id FROM outbound_messages
+                    WHERE kind = :kind AND ref_table = :ref_table AND status = 'SENT'
+                )
+                """
+            ),
+            {"kind": kind, "ref_table": table},
+        )
+
+    op.create_index("ix_finance_wpp", "finance", ["wpp_status", "wpp_next_retry_at"])
+    op.create_index("ix_installments_wpp_due", "installments", ["wa_due_status", "wa_due_next_retry_at"])
+    op.create_index("ix_installments_wpp_overdue", "installments", ["wa_overdue_status", "wa_overdue_next_retry_at"])
+
+    op.drop_table("outbound_messages")
+    op.drop_table("job_locks")
+    with op.batch_alter_table("product_images") as batch:
+        for col in ("thumb_url", "medium_url", "offer_url"):
+            batch.drop_column(col)
+    if postgres:
+        op.execute("DROP TYPE IF EXISTS outbound_status")
@@ -0,0 +1,83 @@
+"""índices das listagens e do worker, criados sem travar as tabelas
+
+No Postgres sai CREATE INDEX CONCURRENTLY (fora da transação da
+migration): a API continua gravando em sales/installments/finance
+durante o build. Se um build concorrente falhar ele deixa um índice
+INVALID; o upgrade seguinte derruba e recria.
+
+No SQLite (dev/testes) são índices comuns, com os fallbacks compostos no
+lugar dos parciais.
+
+Revision ID: 0003_online_indexes
+Revises: 0002_outbound_messages
+Create Date: 2026-10-17
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_online_indexes"
+down_revision = "0002_outbound_messages"
+branch_labels = None
+depends_on = None
+
+PENDING = sa.text("status = 'PENDING'")
+
+# (nome, tabela, colunas, WHERE do parcial no Postgres)
+COMMON_INDEXES = (
+    ("ix_sales_created_at_id", "sales", ["created_at", "id"], None),
+    ("ix_promissories_client_id", "promissories", ["client_id"], None),
+)
+POSTGRES_INDEXES = (
+    ("ix_installments_pending_due", "installments", ["due_date"], PENDING),
+    ("ix_finance_pending_due", "finance", ["due_date"], PENDING),
+)
+SQLITE_INDEXES = (
+    ("ix_installments_status_due", "installments", ["status", "due_date"], None),
+    ("ix_finance_status_due", "finance", ["status", "due_date"], None),
+)
+
+
+def _indexes() -> tuple:
+    if op.get_bind().dialect.name == "postgresql":
+        return COMMON_INDEXES + POSTGRES_INDEXES
+    return COMMON_INDEXES + SQLITE_INDEXES
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        for name, table, cols, _ in _indexes():
+            op.create_index(name, table, cols, if_not_exists=True)
+        return
+
+    with op.get_context().autocommit_block():
+        for name, table, cols, where in _indexes():
+            # build concorrente que falhou antes deixa o índice INVALID
+            invalid = op.get_bind().execute(
+                sa.text(
+                    "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                    "WHERE c.relname = :name AND NOT i.indisvalid"
+                ),
+                {"name": name},
+            ).first()
+            if invalid:
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
+            op.create_index(
+                name, table, cols,
+                postgresql_where=where,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    postgres = op.get_bind().dialect.name == "postgresql"
+    if not postgres:
+        for name, table, _, _ in _indexes():
+            op.drop_index(name, table_name=table, if_exists=True)
+        return
+
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in _indexes():
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
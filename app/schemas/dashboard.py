@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from pydantic import BaseModel
+from typing import Optional, Dict
+from decimal import Decimal
+from datetime import date
+
+
+class AmountBucket(BaseModel):
+    count: int = 0
+    amount: Decimal = Decimal("0.00")
+
+
+class ProductsSummary(BaseModel):
+    total: int = 0
+    by_status: Dict[str, int] = {}
+    stock_value: Decimal = Decimal("0.00")  # soma de sale_price dos IN_STOCK
+
+
+class SalesSummary(BaseModel):
+    total: int = 0
+    by_status: Dict[str, int] = {}
+    by_payment_type: Dict[str, AmountBucket] = {}
+    revenue_confirmed: Decimal = Decimal("0.00")
+    discount_sum: Decimal = Decimal("0.00")
+    entry_sum: Decimal = Decimal("0.00")
+
+
+class PromissoriesSummary(BaseModel):
+    total: int = 0
+    by_status: Dict[str, int] = {}
+
+
+class InstallmentsSummary(BaseModel):
+    total: int = 0
+    by_status: Dict[str, int] = {}
+    pending_amount: Decimal = Decimal("0.00")
+    paid_amount: Decimal = Decimal("0.00")
+    overdue: AmountBucket = AmountBucket()
+
+
+class FinanceSummary(BaseModel):
+    pending: AmountBucket = AmountBucket()
+    overdue: AmountBucket = AmountBucket()
+    paid: AmountBucket = AmountBucket()
+
+
+class DashboardSummaryOut(BaseModel):
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    today: date
+
+    clients_total: int = 0
+    products: ProductsSummary
+    sales: SalesSummary
+    promissories: PromissoriesSummary
+    installments: InstallmentsSummary
+
+    # só ADMIN (mesma regra do router /finance)
+    finance: Optional[FinanceSummary] = None
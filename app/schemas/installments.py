@@ -17,3 +17,41 @@ class InstallmentOut(BaseModel):
 
 class InstallmentPay(BaseModel):
     paid_amount: Optional[Decimal] = Field(default=None, ge=0)
+
+
+# expansões opcionais (?include=promissory,client,product)
+class InstallmentPromissoryOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    public_id: str
+    status: str
+    total: Decimal
+    entry_amount: Decimal
+    client_id: int
+    product_id: Optional[int]
+    sale_id: Optional[int]
+
+
+class InstallmentClientOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    name: str
+    phone: str
+    cpf: Optional[str]
+
+
+class InstallmentProductOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    brand: str
+    model: str
+    year: int
+    plate: Optional[str]
+    chassi: str
+    color: str
+
+
+class InstallmentExpandedOut(InstallmentOut):
+    promissory: Optional[InstallmentPromissoryOut] = None
+    client: Optional[InstallmentClientOut] = None
+    product: Optional[InstallmentProductOut] = None
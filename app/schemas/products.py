@@ -42,6 +42,8 @@ class ProductImageOut(BaseModel):
 
     id: int
     url: str
+    thumb_url: Optional[str] = None   # listagem
+    medium_url: Optional[str] = None  # detalhe
     position: int
 
 
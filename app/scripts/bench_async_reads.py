@@ -0,0 +1,152 @@
+# scripts/bench_async_reads.py
+"""
+Carga nos GETs de leitura (produtos, detalhe de produto, clientes, vendas,
+parcelas): routers sync (threadpool + Session) x async (AsyncSession).
+BENCH_CONCURRENCY clientes (padrão 200) disparando juntos; mede req/s e
+p50/p99. Roda a API em processo (httpx + ASGITransport), com auth real (JWT).
+
+  python -m scripts.bench_async_reads
+  BENCH_DATABASE_URL=postgresql+psycopg2://... python -m scripts.bench_async_reads
+
+Sem BENCH_DATABASE_URL usa SQLite em arquivo temporário (aiosqlite no
+async, que também usa thread: serve para conferir o caminho, não para
+comparar). A base é recriada.
+
+No modo sync, com mais requests em voo que conexões no pool, o request
+segura a conexão entre uma dependência e outra esperando thread livre,
+enquanto as threads esperam conexão: trava até o pool_timeout (10s) e
+vira 500. Aparece em `errors` e no p99.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import tempfile
+import time
+
+from scripts.bench_common import make_session_factory, seed
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from api import deps
+from api.routers import clients, installments, products, sales
+from infra.models import Base
+from infra.pool import engine_options
+from services.jwt_service import create_access_token
+
+ROUTERS = {"clients": clients, "products": products, "sales": sales, "installments": installments}
+PATHS = (
+    "/products?limit=20",
+    "/products/{product_id}",
+    "/clients?limit=50",
+    "/sales?page_size=20",
+    "/installments?order=due_date&limit=50",
+)
+
+
+def _urls() -> tuple[str, str]:
+    url = os.getenv("BENCH_DATABASE_URL", "").strip()
+    if not url:
+        url = f"sqlite+pysqlite:///{tempfile.mkdtemp()}/bench_async_reads.db"
+    u = make_url(url)
+    driver = "asyncpg" if u.get_backend_name() == "postgresql" else "aiosqlite"
+    return url, u.set(drivername=f"{u.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+def _pool_options(url: str, *, is_async: bool) -> dict:
+    opts = engine_options(url, is_async=is_async)
+    if make_url(url).get_backend_name() == "sqlite":
+        # mesmos padrões do Postgres (20+20, timeout 10s) nos dois modos
+        opts.update(pool_size=20, max_overflow=20, pool_timeout=10)
+    return opts
+
+
+def _build_app(mode: str, sync_url: str, async_url: str) -> FastAPI:
+    app = FastAPI()
+    for name, mod in ROUTERS.items():
+        app.include_router(mod.async_router if mode == "async" else mod.router, prefix=f"/{name}")
+
+    if mode == "async":
+        factory = async_sessionmaker(create_async_engine(async_url, **_pool_options(async_url, is_async=True)),
+                                     expire_on_commit=False)
+
+        async def _get_async_db():
+            async with factory() as db:
+                yield db
+
+        app.dependency_overrides[deps.AsyncDBSession.dependency] = _get_async_db
+    else:
+        factory = make_session_factory(create_engine(sync_url, **_pool_options(sync_url, is_async=False)))
+
+        def _get_db():
+            with factory() as db:
+                yield db
+
+        app.dependency_overrides[deps.DBSession.dependency] = _get_db
+    return app
+
+
+async def _load(app: FastAPI, token: str, *, concurrency: int, per_client: int) -> dict:
+    latencies: list = []
+    errors = 0
+    # erro da app (ex.: timeout do pool) vira 500 e entra em `errors`
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                 headers={"Authorization": f"Bearer {token}"}) as client:
+
+        async def worker(n: int) -> None:
+            nonlocal errors
+            for i in range(per_client):
+                path = PATHS[(n + i) % len(PATHS)].format(product_id=1 + (n * per_client + i) % 200)
+                t0 = time.perf_counter()
+                r = await client.get(path)
+                latencies.append((time.perf_counter() - t0) * 1000)
+                if r.status_code != 200:
+                    errors += 1
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+    return {
+        "req_s": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "errors": errors,
+    }
+
+
+def main() -> None:
+    concurrency = int(os.getenv("BENCH_CONCURRENCY", "200"))
+    per_client = int(os.getenv("BENCH_REQUESTS_PER_CLIENT", "10"))
+    sync_url, async_url = _urls()
+
+    engine = create_engine(sync_url, future=True)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with make_session_factory(engine)() as db:
+        user = seed(db)
+        token = create_access_token(sub=str(user.id), role=user.role.value)
+    engine.dispose()
+
+    print(f"[{make_url(sync_url).get_backend_name()}] {concurrency} clientes x {per_client} GETs")
+    for mode in ("sync", "async"):
+        app = _build_app(mode, sync_url, async_url)
+
+        async def run() -> dict:
+            # aquece pool/caches no mesmo loop (conexão asyncpg é presa ao loop)
+            await _load(app, token, concurrency=10, per_client=2)
+            return await _load(app, token, concurrency=concurrency, per_client=per_client)
+
+        stats = asyncio.run(run())
+        print(f"{mode:5s}: " + " ".join(f"{k}={v:.1f}" if isinstance(v, float) else f"{k}={v}" for k, v in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
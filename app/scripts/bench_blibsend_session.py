@@ -0,0 +1,72 @@
+# scripts/bench_blibsend_session.py
+"""
+Latência por mensagem (send_whatsapp_text, serial) contra um Blibsend falso
+em HTTPS local: requests.post solto (conexão + TLS nova a cada envio)
+x Session compartilhada (keep-alive).
+
+Precisa do openssl no PATH para gerar o certificado de teste.
+
+  python -m scripts.bench_blibsend_session
+"""
+from __future__ import annotations
+
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+
+import requests
+
+from scripts.bench_common import measure, fmt
+from scripts.fake_blibsend import FakeBlibsend
+
+from integrations import blibsend
+
+MESSAGES = 200
+
+
+def _self_signed(folder: Path) -> tuple[str, str]:
+    cert, key = folder / "cert.pem", folder / "key.pem"
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+            "-keyout", str(key), "-out", str(cert),
+            "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return str(cert), str(key)
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        tls = _self_signed(Path(tmp))
+        os.environ["REQUESTS_CA_BUNDLE"] = tls[0]
+
+        with FakeBlibsend(tls=tls) as fake:
+            def send() -> None:
+                blibsend.send_whatsapp_text(to="5583999999999", body="teste")
+
+            shared_post = blibsend._post
+            blibsend.get_token()  # signin fora da medição
+
+            # comportamento antigo: requests.post cria Session/conexão por chamada
+            blibsend._post = lambda url, **kw: requests.post(url, **kw)
+            before = fake.connections
+            old = measure(send, repeat=MESSAGES, warmup=5)
+            old_conns = fake.connections - before
+
+            blibsend._post = shared_post
+            blibsend.reset_http_session()
+            before = fake.connections
+            new = measure(send, repeat=MESSAGES, warmup=5)
+            new_conns = fake.connections - before
+
+    print(f"{MESSAGES} mensagens em HTTPS local (sem latência artificial)")
+    print(f"requests.post    : {fmt(old)}  conexões={old_conns}")
+    print(f"Session (reuso)  : {fmt(new)}  conexões={new_conns}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+# scripts/bench_common.py
+"""
+Helpers compartilhados pelos benchmarks (scripts/bench_*.py).
+
+Rodar de dentro de app/:
+  python -m scripts.bench_dashboard
+"""
+from __future__ import annotations
+
+import os
+import statistics
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Callable
+
+# config.Settings exige DATABASE_URL; os benchmarks usam SQLite em memória
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+# presign é só assinatura local (não faz rede), então um endpoint fake serve
+os.environ.setdefault("S3_ENDPOINT", "http://127.0.0.1:9000")
+os.environ.setdefault("S3_ACCESS_KEY_ID", "bench")
+os.environ.setdefault("S3_SECRET_ACCESS_KEY", "bench-secret")
+os.environ.setdefault("S3_BUCKET", "bench")
+# o SQLite em memória do infra.db não tem as tabelas: token do Blibsend fica só em memória
+os.environ.setdefault("BLIBSEND_TOKEN_PERSIST", "0")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import StaticPool
+
+from infra.models import (
+    Base,
+    UserORM,
+    UserRole,
+    ClientORM,
+    ProductORM,
+    ProductImageORM,
+    ProductStatus,
+    SaleORM,
+    SaleStatus,
+    PaymentType,
+    PromissoryORM,
+    PromissoryStatus,
+    InstallmentORM,
+    InstallmentStatus,
+    FinanceORM,
+    FinanceStatus,
+)
+
+
+def make_sqlite_engine():
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+        future=True,
+    )
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def make_session_factory(engine):
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
+
+
+def seed(
+    db: Session,
+    *,
+    clients: int = 200,
+    products: int = 500,
+    images_per_product: int = 4,
+    promissory_sales: int = 200,
+    installments_per_promissory: int = 24,
+    finance_rows: int = 100,
+) -> UserORM:
+    """
+    Popula o banco com um volume parecido com produção.
+    Retorna o usuário ADMIN usado nas requisições.
+    """
+    user = UserORM(name="Bench", email="bench@bench.com", password_hash="x", role=UserRole.ADMIN)
+    db.add(user)
+
+    cl = [ClientORM(name=f"Cliente {i}", phone=f"8399{i:07d}") for i in range(clients)]
+    db.add_all(cl)
+
+    prods = []
+    for i in range(products):
+        p = ProductORM(
+            brand="Honda",
+            model=f"CG {i}",
+            year=2024,
+            chassi=f"CH{i:010d}",
+            color="Preta",
+            cost_price=Decimal("10000.00"),
+            sale_price=Decimal("12500.00"),
+            status=ProductStatus.IN_STOCK,
+        )
+        p.images = [
+            ProductImageORM(url=f"products/{i}/{n}.jpg", position=n)
+            for n in range(1, images_per_product + 1)
+        ]
+        prods.append(p)
+    db.add_all(prods)
+    db.flush()
+
+    today = date.today()
+    for i in range(min(promissory_sales, products)):
+        p = prods[i]
+        p.status = ProductStatus.SOLD
+        sale = SaleORM(
+            public_id=f"VEN-{i:08d}",
+            client_id=cl[i % clients].id,
+            user_id=user.id,
+            product_id=p.id,
+            total=Decimal("12000.00"),
+            discount=Decimal("0.00"),
+            entry_amount=Decimal("2000.00"),
+            payment_type=PaymentType.PROMISSORY,
+            status=SaleStatus.CONFIRMED,
+        )
+        prom = PromissoryORM(
+            public_id=f"PROM-{i:08d}",
+            sale=sale,
+            client_id=sale.client_id,
+            product_id=p.id,
+            total=sale.total,
+            entry_amount=Decimal("2000.00"),
+            status=PromissoryStatus.ISSUED,
+        )
+        start = today - timedelta(days=30 * (installments_per_promissory // 2))
+        prom.installments = [
+            InstallmentORM(
+                number=n,
+                due_date=start + timedelta(days=30 * n),
+                amount=Decimal("416.67"),
+                status=InstallmentStatus.PAID if n < installments_per_promissory // 3 else InstallmentStatus.PENDING,
+            )
+            for n in range(1, installments_per_promissory + 1)
+        ]
+        db.add_all([sale, prom])
+
+    db.add_all([
+        FinanceORM(
+            company=f"Fornecedor {i}",
+            amount=Decimal("1500.00"),
+            due_date=today + timedelta(days=i - finance_rows // 2),
+            status=FinanceStatus.PENDING,
+        )
+        for i in range(finance_rows)
+    ])
+
+    db.commit()
+    return user
+
+
+def make_api_client(engine, user: UserORM):
+    """
+    TestClient da API com get_db apontando pro engine do benchmark
+    e autenticação resolvida para `user` (sem JWT).
+    """
+    from fastapi.testclient import TestClient
+
+    from main import app
+    from infra.db import get_db
+    from api.auth_deps import get_current_user
+
+    factory = make_session_factory(engine)
+
+    def _override_get_db():
+        db = factory()
+        try:
+            yield db
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = _override_get_db
+    app.dependency_overrides[get_current_user] = lambda: user
+    return TestClient(app)
+
+
+def measure(fn: Callable[[], object], *, repeat: int = 20, warmup: int = 2) -> dict:
+    """
+    Executa fn `repeat` vezes e devolve estatísticas em ms.
+    """
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+
+    samples.sort()
+    return {
+        "mean_ms": statistics.fmean(samples),
+        "p50_ms": samples[len(samples) // 2],
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+
+
+def fmt(stats: dict) -> str:
+    return " ".join(f"{k}={v:.2f}" for k, v in stats.items())
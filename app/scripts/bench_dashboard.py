@@ -0,0 +1,41 @@
+# scripts/bench_dashboard.py
+"""
+Compara o carregamento do dashboard:
+  - antes: 5 listagens (clients, products, sales, promissories, installments)
+  - depois: GET /dashboard/summary
+
+  python -m scripts.bench_dashboard
+"""
+from __future__ import annotations
+
+from scripts.bench_common import make_sqlite_engine, make_session_factory, seed, make_api_client, measure, fmt
+
+FIVE_CALLS = ["/clients", "/products", "/sales", "/promissories", "/installments"]
+
+
+def main() -> None:
+    engine = make_sqlite_engine()
+    with make_session_factory(engine)() as db:
+        user = seed(db)
+
+    client = make_api_client(engine, user)
+
+    def five_calls() -> int:
+        total = 0
+        for path in FIVE_CALLS:
+            r = client.get(path)
+            r.raise_for_status()
+            total += len(r.content)
+        return total
+
+    def summary() -> int:
+        r = client.get("/dashboard/summary")
+        r.raise_for_status()
+        return len(r.content)
+
+    print(f"five calls : bytes={five_calls()} {fmt(measure(five_calls))}")
+    print(f"summary    : bytes={summary()} {fmt(measure(summary))}")
+
+
+if __name__ == "__main__":
+    main()
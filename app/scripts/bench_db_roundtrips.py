@@ -0,0 +1,141 @@
+# scripts/bench_db_roundtrips.py
+"""
+Round trips ao banco por tipo de request: get_db antigo (commit no fim de
+todo request) x atual (commit só se gravou; GETs em sessão só leitura).
+
+  python -m scripts.bench_db_roundtrips
+  BENCH_DATABASE_URL=postgresql+psycopg2://... python -m scripts.bench_db_roundtrips
+
+Conta como no psycopg2: BEGIN é uma ida ao servidor (sai junto do 1º
+statement), cada statement outra, COMMIT/ROLLBACK outra. O ROLLBACK do
+pool na devolução da conexão não conta: sem transação aberta o psycopg2
+não manda nada. Sem BENCH_DATABASE_URL usa SQLite em arquivo temporário
+(a contagem é a mesma; só o BEGIN READ ONLY não existe lá).
+
+Auth em dois cenários: token recente (role do JWT, sem banco) e cache
+frio (AUTH_USER_CACHE_TTL_SECONDS=0: lê o usuário a cada request).
+
+Os totais empatam: a Session já não abria conexão em 401/422 e o COMMIT
+que saiu das leituras virou o ROLLBACK do close (uma ida cada). O ganho é
+não commitar leitura: GET roda em BEGIN READ ONLY e pode ir para réplica.
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+from collections import Counter
+
+from scripts.bench_common import make_session_factory, seed
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+
+import infra.db as db_module
+from api import deps
+from api.routers import clients
+from infra.models import Base
+from services.auth_cache import USER_CACHE
+from services.jwt_service import create_access_token
+
+REQUESTS = (
+    ("401 token inválido", "GET", "/clients?limit=50", None, "bad"),
+    ("422 payload inválido", "POST", "/clients", {}, None),
+    ("GET lista", "GET", "/clients?limit=50", None, None),
+    ("GET detalhe", "GET", "/clients/1", None, None),
+    ("GET detalhe 404", "GET", "/clients/999999", None, None),
+    ("POST cria", "POST", "/clients", "new", None),
+)
+
+
+class RoundTrips:
+    def __init__(self, engine) -> None:
+        self.counts: Counter = Counter()
+        event.listen(engine, "begin", lambda conn: self.counts.update(["begin"]))
+        event.listen(engine, "before_cursor_execute", lambda *a: self.counts.update(["stmt"]))
+        event.listen(engine, "commit", lambda conn: self.counts.update(["commit"]))
+        event.listen(engine, "rollback", lambda conn: self.counts.update(["rollback"]))
+
+    def take(self) -> Counter:
+        out, self.counts = self.counts, Counter()
+        return out
+
+
+def _old_get_db(factory):
+    # como era antes: commit no fim de todo request
+    def get_db():
+        db = factory()
+        try:
+            yield db
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    return get_db
+
+
+def _build_app(mode: str, engine) -> FastAPI:
+    app = FastAPI()
+    app.include_router(clients.router, prefix="/clients")
+
+    if mode == "antes":
+        app.dependency_overrides[deps.DBSession.dependency] = _old_get_db(make_session_factory(engine))
+    else:
+        # get_db de verdade, com as sessions no engine do bench
+        write = make_session_factory(engine)
+        db_module.track_writes(write)
+        db_module.SessionLocal = write
+        db_module.ReadSessionLocal = make_session_factory(engine.execution_options(postgresql_readonly=True))
+    return app
+
+
+def _fmt(c: Counter) -> str:
+    total = sum(c.values())
+    parts = " ".join(f"{k}={c[k]}" for k in ("begin", "stmt", "commit", "rollback") if c[k])
+    return f"{total:2d} ({parts or '-'})"
+
+
+def main() -> None:
+    url = os.getenv("BENCH_DATABASE_URL", "").strip()
+    if not url:
+        url = f"sqlite+pysqlite:///{tempfile.mkdtemp()}/bench_roundtrips.db"
+
+    engine = create_engine(url, future=True)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with make_session_factory(engine)() as db:
+        user = seed(db, products=10, promissory_sales=0, finance_rows=0)
+        token = create_access_token(sub=str(user.id), role=user.role.value)
+
+    trips = RoundTrips(engine)
+    results: dict = {}
+    seq = 0
+    for auth in ("token recente", "cache frio"):
+        # TTL 0 desliga cache e claim do token: toda request lê o usuário
+        USER_CACHE.ttl_seconds = 0 if auth == "cache frio" else 60
+        for mode in ("antes", "depois"):
+            USER_CACHE.clear()
+            client = TestClient(_build_app(mode, engine))
+            for name, method, path, body, tok in REQUESTS:
+                if body == "new":
+                    seq += 1
+                    body = {"name": f"Bench {mode} {seq}", "phone": f"8398{seq:07d}"}
+                headers = {"Authorization": f"Bearer {'x.y.z' if tok == 'bad' else token}"}
+                trips.take()
+                client.request(method, path, json=body, headers=headers)
+                results[(auth, name, mode)] = trips.take()
+
+    print(f"[{make_url(url).get_backend_name()}] round trips por request")
+    for auth in ("token recente", "cache frio"):
+        print(f"\nauth: {auth}")
+        print(f"  {'request':22s} {'antes':32s} depois")
+        for name, *_ in REQUESTS:
+            print(f"  {name:22s} {_fmt(results[(auth, name, 'antes')]):32s} {_fmt(results[(auth, name, 'depois')])}")
+
+
+if __name__ == "__main__":
+    main()
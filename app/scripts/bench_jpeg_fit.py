@@ -0,0 +1,108 @@
+# scripts/bench_jpeg_fit.py
+"""
+Encoder da oferta: loop antigo (decodifica inteiro, qualidade -10 até caber)
+x novo (draft + bisseção com miniatura de estimativa).
+
+Usa as fotos de BENCH_IMAGES_DIR (jpg/png/webp) se existir; senão gera
+um corpus sintético com textura parecida com foto de celular.
+
+  BENCH_IMAGES_DIR=~/fotos-motos python -m scripts.bench_jpeg_fit
+"""
+from __future__ import annotations
+
+import io
+import os
+import random
+import time
+from pathlib import Path
+
+from PIL import Image
+
+from services.image_pipeline import open_image, fit, fit_jpeg
+
+MAX_DIM = 1280
+QUALITY = 70
+TARGETS = (850_000, 250_000, 120_000)
+
+
+def _synthetic(seed: int, size) -> bytes:
+    rnd = random.Random(seed)
+    w, h = size
+    small = Image.new("RGB", (w // 40, h // 40))
+    small.putdata([(rnd.randrange(256), rnd.randrange(256), rnd.randrange(256)) for _ in range(small.width * small.height)])
+    base = small.resize(size, Image.BICUBIC)
+    grain = Image.effect_noise(size, 40 + seed * 5).convert("RGB")
+    img = Image.blend(base, grain, 0.25)
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=92)
+    return buf.getvalue()
+
+
+def load_corpus() -> list[tuple[str, bytes]]:
+    folder = os.getenv("BENCH_IMAGES_DIR", "").strip()
+    if folder:
+        files = sorted(
+            p for p in Path(folder).expanduser().iterdir()
+            if p.suffix.lower() in (".jpg", ".jpeg", ".png", ".webp")
+        )
+        return [(p.name, p.read_bytes()) for p in files]
+
+    sizes = [(4000, 3000), (3000, 4000), (4032, 2268), (1600, 1200)]
+    return [(f"sintetica-{i}-{w}x{h}", _synthetic(i, (w, h))) for i, (w, h) in enumerate(sizes * 2)]
+
+
+def legacy(raw: bytes, max_bytes: int) -> tuple[bytes, int]:
+    # cópia do image_bytes_to_data_uri_jpeg_optimized antigo
+    with Image.open(io.BytesIO(raw)) as img:
+        img = img.convert("RGB")
+        w, h = img.size
+        scale = min(1.0, MAX_DIM / float(max(w, h)))
+        if scale < 1.0:
+            img = img.resize((int(w * scale), int(h * scale)))
+        q, encodes = QUALITY, 0
+        while True:
+            buf = io.BytesIO()
+            img.save(buf, format="JPEG", quality=q, optimize=True)
+            encodes += 1
+            out = buf.getvalue()
+            if len(out) <= max_bytes or q <= 35:
+                return out, encodes
+            q -= 10
+
+
+def new(raw: bytes, max_bytes: int) -> tuple[bytes, int, int]:
+    img = fit(open_image(io.BytesIO(raw), max_dim=MAX_DIM), MAX_DIM)
+    r = fit_jpeg(img, quality=QUALITY, max_bytes=max_bytes)
+    return r.content, r.encodes, r.probe_encodes
+
+
+def main() -> None:
+    corpus = load_corpus()
+    print(f"corpus: {len(corpus)} imagens ({sum(len(b) for _, b in corpus) / 1e6:.1f} MB)")
+
+    for target in TARGETS:
+        t0 = time.perf_counter()
+        old = [legacy(raw, target) for _, raw in corpus]
+        t_old = (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        cur = [new(raw, target) for _, raw in corpus]
+        t_new = (time.perf_counter() - t0) * 1000
+
+        n = len(corpus)
+        print(f"\nmax_bytes={target}")
+        print(
+            f"  antigo: {t_old / n:7.1f} ms/img  encodes/img={sum(e for _, e in old) / n:.2f}  "
+            f"bytes médio={sum(len(b) for b, _ in old) / n:,.0f}  "
+            f"estouraram={sum(len(b) > target for b, _ in old)}"
+        )
+        print(
+            f"  novo  : {t_new / n:7.1f} ms/img  encodes/img={sum(e for _, e, _ in cur) / n:.2f} "
+            f"(+{sum(p for _, _, p in cur) / n:.2f} miniatura)  "
+            f"bytes médio={sum(len(b) for b, _, _ in cur) / n:,.0f}  "
+            f"estouraram={sum(len(b) > target for b, _, _ in cur)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# scripts/bench_offers.py
+"""
+Duração do lote da oferta diária (process_daily_product_offers) com o
+cache de payloads frio e quente. Bucket e Blibsend são simulados: o
+download custa BENCH_BUCKET_LATENCY_MS e o envio não faz nada.
+
+  python -m scripts.bench_offers
+"""
+from __future__ import annotations
+
+import io
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("OFFERS_SEND_INTERVAL_SECONDS", "0")
+os.environ.setdefault("OFFERS_MAX_PER_DAY", "20")
+
+from PIL import Image
+
+from scripts.bench_common import make_sqlite_engine, make_session_factory, seed
+
+import worker
+from services.offer_assets import OfferAssetCache
+
+
+def _photo(seed_: int, size=(3000, 2000)) -> bytes:
+    # ruído em blocos: comprime parecido com foto real (bem pior que cor sólida)
+    rnd = random.Random(seed_)
+    small = Image.new("RGB", (size[0] // 8, size[1] // 8))
+    small.putdata([(rnd.randrange(256), rnd.randrange(256), rnd.randrange(256)) for _ in range(small.width * small.height)])
+    buf = io.BytesIO()
+    small.resize(size, Image.BILINEAR).save(buf, format="JPEG", quality=92)
+    return buf.getvalue()
+
+
+def main() -> None:
+    latency = float(os.getenv("BENCH_BUCKET_LATENCY_MS", "40")) / 1000
+    photos = [_photo(i) for i in range(4)]
+
+    def fake_get_bytes(key: str) -> bytes:
+        time.sleep(latency)
+        return photos[hash(key) % len(photos)]
+
+    worker.get_bytes = fake_get_bytes
+    worker.send_whatsapp_group_file_datauri = lambda **kw: {"ok": True}
+
+    engine = make_sqlite_engine()
+    SessionLocal = make_session_factory(engine)
+    with SessionLocal() as db:
+        seed(db, products=20, images_per_product=1, promissory_sales=0, finance_rows=0, clients=1)
+
+    def run_batch() -> float:
+        with SessionLocal() as db:
+            t0 = time.perf_counter()
+            sent = worker.process_daily_product_offers(db, "grupo")
+            elapsed = (time.perf_counter() - t0) * 1000
+        assert sent == 20, sent
+        return elapsed
+
+    with tempfile.TemporaryDirectory() as tmp:
+        worker.OFFER_ASSETS = OfferAssetCache(Path(tmp))
+        cold = run_batch()
+        warm = [run_batch() for _ in range(3)]
+
+    print(f"lote 20 ofertas (latência bucket={latency * 1000:.0f}ms)")
+    print(f"cache frio  : {cold:.1f}ms")
+    print(f"cache quente: {min(warm):.1f}ms (melhor de 3)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# scripts/bench_presign.py
+"""
+GET /products?limit=200 (200 produtos x 4 imagens = 800 URLs assinadas)
+sem e com o cache de URLs assinadas.
+
+  python -m scripts.bench_presign
+"""
+from __future__ import annotations
+
+from scripts.bench_common import make_sqlite_engine, make_session_factory, seed, make_api_client, measure, fmt
+
+from infra import storage
+
+
+def main() -> None:
+    engine = make_sqlite_engine()
+    with make_session_factory(engine)() as db:
+        user = seed(db, products=200, images_per_product=4, promissory_sales=0, finance_rows=0)
+
+    client = make_api_client(engine, user)
+
+    def list_products() -> None:
+        r = client.get("/products", params={"limit": 200})
+        r.raise_for_status()
+
+    maxsize = storage._PRESIGN_CACHE.maxsize
+
+    storage._PRESIGN_CACHE.maxsize = 0
+    storage.clear_presign_cache()
+    print(f"sem cache : {fmt(measure(list_products, repeat=10))}")
+
+    storage._PRESIGN_CACHE.maxsize = maxsize
+    storage.clear_presign_cache()
+    print(f"com cache : {fmt(measure(list_products, repeat=10))}")
+    print(f"stats     : {storage.presign_cache_stats()}")
+
+
+if __name__ == "__main__":
+    main()
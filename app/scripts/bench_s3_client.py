@@ -0,0 +1,62 @@
+# scripts/bench_s3_client.py
+"""
+Custo por chamada de put/get/presign com client novo a cada chamada
+(comportamento antigo) vs client compartilhado.
+
+Usa o servidor do moto como S3 local (pip install "moto[server]"):
+  python -m scripts.bench_s3_client
+"""
+from __future__ import annotations
+
+import logging
+import os
+
+from scripts.bench_common import measure, fmt
+
+from infra import storage
+
+PORT = int(os.getenv("BENCH_S3_PORT", "5055"))
+
+
+def main() -> None:
+    try:
+        from moto.server import ThreadedMotoServer
+    except ImportError:
+        raise SystemExit('Instale o moto para rodar este benchmark: pip install "moto[server]"')
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = ThreadedMotoServer(port=PORT, verbose=False)
+    server.start()
+    try:
+        os.environ.update({
+            "S3_ENDPOINT": f"http://127.0.0.1:{PORT}",
+            "S3_ACCESS_KEY_ID": "bench",
+            "S3_SECRET_ACCESS_KEY": "bench-secret",
+            "S3_REGION": "us-east-1",
+            "S3_BUCKET": "bench",
+        })
+        storage.reset_s3_client()
+        storage._s3_client().create_bucket(Bucket="bench")
+        storage.put_bytes(content=b"x" * 64_000, content_type="image/jpeg", key="bench/get.jpg")
+
+        ops = {
+            "put_bytes": lambda: storage.put_bytes(content=b"x" * 64_000, content_type="image/jpeg", key="bench/put.jpg"),
+            "get_bytes": lambda: storage.get_bytes("bench/get.jpg"),
+            # sem cache, pra medir só o client
+            "presign": lambda: (storage.clear_presign_cache(), storage.presign_get_url("bench/get.jpg")),
+        }
+
+        for name, op in ops.items():
+            def fresh_client() -> None:
+                storage.reset_s3_client()
+                op()
+
+            storage.reset_s3_client()
+            print(f"{name:<10} client novo  : {fmt(measure(fresh_client, repeat=30))}")
+            print(f"{name:<10} compartilhado: {fmt(measure(op, repeat=30))}")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
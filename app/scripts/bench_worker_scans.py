@@ -0,0 +1,198 @@
+# scripts/bench_worker_scans.py
+"""
+Varreduras de um ciclo do worker (produtores + fila de saída) sobre uma
+base sintética com BENCH_INSTALLMENTS parcelas (padrão 1M), quase todas
+pagas, e o histórico de lembretes já enviados. Compara sem e com os
+índices do worker.
+
+  python -m scripts.bench_worker_scans
+  BENCH_DATABASE_URL=postgresql+psycopg2://... python -m scripts.bench_worker_scans
+
+Sem BENCH_DATABASE_URL usa SQLite em arquivo temporário (índices de
+fallback); no Postgres entram os índices parciais. A base é recriada.
+"""
+from __future__ import annotations
+
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from scripts.bench_common import measure, fmt
+
+from sqlalchemy import create_engine, insert, inspect, select
+from sqlalchemy.orm import sessionmaker
+
+import worker
+from infra.models import (
+    Base,
+    ClientORM,
+    InstallmentORM,
+    InstallmentStatus,
+    OutboundMessageORM,
+    PromissoryORM,
+    PromissoryStatus,
+    WppSendStatus,
+)
+from services.outbox import claimable, next_due
+
+PER_PROMISSORY = 24
+CHUNK = 20_000
+# índices que servem as varreduras do worker (os que existirem no dialeto)
+WORKER_INDEXES = {
+    "ix_installments_due",
+    "ix_installments_pending_due",
+    "ix_installments_status_due",
+    "ix_outbound_messages_pending",
+    "ix_outbound_messages_status_kind",
+}
+
+
+def _engine():
+    url = os.getenv("BENCH_DATABASE_URL", "").strip()
+    if not url:
+        url = f"sqlite+pysqlite:///{tempfile.mkdtemp()}/bench_worker_scans.db"
+    engine = create_engine(url, future=True)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def _seed(engine, total: int) -> None:
+    """
+    Parcelas com vencimento nos últimos ~4 anos e no próximo; vencidas estão
+    97% pagas. Cada parcela já vencida teve seu "vence em N dias" enviado, e
+    cada atrasada em aberto, sua cobrança: o ciclo em regime não acha nada novo.
+    """
+    rnd = random.Random(42)
+    today = worker.today_local_date()
+    now = datetime.now(timezone.utc)
+    days = worker.reminder_days()
+
+    with engine.begin() as conn:
+        client_id = conn.execute(
+            insert(ClientORM).values(name="Cliente", phone="83999999999").returning(ClientORM.id)
+        ).scalar_one()
+
+        proms = total // PER_PROMISSORY
+        for start in range(0, proms, CHUNK):
+            conn.execute(insert(PromissoryORM), [
+                {
+                    "id": i + 1, "public_id": f"PROM-{i:08d}", "client_id": client_id,
+                    "total": Decimal("10000.00"), "entry_amount": Decimal("0"), "status": PromissoryStatus.ISSUED,
+                }
+                for i in range(start, min(proms, start + CHUNK))
+            ])
+
+    inst_id = 0
+    batch, messages = [], []
+    with engine.begin() as conn:
+        for p in range(1, proms + 1):
+            first = today - timedelta(days=rnd.randint(0, 365 * 4))
+            for n in range(1, PER_PROMISSORY + 1):
+                inst_id += 1
+                due = first + timedelta(days=30 * (n - 1))
+                overdue = due < today
+                paid = overdue and rnd.random() < 0.97
+                batch.append({
+                    "id": inst_id, "promissory_id": p, "number": n, "due_date": due, "amount": Decimal("416.67"),
+                    "status": InstallmentStatus.PAID if paid else InstallmentStatus.PENDING,
+                })
+                sent = []
+                if due <= today + timedelta(days=days):
+                    sent.append(worker.DUE_SOON_KIND)
+                if overdue and not paid:
+                    sent.append(worker.OVERDUE_KIND)
+                messages += [
+                    {
+                        "kind": kind, "ref_table": "installments", "ref_id": inst_id, "recipient": "5583999999999",
+                        "body": "x", "status": WppSendStatus.SENT, "tries": 0, "next_attempt_at": now, "sent_at": now,
+                    }
+                    for kind in sent
+                ]
+
+            if len(batch) >= CHUNK:
+                conn.execute(insert(InstallmentORM), batch)
+                batch = []
+            if len(messages) >= CHUNK:
+                conn.execute(insert(OutboundMessageORM), messages)
+                messages = []
+        if batch:
+            conn.execute(insert(InstallmentORM), batch)
+        if messages:
+            conn.execute(insert(OutboundMessageORM), messages)
+
+
+def _indexes(engine) -> list:
+    insp = inspect(engine)
+    present = {
+        ix["name"] for table in ("installments", "outbound_messages") for ix in insp.get_indexes(table)
+    }
+    return [
+        ix
+        for table in (InstallmentORM.__table__, OutboundMessageORM.__table__)
+        for ix in table.indexes
+        if ix.name in WORKER_INDEXES and ix.name in present
+    ]
+
+
+def _analyze(engine) -> None:
+    # só no Postgres: o sqlite_stat1 não tem histograma e, com quase tudo
+    # SENT/PAID, passa a achar o status pouco seletivo (igual à produção,
+    # que nunca roda ANALYZE no SQLite)
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            conn.exec_driver_sql("ANALYZE")
+
+
+def _cycle_queries(SessionLocal) -> dict:
+    to = "5583999999999"
+
+    def overdue():
+        with SessionLocal() as db:
+            assert worker.produce_installments_overdue(db, to) == 0
+
+    def due_soon():
+        with SessionLocal() as db:
+            assert worker.produce_installments_due_soon(db, to) == 0
+
+    def queue():
+        with SessionLocal() as db:
+            next_due(db)
+            db.execute(select(OutboundMessageORM.id).where(claimable()).limit(200)).all()
+
+    return {"overdue": overdue, "due_soon": due_soon, "fila": queue}
+
+
+def main() -> None:
+    total = int(os.getenv("BENCH_INSTALLMENTS", "1000000"))
+    repeat = int(os.getenv("BENCH_REPEAT", "5"))
+
+    engine = _engine()
+    t0 = time.perf_counter()
+    _seed(engine, total)
+    print(f"[{engine.dialect.name}] base: {total} parcelas em {time.perf_counter() - t0:.1f}s")
+
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    queries = _cycle_queries(SessionLocal)
+    indexes = _indexes(engine)
+
+    for ix in indexes:
+        ix.drop(bind=engine)
+    _analyze(engine)
+    for name, fn in queries.items():
+        print(f"sem índices  {name:9s}: {fmt(measure(fn, repeat=repeat, warmup=1))}")
+
+    for ix in indexes:
+        ix.create(bind=engine)
+    _analyze(engine)
+    for name, fn in queries.items():
+        print(f"com índices  {name:9s}: {fmt(measure(fn, repeat=repeat, warmup=1))}")
+
+    print("índices: " + ", ".join(sorted(ix.name for ix in indexes)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# scripts/bench_wpp_dispatch.py
+"""
+Lote de 200 lembretes "parcela vence em N dias" contra um Blibsend falso
+com BENCH_BLIBSEND_LATENCY_MS de latência: envio serial x concorrente.
+
+  python -m scripts.bench_wpp_dispatch
+"""
+from __future__ import annotations
+
+import os
+import time
+from datetime import timedelta
+
+os.environ.setdefault("BLIBSEND_RATE_PER_SECOND", "50")
+os.environ.setdefault("BLIBSEND_RATE_BURST", "50")
+
+from sqlalchemy import delete, select, update
+
+from scripts.bench_common import make_sqlite_engine, make_session_factory, seed
+from scripts.fake_blibsend import FakeBlibsend
+
+import worker
+from infra.models import InstallmentORM, InstallmentStatus, OutboundMessageORM
+from integrations.blibsend_dispatch import reset_rate_limits
+
+BATCH = 200
+
+
+def _prepare(SessionLocal) -> None:
+    target = worker.today_local_date() + timedelta(days=int(os.getenv("PROMISSORY_REMINDER_DAYS", "5")))
+    with SessionLocal() as db:
+        ids = db.execute(
+            select(InstallmentORM.id)
+            .where(InstallmentORM.status == InstallmentStatus.PENDING)
+            .limit(BATCH)
+        ).scalars().all()
+        db.execute(update(InstallmentORM).where(InstallmentORM.id.in_(ids)).values(due_date=target))
+        db.execute(delete(OutboundMessageORM))
+        db.commit()
+
+
+def main() -> None:
+    latency = float(os.getenv("BENCH_BLIBSEND_LATENCY_MS", "150"))
+
+    engine = make_sqlite_engine()
+    SessionLocal = make_session_factory(engine)
+    with SessionLocal() as db:
+        seed(db, clients=50, products=20, promissory_sales=20, installments_per_promissory=24, finance_rows=0)
+
+    with FakeBlibsend(latency_ms=latency) as fake:
+        for label, workers in (("serial", "1"), ("concorrente", os.getenv("BLIBSEND_MAX_CONCURRENCY", "16"))):
+            os.environ["BLIBSEND_MAX_CONCURRENCY"] = workers
+            reset_rate_limits()
+            _prepare(SessionLocal)
+
+            before = fake.counts["messages"]
+            with SessionLocal() as db:
+                t0 = time.perf_counter()
+                worker.produce_installments_due_soon(db, "5583999999999")
+                sent = worker.process_outbound(db)
+                db.commit()
+                elapsed = time.perf_counter() - t0
+
+            assert sent == BATCH and fake.counts["messages"] - before == BATCH, sent
+            print(f"{label:12s} workers={workers:>2s}: {BATCH} mensagens em {elapsed:6.2f}s ({BATCH / elapsed:.1f} msg/s)")
+
+    rate = os.environ["BLIBSEND_RATE_PER_SECOND"]
+    print(f"(latência fake={latency:.0f}ms, limite={rate} msg/s por destino)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# scripts/fake_blibsend.py
+"""
+Blibsend falso (HTTP local) para os benchmarks do worker.
+
+  from scripts.fake_blibsend import FakeBlibsend
+  with FakeBlibsend(latency_ms=300) as fake:
+      ...  # BLIBSEND_BASE_URL já aponta para ele
+
+tls=(cert.pem, key.pem) sobe em HTTPS (o cliente precisa confiar no cert,
+ex.: REQUESTS_CA_BUNDLE=cert.pem).
+"""
+from __future__ import annotations
+
+import json
+import os
+import ssl
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # sem isso cada resposta espera o ACK atrasado (~40ms)
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        fake: FakeBlibsend = self.server.fake
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+
+        time.sleep(fake.latency)
+
+        if self.path == "/auth/signin":
+            status, headers = fake._next_status(fake.signin_script)
+            if status != 200:
+                return self._json(status, {"error": "fake"}, headers)
+            n = fake._count("signin")
+            return self._json(200, {"token": f"fake-token-{n}", "token_type": "Bearer", "exires_in": 86400})
+
+        if self.path.startswith("/messages/"):
+            status, headers = fake._next_status(fake.script)
+            if status != 200:
+                return self._json(status, {"error": "fake"}, headers)
+            fake._count("messages", json.loads(raw or b"{}"))
+            return self._json(200, {"ok": True})
+
+        self._json(404, {"error": "not found"})
+
+    def _json(self, status: int, data: dict, headers: dict | None = None) -> None:
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeBlibsend:
+    def __init__(self, *, latency_ms: float = 0, port: int = 0, tls: tuple[str, str] | None = None):
+        self.latency = latency_ms / 1000
+        self.counts = {"signin": 0, "messages": 0}
+        self.payloads: list[dict] = []
+        self.connections = 0
+        # respostas forçadas para os próximos envios: [(status, headers), ...]
+        self.script: list[tuple[int, dict]] = []
+        # idem para o signin
+        self.signin_script: list[tuple[int, dict]] = []
+        self._lock = threading.Lock()
+
+        fake = self
+
+        class _Server(ThreadingHTTPServer):
+            daemon_threads = True
+
+            def get_request(self):
+                sock, addr = super().get_request()
+                if tls:
+                    ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+                    ctx.load_cert_chain(*tls)
+                    sock = ctx.wrap_socket(sock, server_side=True)
+                return sock, addr
+
+            def process_request(self, request, client_address):
+                with fake._lock:
+                    fake.connections += 1
+                super().process_request(request, client_address)
+
+        self._server = _Server(("127.0.0.1", port), _Handler)
+        self._server.fake = self
+        scheme = "https" if tls else "http"
+        self.url = f"{scheme}://127.0.0.1:{self._server.server_address[1]}"
+
+    def _count(self, kind: str, payload: dict | None = None) -> int:
+        with self._lock:
+            self.counts[kind] += 1
+            if payload is not None:
+                self.payloads.append(payload)
+            return self.counts[kind]
+
+    def _next_status(self, script: list) -> tuple[int, dict]:
+        with self._lock:
+            return script.pop(0) if script else (200, {})
+
+    def __enter__(self) -> "FakeBlibsend":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        os.environ.update({
+            "BLIBSEND_BASE_URL": self.url,
+            "BLIBSEND_CLIENT_ID": "fake",
+            "BLIBSEND_CLIENT_SECRET": "fake",
+            "BLIBSEND_SESSION_TOKEN": "fake",
+        })
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
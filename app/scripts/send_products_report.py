@@ -2,37 +2,19 @@ from __future__ import annotations
 
 import os
 import time
-from typing import List
 
 from sqlalchemy import select
 from dotenv import load_dotenv
 
-from app.infra.db import SessionLocal
+from app.infra.db import read_session
+from app.infra.replica import report_max_lag_seconds
 from app.infra.models import ProductORM, ProductStatus
-from app.integrations.blibsend import send_whatsapp_text
+from app.integrations.blibsend import send_whatsapp_text, chunk_text, MESSAGE_MAX_CHARS
 
 load_dotenv()
 
 
-MAX_CHARS = 3000  # seguro pra não estourar
-
-
-def chunk_text(text: str, max_chars: int = MAX_CHARS) -> List[str]:
-    chunks: List[str] = []
-    buf: List[str] = []
-    size = 0
-
-    for line in text.splitlines(True):  # preserva \n
-        if size + len(line) > max_chars and buf:
-            chunks.append("".join(buf).strip())
-            buf = []
-            size = 0
-        buf.append(line)
-        size += len(line)
-
-    if buf:
-        chunks.append("".join(buf).strip())
-    return [c for c in chunks if c]
+MAX_CHARS = MESSAGE_MAX_CHARS
 
 
 def format_product(p: ProductORM) -> str:
@@ -53,7 +35,8 @@ def main():
     only_in_stock = os.getenv("REPORT_ONLY_IN_STOCK", "1") == "1"
     limit = int(os.getenv("REPORT_LIMIT", "50"))
 
-    with SessionLocal() as db:
+    # relatório aceita réplica atrasada até DB_REPLICA_REPORT_MAX_LAG_SECONDS
+    with read_session(max_lag_seconds=report_max_lag_seconds()) as db:
         stmt = select(ProductORM).order_by(ProductORM.id.asc())
 
         if only_in_stock:
@@ -0,0 +1,138 @@
+# app/services/auth_cache.py
+"""
+Cache do usuário autenticado (id -> role, name), por processo.
+
+Sem ele todo request autenticado fazia db.get(UserORM, id) só para saber
+o role. Agora:
+- cache com TTL (AUTH_USER_CACHE_TTL_SECONDS, padrão 60; 0 desliga);
+- token emitido há menos que o TTL e depois da última invalidação do
+  usuário: vale o role assinado no próprio JWT, nem precisa do cache.
+
+Nos dois casos o dado pode estar até TTL segundos atrasado em relação ao
+banco (usuário removido/alterado em outra réplica). invalidate_user()
+derruba na hora o que é deste processo.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from infra.models import UserRole
+
+
+@dataclass(frozen=True)
+class AuthUser:
+    """
+    Usuário do request (o que as dependências de auth precisam).
+    name é None quando veio só do token.
+    """
+    id: int
+    role: UserRole
+    name: Optional[str] = None
+
+
+class _UserCache:
+    def __init__(self, maxsize: int, ttl_seconds: int) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.token_hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[int, tuple[AuthUser, float]]" = OrderedDict()
+        # user_id -> time.time() da última alteração (compara com o iat do JWT)
+        self._invalidated_at: dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, user_id: int, *, role: Optional[str], issued_at: Optional[int]) -> Optional[AuthUser]:
+        if self.ttl_seconds <= 0:
+            return None
+        with self._lock:
+            item = self._data.get(user_id)
+            if item is not None and item[1] > time.monotonic():
+                self._data.move_to_end(user_id)
+                self.hits += 1
+                return item[0]
+
+            user = self._from_claims(user_id, role, issued_at)
+            if user is not None:
+                self.token_hits += 1
+                return user
+            self.misses += 1
+            return None
+
+    def _from_claims(self, user_id: int, role: Optional[str], issued_at: Optional[int]) -> Optional[AuthUser]:
+        if role is None or issued_at is None:
+            return None
+        now = time.time()
+        if now - issued_at > self.ttl_seconds:
+            return None
+        # iat tem resolução de segundo: empate conta como "antes"
+        if issued_at <= self._invalidated_at.get(user_id, float("-inf")):
+            return None
+        try:
+            return AuthUser(id=user_id, role=UserRole(role))
+        except ValueError:
+            return None
+
+    def put(self, user: AuthUser) -> AuthUser:
+        if self.maxsize <= 0 or self.ttl_seconds <= 0:
+            return user
+        with self._lock:
+            self._data[user.id] = (user, time.monotonic() + self.ttl_seconds)
+            self._data.move_to_end(user.id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return user
+
+    def invalidate(self, user_id: int) -> None:
+        now = time.time()
+        with self._lock:
+            self._data.pop(user_id, None)
+            self._invalidated_at[user_id] = now
+            # invalidação mais velha que o TTL não barra mais nada (token
+            # anterior a ela já passou da idade de confiar no claim)
+            for uid in [u for u, t in self._invalidated_at.items() if now - t > self.ttl_seconds]:
+                del self._invalidated_at[uid]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._invalidated_at.clear()
+            self.hits = 0
+            self.token_hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "token_hits": self.token_hits,
+                "misses": self.misses,
+            }
+
+
+USER_CACHE = _UserCache(
+    maxsize=int(os.getenv("AUTH_USER_CACHE_SIZE", "10000")),
+    ttl_seconds=int(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "60")),
+)
+
+
+def remember_user(row) -> AuthUser:
+    """
+    Guarda o UserORM lido do banco e devolve o AuthUser.
+    """
+    return USER_CACHE.put(AuthUser(id=row.id, role=row.role, name=row.name))
+
+
+def invalidate_user(user_id: int) -> None:
+    USER_CACHE.invalidate(user_id)
+
+
+def user_cache_stats() -> dict:
+    return USER_CACHE.stats()
@@ -0,0 +1,213 @@
+# app/services/dashboard_service.py
+from __future__ import annotations
+
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import select, func, case
+from sqlalchemy.orm import Session
+
+from infra.models import (
+    ClientORM,
+    ProductORM,
+    SaleORM,
+    PromissoryORM,
+    InstallmentORM,
+    FinanceORM,
+    ProductStatus,
+    SaleStatus,
+    PromissoryStatus,
+    InstallmentStatus,
+    FinanceStatus,
+)
+
+
+ZERO = Decimal("0.00")
+
+
+def _today_utc() -> date:
+    return datetime.utcnow().date()
+
+
+def _money(v) -> Decimal:
+    return Decimal(v or 0).quantize(Decimal("0.01"))
+
+
+def _key(v) -> str:
+    # enums vêm do DB como Enum; o dashboard expõe só o valor
+    return getattr(v, "value", v)
+
+
+def _created_between(col, date_from: Optional[date], date_to: Optional[date]) -> list:
+    conds = []
+    if date_from is not None:
+        conds.append(col >= date_from)
+    if date_to is not None:
+        # inclui o dia inteiro de date_to
+        conds.append(col < date_to + timedelta(days=1))
+    return conds
+
+
+def _due_between(col, date_from: Optional[date], date_to: Optional[date]) -> list:
+    conds = []
+    if date_from is not None:
+        conds.append(col >= date_from)
+    if date_to is not None:
+        conds.append(col <= date_to)
+    return conds
+
+
+def dashboard_summary(
+    db: Session,
+    *,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    include_finance: bool = False,
+) -> dict:
+    """
+    KPIs do dashboard calculados no banco (GROUP BY), sem trafegar as listas.
+      - clientes/produtos: estado atual (sem filtro de período)
+      - vendas/promissórias: filtradas por created_at
+      - parcelas/contas: filtradas por due_date
+    """
+    if date_from is not None and date_to is not None and date_from > date_to:
+        raise ValueError("date_from deve ser <= date_to")
+
+    today = _today_utc()
+
+    # clientes
+    clients_total = db.scalar(select(func.count(ClientORM.id))) or 0
+
+    # produtos por status + valor do estoque
+    products = {"total": 0, "by_status": {s.value: 0 for s in ProductStatus}, "stock_value": ZERO}
+    stmt = select(
+        ProductORM.status,
+        func.count(ProductORM.id),
+        func.sum(ProductORM.sale_price),
+    ).group_by(ProductORM.status)
+    for st, cnt, value in db.execute(stmt).all():
+        products["by_status"][_key(st)] = cnt
+        products["total"] += cnt
+        if st == ProductStatus.IN_STOCK:
+            products["stock_value"] = _money(value)
+
+    # vendas por status x forma de pagamento
+    sales = {
+        "total": 0,
+        "by_status": {s.value: 0 for s in SaleStatus},
+        "by_payment_type": {},
+        "revenue_confirmed": ZERO,
+        "discount_sum": ZERO,
+        "entry_sum": ZERO,
+    }
+    stmt = (
+        select(
+            SaleORM.status,
+            SaleORM.payment_type,
+            func.count(SaleORM.id),
+            func.sum(SaleORM.total),
+            func.sum(SaleORM.discount),
+            func.sum(SaleORM.entry_amount),
+        )
+        .where(*_created_between(SaleORM.created_at, date_from, date_to))
+        .group_by(SaleORM.status, SaleORM.payment_type)
+    )
+    for st, pt, cnt, total, discount, entry in db.execute(stmt).all():
+        sales["total"] += cnt
+        sales["by_status"][_key(st)] += cnt
+        sales["discount_sum"] += _money(discount)
+        sales["entry_sum"] += _money(entry)
+
+        if st == SaleStatus.CANCELED:
+            continue
+
+        bucket = sales["by_payment_type"].setdefault(_key(pt), {"count": 0, "amount": ZERO})
+        bucket["count"] += cnt
+        bucket["amount"] += _money(total)
+        if st == SaleStatus.CONFIRMED:
+            sales["revenue_confirmed"] += _money(total)
+
+    # promissórias por status
+    promissories = {"total": 0, "by_status": {s.value: 0 for s in PromissoryStatus}}
+    stmt = (
+        select(PromissoryORM.status, func.count(PromissoryORM.id))
+        .where(*_created_between(PromissoryORM.created_at, date_from, date_to))
+        .group_by(PromissoryORM.status)
+    )
+    for st, cnt in db.execute(stmt).all():
+        promissories["by_status"][_key(st)] = cnt
+        promissories["total"] += cnt
+
+    # parcelas: status + a receber + vencidas (usa ix_installments_due)
+    is_overdue = (InstallmentORM.status == InstallmentStatus.PENDING) & (InstallmentORM.due_date < today)
+    installments = {
+        "total": 0,
+        "by_status": {s.value: 0 for s in InstallmentStatus},
+        "pending_amount": ZERO,
+        "paid_amount": ZERO,
+        "overdue": {"count": 0, "amount": ZERO},
+    }
+    stmt = (
+        select(
+            InstallmentORM.status,
+            func.count(InstallmentORM.id),
+            func.sum(InstallmentORM.amount),
+            func.sum(InstallmentORM.paid_amount),
+            func.sum(case((is_overdue, 1), else_=0)),
+            func.sum(case((is_overdue, InstallmentORM.amount), else_=0)),
+        )
+        .where(*_due_between(InstallmentORM.due_date, date_from, date_to))
+        .group_by(InstallmentORM.status)
+    )
+    for st, cnt, amount, paid, overdue_cnt, overdue_amount in db.execute(stmt).all():
+        installments["by_status"][_key(st)] = cnt
+        installments["total"] += cnt
+        if st == InstallmentStatus.PENDING:
+            installments["pending_amount"] = _money(amount)
+            installments["overdue"] = {"count": int(overdue_cnt or 0), "amount": _money(overdue_amount)}
+        elif st == InstallmentStatus.PAID:
+            installments["paid_amount"] = _money(paid)
+
+    summary = {
+        "date_from": date_from,
+        "date_to": date_to,
+        "today": today,
+        "clients_total": clients_total,
+        "products": products,
+        "sales": sales,
+        "promissories": promissories,
+        "installments": installments,
+        "finance": None,
+    }
+
+    if not include_finance:
+        return summary
+
+    # contas a pagar (usa ix_finance_due_status)
+    f_overdue = (FinanceORM.status == FinanceStatus.PENDING) & (FinanceORM.due_date < today)
+    finance = {
+        "pending": {"count": 0, "amount": ZERO},
+        "overdue": {"count": 0, "amount": ZERO},
+        "paid": {"count": 0, "amount": ZERO},
+    }
+    stmt = (
+        select(
+            FinanceORM.status,
+            func.count(FinanceORM.id),
+            func.sum(FinanceORM.amount),
+            func.sum(case((f_overdue, 1), else_=0)),
+            func.sum(case((f_overdue, FinanceORM.amount), else_=0)),
+        )
+        .where(*_due_between(FinanceORM.due_date, date_from, date_to))
+        .group_by(FinanceORM.status)
+    )
+    for st, cnt, amount, overdue_cnt, overdue_amount in db.execute(stmt).all():
+        if st == FinanceStatus.PENDING:
+            finance["pending"] = {"count": cnt, "amount": _money(amount)}
+            finance["overdue"] = {"count": int(overdue_cnt or 0), "amount": _money(overdue_amount)}
+        elif st == FinanceStatus.PAID:
+            finance["paid"] = {"count": cnt, "amount": _money(amount)}
+
+    summary["finance"] = finance
+    return summary
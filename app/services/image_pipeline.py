@@ -0,0 +1,215 @@
+# app/services/image_pipeline.py
+"""
+Variantes geradas no upload da imagem do produto:
+  - thumb : grade/listagem (WebP pequeno)
+  - medium: detalhe do produto (WebP)
+  - offer : JPEG já comprimido abaixo de OFFERS_IMAGE_MAX_BYTES (WhatsApp)
+
+A foto original continua guardada; as variantes ficam ao lado dela no bucket.
+"""
+from __future__ import annotations
+
+import io
+import os
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Optional
+
+from PIL import Image, ImageOps
+
+
+@dataclass(frozen=True)
+class Variant:
+    content: bytes
+    content_type: str
+    ext: str
+
+
+def _thumb_dim() -> int:
+    return int(os.getenv("IMAGE_THUMB_MAX_DIM", "320"))
+
+
+def _medium_dim() -> int:
+    return int(os.getenv("IMAGE_MEDIUM_MAX_DIM", "1024"))
+
+
+def offer_params() -> dict:
+    # mesmas envs que o worker usa para a oferta diária
+    return {
+        "max_dim": int(os.getenv("OFFERS_IMAGE_MAX_DIM", "1280")),
+        "quality": int(os.getenv("OFFERS_IMAGE_QUALITY", "70")),
+        "max_bytes": int(os.getenv("OFFERS_IMAGE_MAX_BYTES", "850000")),
+    }
+
+
+def open_image(fileobj: BinaryIO, *, max_dim: int) -> Image.Image:
+    """
+    Decodifica já reduzindo: para JPEG, Image.draft faz o decoder entregar
+    1/2, 1/4 ou 1/8 da resolução (ainda >= max_dim), bem mais barato que
+    decodificar a foto inteira de 12MP e depois redimensionar.
+    """
+    fileobj.seek(0)
+    img = Image.open(fileobj)
+    if img.format == "JPEG":
+        img.draft("RGB", (max_dim, max_dim))
+    img = ImageOps.exif_transpose(img)  # fotos de celular vêm rotacionadas via EXIF
+    return img.convert("RGB")
+
+
+def fit(img: Image.Image, max_dim: int) -> Image.Image:
+    w, h = img.size
+    if max(w, h) <= max_dim:
+        return img
+    out = img.copy()
+    out.thumbnail((max_dim, max_dim), Image.LANCZOS)
+    return out
+
+
+def encode_webp(img: Image.Image, *, quality: int) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, format="WEBP", quality=quality, method=4)
+    return buf.getvalue()
+
+
+@dataclass(frozen=True)
+class JpegFit:
+    content: bytes
+    quality: int
+    encodes: int        # encodes da imagem inteira
+    probe_encodes: int  # encodes da miniatura de estimativa (bem mais baratos)
+
+
+def _jpeg(img: Image.Image, quality: int) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=quality, optimize=True)
+    return buf.getvalue()
+
+
+def _max_quality_fitting(size_at, lo: int, hi: int, max_bytes: int) -> Optional[int]:
+    """
+    Maior q em [lo, hi] com size_at(q) <= max_bytes (tamanho cresce com q).
+    """
+    best = None
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        if size_at(mid) <= max_bytes:
+            best, lo = mid, mid + 1
+        else:
+            hi = mid - 1
+    return best
+
+
+def _ratio_at(points: Dict[int, float], q: int) -> float:
+    """
+    Razão tamanho_cheio / tamanho_miniatura em q, interpolada linearmente
+    entre as qualidades já medidas (constante fora delas).
+    """
+    qs = sorted(points)
+    if q <= qs[0]:
+        return points[qs[0]]
+    if q >= qs[-1]:
+        return points[qs[-1]]
+    for q1, q2 in zip(qs, qs[1:]):
+        if q1 <= q <= q2:
+            return points[q1] + (points[q2] - points[q1]) * (q - q1) / (q2 - q1)
+    return points[qs[-1]]
+
+
+def fit_jpeg(
+    img: Image.Image,
+    *,
+    quality: int,
+    max_bytes: int,
+    min_quality: int = 30,
+    probe_dim: int = 320,
+    tolerance: int = 3,
+) -> JpegFit:
+    """
+    JPEG com a maior qualidade <= `quality` que cabe em max_bytes.
+
+    1. encoda em `quality`; se couber, acabou (caso comum);
+    2. estima a qualidade por bisseção numa miniatura (~probe_dim px),
+       calibrada pela razão tamanho_cheio / tamanho_miniatura em `quality`;
+    3. confere a estimativa na imagem inteira, recalibra a razão com o
+       ponto medido e repete até a estimativa ficar a menos de `tolerance`
+       pontos do que já cabe (o loop antigo andava de 10 em 10).
+    Se nem min_quality couber, devolve o encode em min_quality.
+    """
+    hi = int(quality)
+    lo = min(int(min_quality), hi)
+    full = {}
+    probe_sizes = {}
+
+    def full_at(q: int) -> bytes:
+        if q not in full:
+            full[q] = _jpeg(img, q)
+        return full[q]
+
+    def result(q: int) -> JpegFit:
+        return JpegFit(full_at(q), q, len(full), len(probe_sizes))
+
+    if len(full_at(hi)) <= max_bytes or hi == lo:
+        return result(hi)
+
+    factor = max(1, max(img.size) // probe_dim)
+    probe = img.reduce(factor) if factor > 1 else img
+
+    def probe_at(q: int) -> int:
+        if q not in probe_sizes:
+            probe_sizes[q] = len(_jpeg(probe, q))
+        return probe_sizes[q]
+
+    ratios = {}
+
+    def measure(q: int) -> int:
+        size = len(full_at(q))
+        ratios[q] = size / probe_at(q)
+        return size
+
+    # fit_q sempre cabe, fail_q nunca; para quando estão a <= tolerance.
+    fit_q, fail_q = None, hi
+    measure(hi)
+    while True:
+        floor = lo if fit_q is None else fit_q + 1
+        guess = _max_quality_fitting(
+            lambda q: probe_at(q) * _ratio_at(ratios, q), floor, fail_q - 1, max_bytes
+        ) or floor
+        # o modelo já diz que não dá para subir mais que tolerance pontos
+        if fit_q is not None and guess - fit_q <= tolerance and guess < fail_q - 1:
+            return result(fit_q)
+
+        if measure(guess) <= max_bytes:
+            fit_q = guess
+        else:
+            fail_q = guess
+
+        if fit_q is not None and fail_q - fit_q <= max(1, tolerance):
+            return result(fit_q)
+        if fit_q is None and fail_q == lo:
+            return result(lo)
+
+
+def encode_jpeg_max_bytes(img: Image.Image, *, quality: int, max_bytes: int, min_quality: int = 30) -> bytes:
+    return fit_jpeg(img, quality=quality, max_bytes=max_bytes, min_quality=min_quality).content
+
+
+def build_variants(fileobj: BinaryIO) -> Dict[str, Variant]:
+    """
+    Gera thumb/medium/offer a partir de uma única decodificação.
+    Levanta exceção do PIL se o arquivo não for uma imagem válida.
+    """
+    offer = offer_params()
+    base = open_image(fileobj, max_dim=max(offer["max_dim"], _medium_dim()))
+
+    offer_img = fit(base, offer["max_dim"])
+    medium_img = fit(base, _medium_dim())
+    thumb_img = fit(medium_img, _thumb_dim())
+
+    return {
+        "thumb": Variant(encode_webp(thumb_img, quality=70), "image/webp", ".webp"),
+        "medium": Variant(encode_webp(medium_img, quality=80), "image/webp", ".webp"),
+        "offer": Variant(
+            encode_jpeg_max_bytes(offer_img, quality=offer["quality"], max_bytes=offer["max_bytes"]),
+            "image/jpeg",
+            ".jpg",
+        ),
+    }
@@ -0,0 +1,84 @@
+# app/services/job_lock.py
+"""
+Trava de job diário no banco (tabela job_locks), para rodar N réplicas do
+worker sem repetir o job do dia.
+
+A aquisição é um UPDATE condicional (atômico em qualquer banco): só uma
+réplica consegue marcar locked_by/locked_until. Se ela morrer no meio, o
+lease vence e outra assume; done_date só é gravado quando o job conclui.
+"""
+from __future__ import annotations
+
+import os
+import socket
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from infra.models import JobLockORM
+
+
+def worker_id() -> str:
+    return os.getenv("WORKER_ID", "").strip() or f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _ensure_row(db: Session, name: str) -> None:
+    if db.get(JobLockORM, name) is not None:
+        return
+    db.add(JobLockORM(name=name, updated_at=_now()))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()  # outra réplica criou ao mesmo tempo
+
+
+def is_done(db: Session, name: str, *, day: date) -> bool:
+    row = db.get(JobLockORM, name)
+    return bool(row and row.done_date and row.done_date >= day)
+
+
+def try_acquire_daily(db: Session, name: str, *, day: date, owner: str, lease_seconds: int) -> bool:
+    """
+    True se `owner` pegou o job `name` para `day` (commita na hora, para as
+    outras réplicas já enxergarem).
+    """
+    _ensure_row(db, name)
+    now = _now()
+    res = db.execute(
+        update(JobLockORM)
+        .where(
+            JobLockORM.name == name,
+            or_(JobLockORM.done_date.is_(None), JobLockORM.done_date < day),
+            or_(
+                JobLockORM.locked_until.is_(None),
+                JobLockORM.locked_until < now,
+                JobLockORM.locked_by == owner,
+            ),
+        )
+        .values(locked_by=owner, locked_until=now + timedelta(seconds=lease_seconds), updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return res.rowcount == 1
+
+
+def finish_daily(db: Session, name: str, *, day: date, owner: str, done: bool) -> None:
+    """
+    Solta a trava; com done=True o dia fica marcado como concluído.
+    """
+    values = {"locked_by": None, "locked_until": None, "updated_at": _now()}
+    if done:
+        values["done_date"] = day
+    db.execute(
+        update(JobLockORM)
+        .where(JobLockORM.name == name, JobLockORM.locked_by == owner)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
@@ -0,0 +1,102 @@
+# app/services/offer_assets.py
+"""
+Cache em disco dos payloads da oferta diária (data URI do JPEG da capa).
+
+A chave é a KEY da imagem no bucket + parâmetros de encoding. Como toda
+imagem nova ganha uma KEY nova (uuid), trocar as fotos do produto já gera
+outra entrada; as antigas deixam de ser usadas e saem no prune por idade.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+
+class OfferAssetCache:
+    def __init__(self, root: Path, *, max_age_days: Optional[int] = None):
+        self.root = Path(root)
+        self.max_age_days = (
+            int(os.getenv("OFFERS_ASSET_CACHE_MAX_AGE_DAYS", "30")) if max_age_days is None else max_age_days
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, ref: str, params: str) -> Path:
+        ref_dir = hashlib.sha256(ref.encode("utf-8")).hexdigest()[:32]
+        return self.root / ref_dir / f"{params}.txt"
+
+    def get(self, ref: str, params: str) -> Optional[str]:
+        path = self._path(ref, params)
+        try:
+            data = path.read_text(encoding="ascii")
+        except (FileNotFoundError, UnicodeDecodeError):
+            return None
+        try:
+            os.utime(path)  # marca uso (prune é por mtime)
+        except OSError:
+            pass
+        return data or None
+
+    def put(self, ref: str, params: str, data_uri: str) -> None:
+        path = self._path(ref, params)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # escreve em tmp + rename: um worker morto no meio não deixa arquivo truncado
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(data_uri, encoding="ascii")
+        os.replace(tmp, path)
+
+    def get_or_build(self, ref: str, params: str, build: Callable[[], str]) -> str:
+        cached = self.get(ref, params)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        data_uri = build()
+        try:
+            self.put(ref, params, data_uri)
+        except OSError as e:
+            print(f"[offer_assets] não consegui gravar cache de {ref}: {e}")
+        return data_uri
+
+    def invalidate(self, ref: str) -> None:
+        """
+        Remove todas as variantes de encoding de uma imagem.
+        """
+        ref_dir = self._path(ref, "x").parent
+        if not ref_dir.exists():
+            return
+        for f in ref_dir.iterdir():
+            f.unlink(missing_ok=True)
+        try:
+            ref_dir.rmdir()
+        except OSError:
+            pass
+
+    def prune(self) -> int:
+        """
+        Apaga entradas sem uso há mais de max_age_days. Retorna quantas saíram.
+        """
+        if not self.root.exists():
+            return 0
+
+        cutoff = time.time() - self.max_age_days * 86400
+        removed = 0
+        for ref_dir in self.root.iterdir():
+            if not ref_dir.is_dir():
+                continue
+            for f in ref_dir.iterdir():
+                try:
+                    if f.stat().st_mtime < cutoff:
+                        f.unlink()
+                        removed += 1
+                except FileNotFoundError:
+                    pass
+            try:
+                ref_dir.rmdir()  # só sai se ficou vazio
+            except OSError:
+                pass
+        return removed
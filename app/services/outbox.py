@@ -0,0 +1,256 @@
+# app/services/outbox.py
+"""
+Fila de saída do worker (tabela outbound_messages).
+
+- Produtores (etapas do worker): enqueue() grava a mensagem já renderizada,
+  uma linha por (kind, ref_table, ref_id); cancel_stale() cancela o que
+  ainda não saiu e perdeu o motivo (conta paga, parcela cancelada...).
+  Se o motivo volta (conta reaberta, vencimento mudou), a linha CANCELED
+  volta para PENDING com o texto novo.
+- Consumidor: claim() pega um lote (FOR UPDATE SKIP LOCKED, lease em
+  next_attempt_at), mark_sent()/mark_failed() gravam o resultado com
+  backoff. Vale para qualquer tipo de lembrete.
+
+Toda varredura da fila filtra status PENDING/SENDING/FAILED, que é o
+índice parcial ix_outbound_messages_pending (no SQLite, o composto
+ix_outbound_messages_status_kind).
+"""
+from __future__ import annotations
+
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from infra.models import OutboundMessageORM, WppSendStatus
+
+OPEN_STATUSES = (WppSendStatus.PENDING, WppSendStatus.SENDING, WppSendStatus.FAILED)
+
+AT_LEAST_ONCE = "at_least_once"
+AT_MOST_ONCE = "at_most_once"
+
+
+def now_utc() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def compute_backoff_seconds(tries: int) -> int:
+    if tries <= 0:
+        return 60
+    if tries == 1:
+        return 5 * 60
+    if tries == 2:
+        return 15 * 60
+    if tries == 3:
+        return 60 * 60
+    return 6 * 60 * 60
+
+
+def claim_lease_seconds() -> int:
+    # tempo máximo entre o claim e o write-back do resultado; passado disso
+    # uma mensagem presa em SENDING (worker morreu no meio) volta para a fila
+    return int(os.getenv("WORKER_CLAIM_LEASE_SECONDS", "600"))
+
+
+def delivery_mode() -> str:
+    """
+    WORKER_DELIVERY_MODE:
+      at_least_once (padrão): mensagem presa em SENDING (worker caiu entre o
+        envio e o registro do resultado) é reenviada depois do lease;
+        pode duplicar, não perde.
+      at_most_once: mensagem presa em SENDING nunca é reenviada (fica para
+        conferência manual); pode perder, não duplica.
+    """
+    mode = os.getenv("WORKER_DELIVERY_MODE", AT_LEAST_ONCE).strip().lower()
+    if mode not in (AT_LEAST_ONCE, AT_MOST_ONCE):
+        print(f"[outbox] WORKER_DELIVERY_MODE inválido ({mode!r}), usando {AT_LEAST_ONCE}")
+        return AT_LEAST_ONCE
+    return mode
+
+
+def _as_utc(dt: datetime) -> datetime:
+    # SQLite devolve datetime sem tz; gravamos sempre em UTC
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+def _waiting():
+    """
+    WHERE das mensagens que ainda vão sair (cedo ou tarde).
+    """
+    status = OutboundMessageORM.status
+    if delivery_mode() == AT_MOST_ONCE:
+        return status.in_((WppSendStatus.PENDING, WppSendStatus.FAILED))
+    return status.in_(OPEN_STATUSES)
+
+
+def already_queued(kind: str, model):
+    """
+    EXISTS correlacionado: a linha de `model` já tem mensagem `kind` (para o
+    produtor não renderizar de novo o que já está na fila). NOT EXISTS vira
+    anti-join pelo uq_outbound_messages_ref; NOT IN (subquery) varria a
+    fila inteira a cada ciclo. CANCELED não conta: enqueue() reaproveita.
+    """
+    return (
+        select(OutboundMessageORM.id)
+        .where(
+            OutboundMessageORM.kind == kind,
+            OutboundMessageORM.ref_table == model.__tablename__,
+            OutboundMessageORM.ref_id == model.id,
+            OutboundMessageORM.status != WppSendStatus.CANCELED,
+        )
+        .exists()
+    )
+
+
+def enqueue(db: Session, messages: list) -> int:
+    """
+    messages: dicts com kind, ref_table, ref_id, recipient, body.
+    Linha CANCELED da mesma referência volta para PENDING (o uq só deixa
+    uma por referência); o resto que já está na fila é ignorado (outra
+    réplica pode ter gravado antes). Commita; retorna quantas entraram.
+    """
+    if not messages:
+        return 0
+
+    now = now_utc()
+    revived = _revive_canceled(db, messages, now)
+    db.commit()
+    messages = [m for m in messages if (m["kind"], m["ref_table"], m["ref_id"]) not in revived]
+    if not messages:
+        return len(revived)
+
+    rows = [OutboundMessageORM(**m, status=WppSendStatus.PENDING, tries=0, next_attempt_at=now) for m in messages]
+    db.add_all(rows)
+    try:
+        db.commit()
+        return len(revived) + len(rows)
+    except IntegrityError:
+        db.rollback()
+
+    added = len(revived)
+    for m in messages:
+        try:
+            with db.begin_nested():
+                db.add(OutboundMessageORM(**m, status=WppSendStatus.PENDING, tries=0, next_attempt_at=now))
+            added += 1
+        except IntegrityError:
+            pass
+    db.commit()
+    return added
+
+
+def _revive_canceled(db: Session, messages: list, now: datetime) -> set:
+    """
+    Volta para PENDING (texto novo, tentativas zeradas) as linhas CANCELED
+    dessas referências. UPDATE com status no WHERE: se outra réplica
+    reviveu antes, rowcount 0 e a mensagem cai no insert (ignorado).
+    Retorna as referências revividas.
+    """
+    keys = {(m["kind"], m["ref_table"], m["ref_id"]): m for m in messages}
+    canceled = db.execute(
+        select(OutboundMessageORM.kind, OutboundMessageORM.ref_table, OutboundMessageORM.ref_id).where(
+            OutboundMessageORM.kind.in_({m["kind"] for m in messages}),
+            OutboundMessageORM.ref_id.in_({m["ref_id"] for m in messages}),
+            OutboundMessageORM.status == WppSendStatus.CANCELED,
+        )
+    ).all()
+
+    revived = set()
+    for key in {tuple(r) for r in canceled} & keys.keys():
+        m = keys[key]
+        res = db.execute(
+            update(OutboundMessageORM)
+            .where(
+                OutboundMessageORM.kind == m["kind"],
+                OutboundMessageORM.ref_table == m["ref_table"],
+                OutboundMessageORM.ref_id == m["ref_id"],
+                OutboundMessageORM.status == WppSendStatus.CANCELED,
+            )
+            .values(
+                recipient=m["recipient"], body=m["body"], status=WppSendStatus.PENDING, tries=0,
+                last_error=None, next_attempt_at=now, claimed_by=None, claimed_at=None, sent_at=None,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if res.rowcount:
+            revived.add(key)
+    return revived
+
+
+def cancel_stale(db: Session, *, kind: str, model, due) -> int:
+    """
+    Cancela as mensagens `kind` ainda não enviadas cuja linha de `model` não
+    bate mais com `due` (WHERE que justifica o lembrete). SENDING fica de
+    fora: já pode ter saído.
+    """
+    alive = select(model.id).where(model.id == OutboundMessageORM.ref_id, due).exists()
+    res = db.execute(
+        update(OutboundMessageORM)
+        .where(
+            # kind já determina a tabela; filtrar ref_table aqui faria o
+            # planner preferir o uq (histórico inteiro) ao índice da fila
+            OutboundMessageORM.kind == kind,
+            OutboundMessageORM.status.in_((WppSendStatus.PENDING, WppSendStatus.FAILED)),
+            ~alive,
+        )
+        .values(status=WppSendStatus.CANCELED, next_attempt_at=now_utc())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return res.rowcount or 0
+
+
+def claimable():
+    """
+    WHERE das mensagens que podem sair agora.
+    """
+    return and_(_waiting(), OutboundMessageORM.next_attempt_at <= now_utc())
+
+
+def claim(db: Session, *, owner: str, limit: int) -> list:
+    """
+    Pega um lote para esta réplica: FOR UPDATE SKIP LOCKED (no SQLite o
+    FOR UPDATE é ignorado), marca SENDING com lease (next_attempt_at =
+    agora + lease) e commita na hora, para as outras réplicas já pularem.
+    """
+    stmt = (
+        select(OutboundMessageORM)
+        .where(claimable())
+        .order_by(OutboundMessageORM.next_attempt_at.asc(), OutboundMessageORM.id.asc())
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    rows = db.execute(stmt).scalars().all()
+    now = now_utc()
+    for row in rows:
+        row.status = WppSendStatus.SENDING
+        row.claimed_by = owner
+        row.claimed_at = now
+        row.next_attempt_at = now + timedelta(seconds=claim_lease_seconds())
+    db.commit()
+    return rows
+
+
+def mark_sent(row) -> None:
+    row.status = WppSendStatus.SENT
+    row.sent_at = now_utc()
+    row.last_error = None
+
+
+def mark_failed(row, err: str) -> None:
+    row.tries = int(row.tries or 0) + 1
+    row.status = WppSendStatus.FAILED
+    row.last_error = err[:500]
+    row.next_attempt_at = now_utc() + timedelta(seconds=compute_backoff_seconds(row.tries))
+
+
+def next_due(db: Session) -> Optional[datetime]:
+    """
+    Quando a próxima mensagem pode sair (retry, lease vencendo ou já), ou
+    None se a fila está vazia. MIN() direto no índice parcial.
+    """
+    at = db.execute(select(func.min(OutboundMessageORM.next_attempt_at)).where(_waiting())).scalar()
+    return _as_utc(at) if at is not None else None
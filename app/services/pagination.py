@@ -0,0 +1,176 @@
+# app/services/pagination.py
+"""
+Paginação por cursor (keyset).
+
+O cursor é opaco para o cliente: JSON com os valores da chave de ordenação
+do último item da página + escopo do endpoint, assinado com HMAC para não
+ser forjado. A página seguinte vira um WHERE sobre a chave (usa índice),
+então o custo não cresce com a profundidade como no OFFSET.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import and_, or_, literal, String
+
+from config import JWT_SECRET_KEY
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+_SIG_BYTES = 16
+
+
+def _b64e(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _b64d(s: str) -> bytes:
+    return base64.urlsafe_b64decode(s + "=" * (-len(s) % 4))
+
+
+def _sign(scope: str, body: bytes) -> bytes:
+    msg = scope.encode("utf-8") + b"." + body
+    return hmac.new(JWT_SECRET_KEY.encode("utf-8"), msg, hashlib.sha256).digest()[:_SIG_BYTES]
+
+
+def _to_json(v: Any) -> Any:
+    if isinstance(v, (datetime, date)):
+        return v.isoformat()
+    if isinstance(v, Decimal):
+        return str(v)
+    return getattr(v, "value", v)
+
+
+def _from_json(col, v: Any) -> Any:
+    if v is None:
+        return None
+    try:
+        py = col.type.python_type
+    except NotImplementedError:
+        return v
+    if py is datetime:
+        return datetime.fromisoformat(v)
+    if py is date:
+        return date.fromisoformat(v)
+    return py(v)
+
+
+def encode_cursor(scope: str, values: Sequence[Any]) -> str:
+    body = json.dumps([_to_json(v) for v in values], separators=(",", ":")).encode("utf-8")
+    return f"{_b64e(body)}.{_b64e(_sign(scope, body))}"
+
+
+def decode_cursor(scope: str, cursor: str, cols: Sequence) -> list:
+    """
+    Valida assinatura/escopo e devolve os valores já no tipo das colunas.
+    Levanta ValueError se o cursor for inválido.
+    """
+    try:
+        body_b64, sig_b64 = cursor.split(".", 1)
+        body = _b64d(body_b64)
+        if not hmac.compare_digest(_b64d(sig_b64), _sign(scope, body)):
+            raise ValueError
+        raw = json.loads(body)
+        if not isinstance(raw, list) or len(raw) != len(cols):
+            raise ValueError
+        return [_from_json(c, v) for c, v in zip(cols, raw)]
+    except Exception:
+        raise ValueError("cursor inválido.")
+
+
+def _sqlite_value(v: Any) -> Any:
+    # SQLite guarda DateTime como texto; o server_default (CURRENT_TIMESTAMP)
+    # grava sem microssegundos, então o bind padrão ("...:00.000000") nunca
+    # compara igual. Compara no mesmo formato do que está gravado.
+    if isinstance(v, datetime) and v.microsecond == 0:
+        return literal(v.strftime("%Y-%m-%d %H:%M:%S"), String)
+    return v
+
+
+def keyset_after(
+    cols: Sequence,
+    values: Sequence[Any],
+    *,
+    desc: Union[bool, Sequence[bool]],
+    dialect: Optional[str] = None,
+):
+    """
+    WHERE "depois de" (a, b, ...) na ordem indicada, expandido em
+    (a > va) OR (a = va AND b > vb) ... para funcionar em SQLite e Postgres.
+    `desc` pode ser um bool por coluna (ex.: promissory_id DESC, number ASC).
+    """
+    if dialect == "sqlite":
+        values = [_sqlite_value(v) for v in values]
+
+    dirs = [desc] * len(cols) if isinstance(desc, bool) else list(desc)
+
+    conds = []
+    for i, col in enumerate(cols):
+        cmp = col < values[i] if dirs[i] else col > values[i]
+        eq = [cols[j] == values[j] for j in range(i)]
+        conds.append(and_(*eq, cmp) if eq else cmp)
+    return or_(*conds)
+
+
+def _keyset_stmt(db, stmt, *, scope, cols, limit, cursor, offset, desc):
+    if cursor:
+        values = decode_cursor(scope, cursor, cols)
+        stmt = stmt.where(keyset_after(cols, values, desc=desc, dialect=db.get_bind().dialect.name))
+    elif offset:
+        stmt = stmt.offset(offset)
+    return stmt.limit(limit + 1)
+
+
+def _keyset_result(rows: list, *, scope: str, cols: Sequence, limit: int) -> Tuple[list, Optional[str]]:
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(scope, [getattr(last, c.key) for c in cols])
+    return rows, next_cursor
+
+
+def keyset_page(
+    db,
+    stmt,
+    *,
+    scope: str,
+    cols: Sequence,
+    limit: int,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+    desc: Union[bool, Sequence[bool]] = True,
+) -> Tuple[list, Optional[str]]:
+    """
+    Executa `stmt` (já ordenado por `cols`) e devolve (itens, next_cursor).
+    Sem cursor mantém o comportamento antigo (OFFSET); next_cursor só vem
+    quando existe próxima página (busca limit+1 linhas).
+    """
+    stmt = _keyset_stmt(db, stmt, scope=scope, cols=cols, limit=limit, cursor=cursor, offset=offset, desc=desc)
+    rows = db.execute(stmt).scalars().all()
+    return _keyset_result(rows, scope=scope, cols=cols, limit=limit)
+
+
+async def keyset_page_async(
+    db,
+    stmt,
+    *,
+    scope: str,
+    cols: Sequence,
+    limit: int,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+    desc: Union[bool, Sequence[bool]] = True,
+) -> Tuple[list, Optional[str]]:
+    """
+    keyset_page para AsyncSession.
+    """
+    stmt = _keyset_stmt(db, stmt, scope=scope, cols=cols, limit=limit, cursor=cursor, offset=offset, desc=desc)
+    rows = (await db.execute(stmt)).scalars().all()
+    return _keyset_result(rows, scope=scope, cols=cols, limit=limit)
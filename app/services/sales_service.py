@@ -24,6 +24,7 @@ from infra.models import (
     InstallmentStatus,
 )
 from services.id_gen import generate_public_id
+from services.pagination import decode_cursor, encode_cursor, keyset_after
 
 
 
@@ -200,57 +201,129 @@ def create_sale(
     db.flush()
     return sale, promissory
 
-def list_sales(
-    db: Session,
+def _sales_page_stmts(
+    db,
     *,
-    page: int = 1,
-    page_size: int = 20,
-    client_id: Optional[int] = None,
-    user_id: Optional[int] = None,
-    product_id: Optional[int] = None,
-    payment_type: Optional[PaymentType] = None,
-    date_from: Optional[date] = None,
-    date_to: Optional[date] = None,
+    page: int,
+    page_size: int,
+    client_id: Optional[int],
+    user_id: Optional[int],
+    product_id: Optional[int],
+    payment_type: Optional[PaymentType],
+    date_from: Optional[date],
+    date_to: Optional[date],
+    cursor: Optional[str],
 ):
+    """
+    (stmt da página, stmt do COUNT) da listagem de vendas; usado pelo
+    list_sales e pelo list_sales_async.
+    """
     if page < 1:
         raise ValueError("page deve ser >= 1")
     if page_size < 1 or page_size > 200:
         raise ValueError("page_size deve estar entre 1 e 200")
 
-    q = db.query(SaleORM)
+    conds = []
 
     # filtros
     if client_id is not None:
-        q = q.filter(SaleORM.client_id == client_id)
+        conds.append(SaleORM.client_id == client_id)
 
     if user_id is not None:
-        q = q.filter(SaleORM.user_id == user_id)
+        conds.append(SaleORM.user_id == user_id)
 
     if product_id is not None:
-        q = q.filter(SaleORM.product_id == product_id)
+        conds.append(SaleORM.product_id == product_id)
 
     if payment_type is not None:
-        q = q.filter(SaleORM.payment_type == payment_type)
+        conds.append(SaleORM.payment_type == payment_type)
 
     # período
     if date_from is not None:
-        q = q.filter(SaleORM.created_at >= date_from)
+        conds.append(SaleORM.created_at >= date_from)
 
     if date_to is not None:
-        q = q.filter(SaleORM.created_at <= date_to)
+        conds.append(SaleORM.created_at <= date_to)
 
     # total antes da paginação
-    total = q.with_entities(func.count(SaleORM.id)).scalar() or 0
+    count_stmt = select(func.count(SaleORM.id)).where(*conds)
 
     # ordenação + paginação
-    items = (
-        q.order_by(SaleORM.created_at.desc())
-         .offset((page - 1) * page_size)
-         .limit(page_size)
-         .all()
+    cols = [SaleORM.created_at, SaleORM.id]
+    stmt = select(SaleORM).where(*conds).order_by(SaleORM.created_at.desc(), SaleORM.id.desc())
+    if cursor:
+        values = decode_cursor("sales", cursor, cols)
+        stmt = stmt.where(keyset_after(cols, values, desc=True, dialect=db.get_bind().dialect.name))
+    else:
+        stmt = stmt.offset((page - 1) * page_size)
+
+    return stmt.limit(page_size + 1), count_stmt
+
+
+def _sales_page(items: list, page_size: int):
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        last = items[-1]
+        next_cursor = encode_cursor("sales", [last.created_at, last.id])
+    return items, next_cursor
+
+
+def list_sales(
+    db: Session,
+    *,
+    page: int = 1,
+    page_size: int = 20,
+    client_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    product_id: Optional[int] = None,
+    payment_type: Optional[PaymentType] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+):
+    """
+    lista vendas (created_at desc, id desc).
+      - com cursor: keyset sobre (created_at, id), ignora page
+      - include_total=False pula o COUNT(*) (útil em paginação por cursor)
+    retorna (items, total|None, next_cursor|None)
+    """
+    stmt, count_stmt = _sales_page_stmts(
+        db, page=page, page_size=page_size, client_id=client_id, user_id=user_id, product_id=product_id,
+        payment_type=payment_type, date_from=date_from, date_to=date_to, cursor=cursor,
     )
+    total = (db.execute(count_stmt).scalar() or 0) if include_total else None
+    items, next_cursor = _sales_page(db.execute(stmt).scalars().all(), page_size)
+    return items, total, next_cursor
+
+
+async def list_sales_async(
+    db,
+    *,
+    page: int = 1,
+    page_size: int = 20,
+    client_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    product_id: Optional[int] = None,
+    payment_type: Optional[PaymentType] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+):
+    """
+    list_sales para AsyncSession (mesmo retorno).
+    """
+    stmt, count_stmt = _sales_page_stmts(
+        db, page=page, page_size=page_size, client_id=client_id, user_id=user_id, product_id=product_id,
+        payment_type=payment_type, date_from=date_from, date_to=date_to, cursor=cursor,
+    )
+    total = ((await db.execute(count_stmt)).scalar() or 0) if include_total else None
+    items, next_cursor = _sales_page((await db.execute(stmt)).scalars().all(), page_size)
+    return items, total, next_cursor
+
 
-    return items, total
 def issue_promissory(db: Session, prom_id: int) -> PromissoryORM:
     """
     emite promissória: draft -> issued e seta issued_at.
@@ -5,41 +5,58 @@ import os
 import time
 import io
 import base64
+import heapq
 from datetime import datetime, timedelta, timezone, date
 from pathlib import Path
 from typing import Optional
 
 from dotenv import load_dotenv
-from PIL import Image
-from sqlalchemy import and_, or_, select
+from sqlalchemy import and_, select
 from sqlalchemy.orm import Session, selectinload
 
-from infra.db import SessionLocal
+from infra.db import SessionLocal, engine, read_session
+from infra.notify import WakeupListener
+from infra.replica import report_max_lag_seconds
 from infra.models import (
+    FINANCE_REMINDER_KIND,
     FinanceORM,
     FinanceStatus,
     InstallmentORM,
     InstallmentStatus,
     PromissoryORM,
     SaleORM,
-    WppSendStatus,
     ProductORM,
     ProductStatus,
 )
 from integrations.blibsend import (
     BlibsendError,
-    send_whatsapp_text,
+    MESSAGE_MAX_CHARS,
+    chunk_items,
     send_whatsapp_group_file_datauri,
 )
+from integrations.blibsend_dispatch import dispatch_texts
 
 from infra.storage import get_bytes  # ✅ bucket privado (KEY -> bytes)
+from services.offer_assets import OfferAssetCache
+from services.job_lock import worker_id, is_done, try_acquire_daily, finish_daily
+from services.outbox import (
+    already_queued,
+    cancel_stale,
+    claim,
+    delivery_mode,
+    enqueue,
+    mark_failed,
+    mark_sent,
+    next_due,
+)
+from services.image_pipeline import open_image, fit, encode_jpeg_max_bytes
 
 # carrega .env quando rodar como script
 load_dotenv()
 
 STATE_DIR = Path(".worker_state")
 STATE_DIR.mkdir(exist_ok=True)
-OFFERS_SENT_FILE = STATE_DIR / "offers_sent_date.txt"
+OFFER_ASSETS = OfferAssetCache(STATE_DIR / "offer_assets")
 
 
 def now_utc() -> datetime:
@@ -50,114 +67,82 @@ def today_local_date() -> date:
     return datetime.now().date()
 
 
-def already_sent_offers_today() -> bool:
-    today = today_local_date().isoformat()
-    if not OFFERS_SENT_FILE.exists():
-        return False
-    return OFFERS_SENT_FILE.read_text(encoding="utf-8").strip() == today
+# kind -> (título da mensagem avulsa, título do digest)
+DUE_SOON_KIND = "installment_due_soon"
+OVERDUE_KIND = "installment_overdue"
+REMINDER_TITLES = {
+    FINANCE_REMINDER_KIND: ("📌 Conta a pagar vencida/pendente", "📌 Contas a pagar vencidas/pendentes"),
+    DUE_SOON_KIND: (None, "🔔 Parcelas vencendo em {days} dias"),
+    OVERDUE_KIND: ("⚠️ PARCELA ATRASADA", "⚠️ PARCELAS ATRASADAS"),
+}
 
 
-def mark_offers_sent_today() -> None:
-    OFFERS_SENT_FILE.write_text(today_local_date().isoformat(), encoding="utf-8")
+def digest_enabled() -> bool:
+    return os.getenv("WORKER_DIGEST_MODE", "0").strip() == "1"
 
 
-def compute_backoff_seconds(tries: int) -> int:
-    if tries <= 0:
-        return 60
-    if tries == 1:
-        return 5 * 60
-    if tries == 2:
-        return 15 * 60
-    if tries == 3:
-        return 60 * 60
-    return 6 * 60 * 60
+def outbox_batch_size() -> int:
+    return int(os.getenv("WORKER_OUTBOX_BATCH", "200"))
 
 
-def can_try(status: WppSendStatus, next_retry_at: Optional[datetime]) -> bool:
-    if status in (WppSendStatus.SENT, WppSendStatus.SENDING):
-        return False
-    if next_retry_at is None:
-        return True
-    return next_retry_at <= now_utc()
+def reminder_days() -> int:
+    return int(os.getenv("PROMISSORY_REMINDER_DAYS", "5"))
 
 
-def mark_failed_generic(
-    *,
-    row,
-    tries_field: str,
-    status_field: str,
-    error_field: str,
-    next_retry_field: str,
-    err: str,
-) -> None:
-    tries = int(getattr(row, tries_field) or 0) + 1
-    setattr(row, tries_field, tries)
-    setattr(row, status_field, WppSendStatus.FAILED)
-    setattr(row, error_field, err[:500])
-    setattr(
-        row,
-        next_retry_field,
-        now_utc() + timedelta(seconds=compute_backoff_seconds(tries)),
+def finance_due(today: date):
+    return and_(FinanceORM.status == FinanceStatus.PENDING, FinanceORM.due_date <= today)
+
+
+def installments_due_soon(today: date, days: int):
+    return and_(
+        InstallmentORM.status == InstallmentStatus.PENDING,
+        InstallmentORM.due_date == today + timedelta(days=days),
     )
 
 
-def process_finance(db: Session, to_number: str) -> int:
-    today = today_local_date()
+def installments_overdue(today: date):
+    return and_(InstallmentORM.status == InstallmentStatus.PENDING, InstallmentORM.due_date < today)
+
+
+def produce(db: Session, *, kind: str, model, due, render, to_number: str, options=(), limit: int = 500) -> int:
+    """
+    Etapa produtora: cancela na fila o que perdeu o motivo e enfileira as
+    linhas de `model` que batem com `due` e ainda não têm mensagem `kind`.
+    """
+    ref_table = model.__tablename__
+    cancel_stale(db, kind=kind, model=model, due=due)
 
     stmt = (
-        select(FinanceORM)
-        .where(
-            and_(
-                FinanceORM.status == FinanceStatus.PENDING,
-                FinanceORM.due_date <= today,
-                FinanceORM.wpp_status != WppSendStatus.SENT,
-                or_(
-                    FinanceORM.wpp_next_retry_at.is_(None),
-                    FinanceORM.wpp_next_retry_at <= now_utc(),
-                ),
-            )
-        )
-        .order_by(FinanceORM.due_date.asc(), FinanceORM.id.asc())
-        .limit(50)
+        select(model)
+        .options(*options)
+        .where(due, ~already_queued(kind, model))
+        .order_by(model.due_date.asc(), model.id.asc())
+        .limit(limit)
     )
-
     rows = db.execute(stmt).scalars().all()
-    sent = 0
-
-    for f in rows:
-        if not can_try(f.wpp_status, f.wpp_next_retry_at):
-            continue
+    return enqueue(db, [
+        {"kind": kind, "ref_table": ref_table, "ref_id": row.id, "recipient": to_number, "body": render(row)}
+        for row in rows
+    ])
 
-        f.wpp_status = WppSendStatus.SENDING
-        db.flush()
 
-        msg = (
-            "📌 Conta a pagar vencida/pendente\n"
-            f"Empresa: {f.company}\n"
-            f"Valor: R$ {f.amount}\n"
-            f"Venc.: {f.due_date}\n"
-        )
-
-        try:
-            send_whatsapp_text(to=to_number, body=msg)
-            f.wpp_status = WppSendStatus.SENT
-            f.wpp_sent_at = now_utc()
-            f.wpp_last_error = None
-            f.wpp_next_retry_at = None
-            sent += 1
-        except BlibsendError as e:
-            mark_failed_generic(
-                row=f,
-                tries_field="wpp_tries",
-                status_field="wpp_status",
-                error_field="wpp_last_error",
-                next_retry_field="wpp_next_retry_at",
-                err=str(e),
-            )
+def render_finance(f) -> str:
+    return (
+        f"Empresa: {f.company}\n"
+        f"Valor: R$ {f.amount}\n"
+        f"Venc.: {f.due_date}\n"
+    )
 
-        db.flush()
 
-    return sent
+def produce_finance(db: Session, to_number: str) -> int:
+    return produce(
+        db,
+        kind=FINANCE_REMINDER_KIND,
+        model=FinanceORM,
+        due=finance_due(today_local_date()),
+        render=render_finance,
+        to_number=to_number,
+    )
 
 
 def format_br_phone(phone: str) -> str:
@@ -175,159 +160,111 @@ def format_br_phone(phone: str) -> str:
     return phone or "-"
 
 
-def process_installments_due_soon(db: Session, to_number: str) -> int:
-    days = int(os.getenv("PROMISSORY_REMINDER_DAYS", "5"))
-    today = today_local_date()
-    target = today + timedelta(days=days)
-
-    stmt = (
-        select(InstallmentORM)
-        .options(
-            selectinload(InstallmentORM.promissory).selectinload(PromissoryORM.client),
-            selectinload(InstallmentORM.promissory).selectinload(PromissoryORM.product),
-            selectinload(InstallmentORM.promissory)
-            .selectinload(PromissoryORM.sale)
-            .selectinload(SaleORM.product),
-        )
-        .where(
-            and_(
-                InstallmentORM.status == InstallmentStatus.PENDING,
-                InstallmentORM.due_date == target,
-                InstallmentORM.wa_due_status != WppSendStatus.SENT,
-                or_(
-                    InstallmentORM.wa_due_next_retry_at.is_(None),
-                    InstallmentORM.wa_due_next_retry_at <= now_utc(),
-                ),
-            )
-        )
-        .order_by(InstallmentORM.due_date.asc(), InstallmentORM.id.asc())
-        .limit(200)
-    )
-
-    rows = db.execute(stmt).scalars().all()
-    sent = 0
-
-    for inst in rows:
-        if not can_try(inst.wa_due_status, inst.wa_due_next_retry_at):
-            continue
-
-        inst.wa_due_status = WppSendStatus.SENDING
-        db.flush()
-
-        prom = inst.promissory
-        client = prom.client if prom else None
-
-        product = None
-        if prom is not None:
-            product = prom.product
-            if product is None and prom.sale is not None:
-                product = prom.sale.product
+INSTALLMENT_OPTIONS = (
+    selectinload(InstallmentORM.promissory).selectinload(PromissoryORM.client),
+    selectinload(InstallmentORM.promissory).selectinload(PromissoryORM.product),
+    selectinload(InstallmentORM.promissory)
+    .selectinload(PromissoryORM.sale)
+    .selectinload(SaleORM.product),
+)
 
-        client_name = (client.name if client else "-") or "-"
-        client_phone = format_br_phone(client.phone if client else "")
 
-        moto_label = f"{product.brand} {product.model} ({product.year})" if product else "Produto -"
-        due_str = inst.due_date.strftime("%d/%m/%Y")
+def render_installment(inst, amount_label: str) -> str:
+    prom = inst.promissory
+    client = prom.client if prom else None
 
-        msg = (
-            f"{client_name}\n"
-            f"{client_phone} • {moto_label} • Próx: R$ {inst.amount} • Venc: {due_str}"
-        )
+    product = None
+    if prom is not None:
+        product = prom.product
+        if product is None and prom.sale is not None:
+            product = prom.sale.product
 
-        try:
-            send_whatsapp_text(to=to_number, body=msg)
-            inst.wa_due_status = WppSendStatus.SENT
-            inst.wa_due_sent_at = now_utc()
-            inst.wa_due_last_error = None
-            inst.wa_due_next_retry_at = None
-            sent += 1
-        except BlibsendError as e:
-            tries = int(inst.wa_due_tries or 0) + 1
-            inst.wa_due_tries = tries
-            inst.wa_due_status = WppSendStatus.FAILED
-            inst.wa_due_last_error = str(e)[:500]
-            inst.wa_due_next_retry_at = now_utc() + timedelta(seconds=compute_backoff_seconds(tries))
+    client_name = (client.name if client else "-") or "-"
+    client_phone = format_br_phone(client.phone if client else "")
 
-        db.flush()
+    moto_label = f"{product.brand} {product.model} ({product.year})" if product else "Produto -"
+    due_str = inst.due_date.strftime("%d/%m/%Y")
 
-    return sent
-
-
-def process_installments_overdue(db: Session, to_number: str) -> int:
-    today = today_local_date()
-
-    stmt = (
-        select(InstallmentORM)
-        .options(
-            selectinload(InstallmentORM.promissory).selectinload(PromissoryORM.client),
-            selectinload(InstallmentORM.promissory).selectinload(PromissoryORM.product),
-            selectinload(InstallmentORM.promissory)
-            .selectinload(PromissoryORM.sale)
-            .selectinload(SaleORM.product),
-        )
-        .where(
-            and_(
-                InstallmentORM.status == InstallmentStatus.PENDING,
-                InstallmentORM.due_date < today,
-                InstallmentORM.wa_overdue_status != WppSendStatus.SENT,
-                or_(
-                    InstallmentORM.wa_overdue_next_retry_at.is_(None),
-                    InstallmentORM.wa_overdue_next_retry_at <= now_utc(),
-                ),
-            )
-        )
-        .order_by(InstallmentORM.due_date.asc(), InstallmentORM.id.asc())
-        .limit(100)
+    return (
+        f"{client_name}\n"
+        f"{client_phone} • {moto_label} • {amount_label}: R$ {inst.amount} • Venc: {due_str}"
     )
 
-    rows = db.execute(stmt).scalars().all()
-    sent = 0
 
-    for inst in rows:
-        if not can_try(inst.wa_overdue_status, inst.wa_overdue_next_retry_at):
-            continue
+def produce_installments_due_soon(db: Session, to_number: str) -> int:
+    return produce(
+        db,
+        kind=DUE_SOON_KIND,
+        model=InstallmentORM,
+        due=installments_due_soon(today_local_date(), reminder_days()),
+        render=lambda inst: render_installment(inst, "Próx"),
+        to_number=to_number,
+        options=INSTALLMENT_OPTIONS,
+    )
 
-        inst.wa_overdue_status = WppSendStatus.SENDING
-        db.flush()
 
-        prom = inst.promissory
-        client = prom.client if prom else None
+def produce_installments_overdue(db: Session, to_number: str) -> int:
+    return produce(
+        db,
+        kind=OVERDUE_KIND,
+        model=InstallmentORM,
+        due=installments_overdue(today_local_date()),
+        render=lambda inst: render_installment(inst, "Parcela"),
+        to_number=to_number,
+        options=INSTALLMENT_OPTIONS,
+    )
 
-        product = None
-        if prom is not None:
-            product = prom.product
-            if product is None and prom.sale is not None:
-                product = prom.sale.product
 
-        client_name = (client.name if client else "-") or "-"
-        client_phone = format_br_phone(client.phone if client else "")
+def send_messages(db: Session, rows: list) -> int:
+    """
+    Consumidor: envia as mensagens já reservadas (claim) da fila.
 
-        moto_label = f"{product.brand} {product.model} ({product.year})" if product else "Produto -"
-        due_str = inst.due_date.strftime("%d/%m/%Y")
+    Modo normal: uma mensagem WhatsApp por linha (título do kind + corpo).
+    Modo digest (WORKER_DIGEST_MODE=1): junta as linhas por destino e kind
+    em poucas mensagens de até MESSAGE_MAX_CHARS; cada mensagem marca todas
+    as suas linhas juntas (SENT ou FAILED). Retorna quantas linhas saíram.
+    """
+    if not rows:
+        return 0
+
+    messages = []
+    if digest_enabled():
+        groups: dict = {}
+        for row in rows:
+            groups.setdefault((row.recipient, row.kind), []).append(row)
+
+        for (to, kind), entries in groups.items():
+            digest_title = REMINDER_TITLES.get(kind, (None, kind))[1].format(days=reminder_days())
+            header = f"{digest_title} ({len(entries)})"
+            chunks = chunk_items(entries, lambda r: len(r.body) + 2, MESSAGE_MAX_CHARS - len(header) - 16)
+            for i, chunk in enumerate(chunks, start=1):
+                part = f" [{i}/{len(chunks)}]" if len(chunks) > 1 else ""
+                body = f"{header}{part}\n\n" + "\n\n".join(r.body.strip() for r in chunk)
+                messages.append((chunk, to, body))
+    else:
+        for row in rows:
+            title = REMINDER_TITLES.get(row.kind, (None, None))[0]
+            messages.append(([row], row.recipient, f"{title}\n{row.body}" if title else row.body))
 
-        msg = (
-            "⚠️ PARCELA ATRASADA\n"
-            f"{client_name}\n"
-            f"{client_phone} • {moto_label} • Parcela: R$ {inst.amount} • Venc: {due_str}"
-        )
+    sent = 0
+    # envio em paralelo; write-back aqui (thread do worker) conforme termina,
+    # com commit por mensagem: resultado entregue fica gravado mesmo que
+    # algo falhe depois no ciclo
+    for chunk, err in dispatch_texts(messages):
+        for row in chunk:
+            if err is None:
+                mark_sent(row)
+                sent += 1
+            else:
+                mark_failed(row, str(err))
+        db.commit()
 
-        try:
-            send_whatsapp_text(to=to_number, body=msg)
-            inst.wa_overdue_status = WppSendStatus.SENT
-            inst.wa_overdue_sent_at = now_utc()
-            inst.wa_overdue_last_error = None
-            inst.wa_overdue_next_retry_at = None
-            sent += 1
-        except BlibsendError as e:
-            tries = int(inst.wa_overdue_tries or 0) + 1
-            inst.wa_overdue_tries = tries
-            inst.wa_overdue_status = WppSendStatus.FAILED
-            inst.wa_overdue_last_error = str(e)[:500]
-            inst.wa_overdue_next_retry_at = now_utc() + timedelta(seconds=compute_backoff_seconds(tries))
+    return sent
 
-        db.flush()
 
-    return sent
+def process_outbound(db: Session) -> int:
+    rows = claim(db, owner=worker_id(), limit=outbox_batch_size())
+    return send_messages(db, rows)
 
 
 def image_bytes_to_data_uri_jpeg_optimized(
@@ -342,25 +279,11 @@ def image_bytes_to_data_uri_jpeg_optimized(
       data:image/jpeg;base64,...
     """
     try:
-        with Image.open(io.BytesIO(image_bytes)) as img:
-            img = img.convert("RGB")
-
-            w, h = img.size
-            scale = min(1.0, max_dim / float(max(w, h)))
-            if scale < 1.0:
-                img = img.resize((int(w * scale), int(h * scale)))
-
-            q = int(quality)
-            while True:
-                buf = io.BytesIO()
-                img.save(buf, format="JPEG", quality=q, optimize=True)
-                raw = buf.getvalue()
-
-                if len(raw) <= max_bytes or q <= 35:
-                    b64 = base64.b64encode(raw).decode("utf-8")
-                    return f"data:image/jpeg;base64,{b64}"
-
-                q -= 10
+        # draft: JPEG grande já sai do decoder reduzido (perto de max_dim)
+        img = fit(open_image(io.BytesIO(image_bytes), max_dim=max_dim), max_dim)
+        raw = encode_jpeg_max_bytes(img, quality=quality, max_bytes=max_bytes)
+        b64 = base64.b64encode(raw).decode("utf-8")
+        return f"data:image/jpeg;base64,{b64}"
     except Exception as e:
         raise BlibsendError(f"Erro ao processar imagem (PIL): {e}")
 
@@ -385,6 +308,37 @@ def load_cover_bytes(cover_ref: str) -> bytes:
     return get_bytes(cover_ref)
 
 
+def build_offer_body(cover, *, max_dim: int, quality: int, max_bytes: int) -> str:
+    """
+    Data URI da capa para a oferta, montado uma vez por imagem e reaproveitado
+    entre os dias (cache em .worker_state/offer_assets).
+    """
+    offer_ref = (cover.offer_url or "").strip()  # JPEG já pronto (gerado no upload)
+    if offer_ref:
+        def _from_variant() -> str:
+            raw = load_cover_bytes(offer_ref)
+            return f"data:image/jpeg;base64,{base64.b64encode(raw).decode('utf-8')}"
+
+        return OFFER_ASSETS.get_or_build(offer_ref, "variant", _from_variant)
+
+    # imagens antigas (antes das variantes): reencoda a original
+    cover_ref = (cover.url or "").strip()  # ✅ KEY do bucket
+
+    def _reencode() -> str:
+        print(
+            f"[worker] offers: encoding image {cover_ref} "
+            f"(max_dim={max_dim}, quality={quality}, max_bytes={max_bytes})"
+        )
+        return image_bytes_to_data_uri_jpeg_optimized(
+            load_cover_bytes(cover_ref),
+            max_dim=max_dim,
+            quality=quality,
+            max_bytes=max_bytes,
+        )
+
+    return OFFER_ASSETS.get_or_build(cover_ref, f"jpeg-{max_dim}-{quality}-{max_bytes}", _reencode)
+
+
 def process_daily_product_offers(db: Session, group_to: str) -> int:
     limit_query = int(os.getenv("PRODUCTS_OFFER_LIMIT", "20"))
     max_per_day = int(os.getenv("OFFERS_MAX_PER_DAY", "5"))
@@ -403,6 +357,9 @@ def process_daily_product_offers(db: Session, group_to: str) -> int:
     )
 
     products = db.execute(stmt).scalars().all()
+    # libera a conexão antes dos envios (minutos, com sleep entre eles);
+    # imagens já vieram no selectinload
+    db.close()
     print(
         f"[worker] offers: found {len(products)} products IN_STOCK "
         f"(query_limit={limit_query}, max_per_day={max_per_day}, interval={interval_s}s)"
@@ -420,7 +377,6 @@ def process_daily_product_offers(db: Session, group_to: str) -> int:
             continue
 
         cover = images[0]
-        cover_ref = (cover.url or "").strip()  # ✅ KEY do bucket
 
         title = (
             "🔥 OFERTA DO DIA 🔥\n"
@@ -430,19 +386,8 @@ def process_daily_product_offers(db: Session, group_to: str) -> int:
         )
 
         try:
-            print(f"[worker] offers: loading image product {p.id} from bucket...")
-            img_bytes = load_cover_bytes(cover_ref)
-
-            print(
-                f"[worker] offers: encoding image product {p.id} "
-                f"(max_dim={max_dim}, quality={quality}, max_bytes={max_bytes})"
-            )
-            body = image_bytes_to_data_uri_jpeg_optimized(
-                img_bytes,
-                max_dim=max_dim,
-                quality=quality,
-                max_bytes=max_bytes,
-            )
+            print(f"[worker] offers: preparing image product {p.id}...")
+            body = build_offer_body(cover, max_dim=max_dim, quality=quality, max_bytes=max_bytes)
 
             print(f"[worker] offers: sending product {p.id} to group={group_to}")
             send_whatsapp_group_file_datauri(
@@ -460,10 +405,102 @@ def process_daily_product_offers(db: Session, group_to: str) -> int:
         except BlibsendError as e:
             print(f"[worker] offers: FAILED product {p.id}: {e}")
 
-    print(f"[worker] offers: sent total={sent}")
+    pruned = OFFER_ASSETS.prune()
+    print(
+        f"[worker] offers: sent total={sent} "
+        f"(asset cache hits={OFFER_ASSETS.hits} misses={OFFER_ASSETS.misses} pruned={pruned})"
+    )
     return sent
 
 
+OFFERS_JOB = "daily_offers"
+
+
+def run_daily_offers(db: Session, group_to: str, offer_hour: int) -> int:
+    """
+    Oferta do dia com trava no banco (job_locks): com várias réplicas,
+    só uma roda, e o dia só fica marcado quando algo foi enviado.
+    """
+    now_local = datetime.now()
+    today = today_local_date()
+    sent_today = is_done(db, OFFERS_JOB, day=today)
+    print(f"[worker] offers check: now={now_local} offer_hour={offer_hour} sent_today={sent_today}")
+
+    if now_local.hour < offer_hour or sent_today:
+        return 0
+
+    owner = worker_id()
+    lease = int(os.getenv("OFFERS_LOCK_LEASE_SECONDS", "1800"))
+    if not try_acquire_daily(db, OFFERS_JOB, day=today, owner=owner, lease_seconds=lease):
+        print("[worker] offers: outra réplica está com o job, pulando")
+        return 0
+
+    print(f"[worker] offers: starting... (owner={owner})")
+    try:
+        # scan de produtos na réplica (se houver); a trava fica no primário
+        with read_session(max_lag_seconds=report_max_lag_seconds()) as rdb:
+            d = process_daily_product_offers(rdb, group_to)
+    except Exception:
+        db.rollback()
+        finish_daily(db, OFFERS_JOB, day=today, owner=owner, done=False)
+        raise
+
+    finish_daily(db, OFFERS_JOB, day=today, owner=owner, done=d > 0)
+    if d > 0:
+        print("[worker] offers: locked day (sent_today=True)")
+    else:
+        print("[worker] offers: nothing sent, NOT locking the day")
+    return d
+
+
+def next_offers_at(db: Session, offer_hour: int) -> datetime:
+    now_local = datetime.now()
+    today = now_local.date()
+    at = datetime.combine(today, datetime.min.time()).replace(hour=offer_hour)
+    if is_done(db, OFFERS_JOB, day=today):
+        at += timedelta(days=1)
+    elif at < now_local:
+        at = now_local
+    return at.astimezone(timezone.utc)  # naive = horário local
+
+
+def next_midnight() -> datetime:
+    tomorrow = today_local_date() + timedelta(days=1)
+    return datetime.combine(tomorrow, datetime.min.time()).astimezone(timezone.utc)
+
+
+def build_schedule(db: Session, *, offer_hour: int, offers_not_before: Optional[datetime] = None) -> list:
+    """
+    Heap (instante UTC, motivo) com a próxima mensagem da fila de saída,
+    a virada do dia (lembretes por data mudam de alvo à meia-noite) e a
+    oferta do dia. Refeita a cada acordada: o topo diz até quando o worker
+    pode dormir.
+    """
+    heap = [(next_midnight(), "midnight")]
+
+    at = next_due(db)
+    if at is not None:
+        heapq.heappush(heap, (at, "outbound"))
+
+    offers = next_offers_at(db, offer_hour)
+    if offers_not_before is not None:
+        # nada para ofertar no ciclo anterior: não tenta de novo em loop
+        offers = max(offers, offers_not_before)
+    heapq.heappush(heap, (offers, "offers"))
+    return heap
+
+
+def seconds_until_next(heap: list, *, max_sleep: float, min_sleep: float = 1.0) -> tuple:
+    """
+    (segundos a dormir, motivo) do topo do heap, limitado a [min_sleep, max_sleep].
+    """
+    at, reason = heap[0]
+    wait = (at - now_utc()).total_seconds()
+    if wait > max_sleep:
+        return max_sleep, "max_sleep"
+    return max(min_sleep, wait), reason
+
+
 def run_loop() -> None:
     to_number = os.getenv("BLIBSEND_DEFAULT_TO", "").strip()
     if not to_number:
@@ -474,7 +511,7 @@ def run_loop() -> None:
         raise RuntimeError("Configure BLIBSEND_PRODUCTS_GROUP_TO no .env (grupo destino).")
 
     interval = int(os.getenv("WORKER_INTERVAL_SECONDS", "30"))
-    days = int(os.getenv("PROMISSORY_REMINDER_DAYS", "5"))
+    days = reminder_days()
 
     offer_hour = int(os.getenv("PRODUCTS_OFFER_HOUR", "9"))
     offer_limit = int(os.getenv("PRODUCTS_OFFER_LIMIT", "20"))
@@ -482,47 +519,63 @@ def run_loop() -> None:
     offer_max = int(os.getenv("OFFERS_MAX_PER_DAY", "5"))
 
     print(
-        f"[worker] started. interval={interval}s to={to_number} due_soon_days={days} "
+        f"[worker] started. interval={interval}s delivery={delivery_mode()} to={to_number} due_soon_days={days} "
         f"offers_hour={offer_hour} offers_limit={offer_limit} offers_interval={offer_interval}s "
         f"offers_max={offer_max} group_to={group_to}"
     )
 
-    while True:
-        started = time.time()
-
-        with SessionLocal() as db:
-            try:
-                a = process_finance(db, to_number)
-                c = process_installments_due_soon(db, to_number)
-                b = process_installments_overdue(db, to_number)
-
-                d = 0
-                now_local = datetime.now()
-                sent_today = already_sent_offers_today()
-                print(f"[worker] offers check: now={now_local} offer_hour={offer_hour} sent_today={sent_today}")
+    # Postgres: dorme no LISTEN e acorda assim que finance/installments/sales
+    # mudam; no SQLite é o sleep de sempre (polling)
+    listener = WakeupListener(engine)
+    print(f"[worker] wakeups: {'LISTEN/NOTIFY' if listener.enabled else 'polling'}")
 
-                if now_local.hour >= offer_hour and not sent_today:
-                    print("[worker] offers: starting...")
-                    d = process_daily_product_offers(db, group_to)
+    # dorme até o próximo evento agendado (retry, lease, meia-noite, oferta).
+    # Com LISTEN, insert/update novo acorda na hora, então o teto pode ser
+    # longo; no polling o teto é o intervalo (é o único jeito de ver linha nova)
+    max_sleep = int(os.getenv("WORKER_MAX_SLEEP_SECONDS", "3600")) if listener.enabled else interval
+    offers_not_before = None
 
-                    if d > 0:
-                        mark_offers_sent_today()
-                        print("[worker] offers: locked day (sent_today=True)")
-                    else:
-                        print("[worker] offers: nothing sent, NOT locking the day")
-
-                db.commit()
+    while True:
 
-                if a or b or c or d:
-                    print(f"[worker] sent finance={a} due_soon_installments={c} overdue_installments={b} offers={d}")
+        # cada etapa com sessão/transação própria: erro numa não desfaz nem
+        # impede as outras (claims e resultados já são commitados por linha)
+        # produtores enfileiram em outbound_messages; "sent" esvazia a fila
+        steps = (
+            ("finance", lambda db: produce_finance(db, to_number)),
+            ("due_soon_installments", lambda db: produce_installments_due_soon(db, to_number)),
+            ("overdue_installments", lambda db: produce_installments_overdue(db, to_number)),
+            ("sent", process_outbound),
+            ("offers", lambda db: run_daily_offers(db, group_to, offer_hour)),
+        )
+        counts = {}
+        for name, step in steps:
+            with SessionLocal() as db:
+                try:
+                    counts[name] = step(db)
+                    db.commit()
+                except Exception as e:
+                    db.rollback()
+                    counts[name] = 0
+                    print(f"[worker] ERROR ({name}): {e}")
+
+        if any(counts.values()):
+            print("[worker] cycle " + " ".join(f"{k}={v}" for k, v in counts.items()))
+
+        if counts["offers"] == 0:
+            offers_not_before = now_utc() + timedelta(seconds=interval)
 
+        with SessionLocal() as db:
+            try:
+                heap = build_schedule(db, offer_hour=offer_hour, offers_not_before=offers_not_before)
+                sleep_for, reason = seconds_until_next(heap, max_sleep=max_sleep)
             except Exception as e:
-                db.rollback()
-                print(f"[worker] ERROR: {e}")
+                print(f"[worker] ERROR (schedule): {e}")
+                sleep_for, reason = interval, "fallback"
 
-        elapsed = time.time() - started
-        sleep_for = max(1, interval - int(elapsed))
-        time.sleep(sleep_for)
+        print(f"[worker] next: {reason} in {sleep_for:.0f}s")
+        woke = listener.wait(sleep_for)
+        if woke:
+            print(f"[worker] woke up by notify: {sorted(set(woke))}")
 
 
 if __name__ == "__main__":
@@ -1,5 +1,10 @@
 from __future__ import annotations
 
+import os
+
+# o banco de teste sai do create_all abaixo, não das migrations
+os.environ.setdefault("DB_SCHEMA_CHECK", "off")
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -49,6 +54,38 @@ def db_session(engine):
         session.close()
 
 
+@pytest.fixture()
+def fresh_engine():
+    """
+    SQLite em memória só deste teste (o `engine` acima é compartilhado
+    pela sessão inteira): para contadores, filas e planos de query que não
+    podem ver dados de outros testes.
+    """
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+        future=True,
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture()
+def fresh_sessionmaker(fresh_engine):
+    return sessionmaker(bind=fresh_engine, autoflush=False, expire_on_commit=False, future=True)
+
+
+@pytest.fixture()
+def fresh_db(fresh_sessionmaker):
+    session = fresh_sessionmaker()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
 @pytest.fixture()
 def client(db_session):
     # override do get_db para usar SQLite em memória nos testes
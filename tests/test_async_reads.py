@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api import deps
+from app.api.routers import clients, installments, products, sales
+from app.infra import db as infra_db
+from app.infra.models import (
+    Base,
+    ClientORM,
+    InstallmentORM,
+    InstallmentStatus,
+    PaymentType,
+    ProductImageORM,
+    ProductORM,
+    ProductStatus,
+    PromissoryORM,
+    PromissoryStatus,
+    SaleORM,
+    SaleStatus,
+    UserORM,
+    UserRole,
+)
+from app.services.jwt_service import create_access_token
+
+ROUTERS = {"clients": clients, "products": products, "sales": sales, "installments": installments}
+
+
+def _seed(db) -> UserORM:
+    user = UserORM(name="Vendedor", email="v@v.com", password_hash="x", role=UserRole.ADMIN)
+    cl = [ClientORM(name=f"Cliente {i}", phone=f"8399{i:07d}") for i in range(3)]
+    db.add_all([user, *cl])
+    db.flush()
+
+    for i in range(3):
+        p = ProductORM(
+            brand="Honda", model=f"CG {i}", year=2024, chassi=f"CH{i:08d}", color="Preta",
+            cost_price=Decimal("10000.00"), sale_price=Decimal("12500.00"), status=ProductStatus.SOLD,
+        )
+        p.images = [ProductImageORM(url=f"products/{i}/1.jpg", thumb_url=f"products/{i}/1_thumb.webp", position=1)]
+        sale = SaleORM(
+            public_id=f"VEN-{i}", client=cl[i], user=user, product=p, total=Decimal("12000.00"),
+            discount=Decimal("0"), entry_amount=Decimal("2000.00"),
+            payment_type=PaymentType.PROMISSORY, status=SaleStatus.CONFIRMED,
+        )
+        prom = PromissoryORM(
+            public_id=f"PROM-{i}", sale=sale, client=cl[i], product=p, total=sale.total,
+            entry_amount=sale.entry_amount, status=PromissoryStatus.ISSUED,
+        )
+        prom.installments = [
+            InstallmentORM(number=n, due_date=date(2026, 1, 10) + timedelta(days=30 * n),
+                           amount=Decimal("833.33"), status=InstallmentStatus.PENDING)
+            for n in range(1, 4)
+        ]
+        db.add_all([p, sale, prom])
+    db.commit()
+    return user
+
+
+@pytest.fixture()
+def api(tmp_path, monkeypatch):
+    """
+    Routers sync e async lado a lado (/sync/... e /async/...) sobre o mesmo
+    arquivo SQLite: pysqlite num, aiosqlite no outro.
+    """
+    path = tmp_path / "reads.db"
+    engine = create_engine(f"sqlite+pysqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    AsyncSessionLocal = async_sessionmaker(create_async_engine(f"sqlite+aiosqlite:///{path}"), expire_on_commit=False)
+
+    with SessionLocal() as db:
+        user = _seed(db)
+
+    app = FastAPI()
+    for name, mod in ROUTERS.items():
+        app.include_router(mod.router, prefix=f"/sync/{name}")
+        app.include_router(mod.async_router, prefix=f"/async/{name}")
+
+    def _get_db():
+        with SessionLocal() as db:
+            yield db
+
+    async def _get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[deps.DBSession.dependency] = _get_db
+    app.dependency_overrides[deps.AsyncDBSession.dependency] = _get_async_db
+    monkeypatch.setattr(products, "presign_get_url", lambda key, expires_seconds: f"https://cdn.test/{key}")
+
+    token = create_access_token(sub=str(user.id), role=user.role.value)
+    with TestClient(app, headers={"Authorization": f"Bearer {token}"}) as c:
+        yield c
+
+
+@pytest.mark.parametrize("path", [
+    "/clients?limit=2",
+    "/clients?q=Cliente%201",
+    "/products?limit=2",
+    "/products?status=SOLD&q=cg",
+    "/products/1",
+    "/products/999",
+    "/sales?page_size=2",
+    "/sales?payment_type=CASH",
+    "/sales?payment_type=XX",
+    "/installments?include=client,product&order=due_date&limit=4",
+    "/installments?order=xx",
+])
+def test_async_routes_match_sync(api, path):
+    sync_resp = api.get(f"/sync{path}")
+    async_resp = api.get(f"/async{path}")
+
+    assert async_resp.status_code == sync_resp.status_code
+    assert async_resp.json() == sync_resp.json()
+    assert async_resp.headers.get("X-Next-Cursor") == sync_resp.headers.get("X-Next-Cursor")
+
+
+def test_async_cursor_walks_every_row(api):
+    seen, cursor = [], None
+    while True:
+        r = api.get("/async/installments", params={"order": "due_date", "limit": 4, **({"cursor": cursor} if cursor else {})})
+        assert r.status_code == 200
+        seen += [i["id"] for i in r.json()]
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert sorted(seen) == list(range(1, 10))
+
+
+def test_async_routes_require_token(api):
+    r = api.get("/async/clients", headers={"Authorization": "Bearer invalido"})
+    assert r.status_code == 401
+
+
+def test_async_url_swaps_driver(monkeypatch):
+    monkeypatch.delenv("DATABASE_ASYNC_URL", raising=False)
+    monkeypatch.setattr(infra_db.settings, "DATABASE_URL", "postgresql+psycopg2://u:p@db:5432/moto_store")
+    assert infra_db.async_database_url() == "postgresql+asyncpg://u:p@db:5432/moto_store"
+
+    monkeypatch.setenv("DATABASE_ASYNC_URL", "postgresql+asyncpg://u:p@replica/moto_store")
+    assert infra_db.async_database_url() == "postgresql+asyncpg://u:p@replica/moto_store"
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+from jose import jwt
+from sqlalchemy import event
+
+from app.api import auth_deps
+from app.infra.models import UserORM, UserRole
+from app.services.jwt_service import create_access_token
+
+
+@pytest.fixture(autouse=True)
+def _clean_cache():
+    auth_deps.USER_CACHE.clear()
+    yield
+    auth_deps.USER_CACHE.clear()
+
+
+@pytest.fixture()
+def user(db_session):
+    u = UserORM(name="Cache", email=f"cache{time.time_ns()}@t.com", password_hash="x", role=UserRole.STAFF)
+    db_session.add(u)
+    db_session.flush()
+    return u
+
+
+def _old_token(user_id: int, role: str, age_seconds: int) -> str:
+    now = int(time.time()) - age_seconds
+    return jwt.encode(
+        {"sub": str(user_id), "role": role, "iat": now, "exp": now + 3600},
+        auth_deps.JWT_SECRET_KEY, algorithm=auth_deps.JWT_ALGORITHM,
+    )
+
+
+@pytest.fixture()
+def statements(db_session):
+    calls = []
+
+    def _capture(conn, cursor, statement, *args):
+        calls.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", _capture)
+    yield calls
+    event.remove(engine, "before_cursor_execute", _capture)
+
+
+def test_fresh_token_role_skips_db(db_session, user, statements):
+    token = create_access_token(sub=str(user.id), role="STAFF")
+    del statements[:]
+
+    current = auth_deps.get_current_user(token=token, db=db_session)
+
+    assert (current.id, current.role) == (user.id, UserRole.STAFF)
+    assert statements == []
+    assert auth_deps.USER_CACHE.stats()["token_hits"] == 1
+
+
+def test_old_token_reads_db_once_then_cache(db_session, user, statements):
+    token = _old_token(user.id, "ADMIN", age_seconds=3000)  # claim velho: não confia
+    db_session.expunge_all()
+    del statements[:]
+
+    first = auth_deps.get_current_user(token=token, db=db_session)
+    second = auth_deps.get_current_user(token=token, db=db_session)
+
+    # o role vem do banco (STAFF), não do claim antigo
+    assert first == second
+    assert (first.role, first.name) == (UserRole.STAFF, "Cache")
+    assert len(statements) == 1
+    assert auth_deps.USER_CACHE.stats()["hits"] == 1
+
+
+def test_invalidation_distrusts_earlier_tokens(db_session, user):
+    token = _old_token(user.id, "ADMIN", age_seconds=5)
+    auth_deps.USER_CACHE.invalidate(user.id)  # ex.: usuário alterado depois do login
+    db_session.expunge_all()
+
+    current = auth_deps.get_current_user(token=token, db=db_session)
+    assert current.role == UserRole.STAFF  # relido do banco
+
+
+def test_unknown_user_is_rejected(db_session):
+    token = _old_token(987654, "ADMIN", age_seconds=3000)
+    with pytest.raises(auth_deps.HTTPException) as e:
+        auth_deps.get_current_user(token=token, db=db_session)
+    assert e.value.status_code == 401
+
+
+def test_require_roles_uses_cached_role(db_session, user):
+    token = create_access_token(sub=str(user.id), role="STAFF")
+    current = auth_deps.get_current_user(token=token, db=db_session)
+
+    with pytest.raises(auth_deps.HTTPException) as e:
+        auth_deps.require_roles(UserRole.ADMIN)(user=current)
+    assert e.value.status_code == 403
+    assert auth_deps.require_roles(UserRole.STAFF)(user=current) is current
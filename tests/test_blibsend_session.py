@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import pytest
+
+from app.integrations import blibsend
+from app.scripts.fake_blibsend import FakeBlibsend
+
+
+@pytest.fixture()
+def fake(monkeypatch):
+    # FakeBlibsend grava BLIBSEND_* no ambiente; monkeypatch restaura no fim
+    for k in ("BLIBSEND_BASE_URL", "BLIBSEND_CLIENT_ID", "BLIBSEND_CLIENT_SECRET", "BLIBSEND_SESSION_TOKEN"):
+        monkeypatch.setenv(k, "")
+    monkeypatch.setenv("BLIBSEND_RETRY_BACKOFF_SECONDS", "0")
+    monkeypatch.setenv("BLIBSEND_TOKEN_PERSIST", "0")
+    monkeypatch.setattr(blibsend, "_TOKEN_CACHE", None)
+    blibsend.reset_http_session()
+
+    with FakeBlibsend() as f:
+        yield f
+
+    blibsend.reset_http_session()
+
+
+def test_send_reuses_connection_and_retries_429_503(fake):
+    fake.script = [(429, {"Retry-After": "0"}), (503, {"Retry-After": "0"})]
+
+    blibsend.send_whatsapp_text(to="5583999999999", body="oi")
+    blibsend.send_whatsapp_text(to="5583999999999", body="oi de novo")
+
+    assert fake.counts == {"signin": 1, "messages": 2}
+    assert fake.connections == 1
+
+
+@pytest.mark.parametrize("status, headers", [(500, {}), (502, {}), (504, {}), (503, {})])
+def test_send_does_not_retry_without_retry_after(fake, status, headers):
+    # gateway/erro sem Retry-After: o envio pode ter acontecido, não repete
+    fake.script = [(status, headers)]
+
+    with pytest.raises(blibsend.BlibsendError, match=str(status)):
+        blibsend.send_whatsapp_text(to="5583999999999", body="oi")
+
+    assert fake.counts["messages"] == 0
+    assert fake.script == []
+
+
+def test_signin_retries_gateway_errors(fake):
+    fake.signin_script = [(502, {}), (504, {})]
+
+    blibsend.send_whatsapp_text(to="5583999999999", body="oi")
+
+    assert fake.counts == {"signin": 1, "messages": 1}
+    assert fake.signin_script == []
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+from sqlalchemy import select
+
+from app.infra.models import IntegrationTokenORM
+from app.integrations import blibsend
+from app.scripts.fake_blibsend import FakeBlibsend
+
+
+@pytest.fixture()
+def fake(monkeypatch):
+    for k in ("BLIBSEND_BASE_URL", "BLIBSEND_CLIENT_ID", "BLIBSEND_CLIENT_SECRET", "BLIBSEND_SESSION_TOKEN"):
+        monkeypatch.setenv(k, "")
+    monkeypatch.setattr(blibsend, "_TOKEN_CACHE", None)
+    blibsend.reset_http_session()
+
+    with FakeBlibsend(latency_ms=50) as f:
+        yield f
+
+    blibsend.reset_http_session()
+
+
+@pytest.fixture()
+def token_db(fresh_sessionmaker, monkeypatch):
+    monkeypatch.setattr(blibsend, "_token_db", fresh_sessionmaker)
+    return fresh_sessionmaker
+
+
+def test_concurrent_get_token_signs_in_once(fake, monkeypatch):
+    monkeypatch.setenv("BLIBSEND_TOKEN_PERSIST", "0")
+
+    tokens = []
+    threads = [threading.Thread(target=lambda: tokens.append(blibsend.get_token())) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert fake.counts["signin"] == 1
+    assert set(tokens) == {"fake-token-1"}
+
+
+def test_token_is_shared_through_integration_tokens(fake, token_db, monkeypatch):
+    assert blibsend.get_token() == "fake-token-1"
+
+    with token_db() as db:
+        row = db.execute(select(IntegrationTokenORM)).scalar_one()
+        assert (row.provider, row.access_token) == ("blibsend", "fake-token-1")
+
+    # outro processo / restart: lê do banco, sem signin
+    monkeypatch.setattr(blibsend, "_TOKEN_CACHE", None)
+    assert blibsend.get_token() == "fake-token-1"
+    assert fake.counts["signin"] == 1
+
+    # 401 com o token do banco: não reaproveita o mesmo, renova e grava
+    assert blibsend._refresh_token(bad_token="fake-token-1") == "fake-token-2"
+    with token_db() as db:
+        assert db.get(IntegrationTokenORM, "blibsend").access_token == "fake-token-2"
+
+
+def test_early_refresh_failure_keeps_current_token(fake, monkeypatch):
+    monkeypatch.setenv("BLIBSEND_TOKEN_PERSIST", "0")
+    # dentro da margem de renovação, mas ainda válido
+    monkeypatch.setattr(
+        blibsend, "_TOKEN_CACHE", blibsend._TokenCache(token="old", expires_at_epoch=blibsend.time.time() + 60)
+    )
+    monkeypatch.setenv("BLIBSEND_CLIENT_SECRET", "")  # signin vai falhar
+
+    assert blibsend.get_token() == "old"
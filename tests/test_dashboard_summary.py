@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+from freezegun import freeze_time
+
+from app.infra.models import (
+    UserORM,
+    ClientORM,
+    ProductORM,
+    ProductStatus,
+    FinanceORM,
+    FinanceStatus,
+    PaymentType,
+)
+from app.services.sales_service import create_sale
+from app.services.dashboard_service import dashboard_summary
+
+
+def _product(chassi: str, price: str, status=ProductStatus.IN_STOCK) -> ProductORM:
+    return ProductORM(
+        brand="honda", model="bros", year=2026, chassi=chassi, color="Azul",
+        cost_price=Decimal("10"), sale_price=Decimal(price), status=status,
+    )
+
+
+@freeze_time("2026-01-30")
+def test_dashboard_summary_groups_counts_and_amounts(fresh_db):
+    user = UserORM(name="pablo", email="p@gmail.com", password_hash="x")
+    cli = ClientORM(name="robisvaldo", phone="83987157461")
+    p1, p2, p3 = _product("CHASSI0001", "1000"), _product("CHASSI0002", "500"), _product("CHASSI0003", "700")
+    fresh_db.add_all([user, cli, p1, p2, p3])
+    fresh_db.add_all([
+        FinanceORM(company="ACME", amount=Decimal("100"), due_date=date(2026, 1, 10), status=FinanceStatus.PENDING),
+        FinanceORM(company="ACME", amount=Decimal("50"), due_date=date(2026, 2, 10), status=FinanceStatus.PENDING),
+    ])
+    fresh_db.flush()
+
+    create_sale(
+        fresh_db, client_id=cli.id, user_id=user.id, product_id=p1.id,
+        total=Decimal("1000"), entry_amount=Decimal("200"),
+        payment_type=PaymentType.PROMISSORY, installments_count=4,
+        first_due_date=date(2026, 1, 15),
+    )
+    create_sale(
+        fresh_db, client_id=cli.id, user_id=user.id, product_id=p2.id,
+        total=Decimal("500"), payment_type=PaymentType.PIX,
+    )
+    fresh_db.commit()
+
+    s = dashboard_summary(fresh_db, include_finance=True)
+
+    assert s["clients_total"] == 1
+    assert s["products"]["by_status"] == {"IN_STOCK": 1, "RESERVED": 0, "SOLD": 2}
+    assert s["products"]["stock_value"] == Decimal("700.00")
+
+    assert s["sales"]["total"] == 2
+    assert s["sales"]["by_payment_type"]["PIX"] == {"count": 1, "amount": Decimal("500.00")}
+    assert s["sales"]["entry_sum"] == Decimal("200.00")
+
+    inst = s["installments"]
+    assert inst["by_status"]["PENDING"] == 4
+    assert inst["pending_amount"] == Decimal("800.00")
+    # só a parcela de 15/01 está vencida em 30/01
+    assert inst["overdue"] == {"count": 1, "amount": Decimal("200.00")}
+
+    assert s["finance"]["pending"]["count"] == 2
+    assert s["finance"]["overdue"] == {"count": 1, "amount": Decimal("100.00")}
+
+    # janela de vencimento restringe parcelas/contas
+    s = dashboard_summary(fresh_db, date_from=date(2026, 2, 1), date_to=date(2026, 2, 28))
+    assert s["installments"]["total"] == 1
+    assert s["finance"] is None
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool
+
+from app.infra import pool
+
+PG_URL = "postgresql+psycopg2://u:p@db:5432/moto_store"
+
+
+@pytest.fixture(autouse=True)
+def _clean_env(monkeypatch):
+    for name in ("DB_PGBOUNCER", "DB_POOL_SIZE", "DB_MAX_OVERFLOW", "DB_STATEMENT_TIMEOUT_MS", "DB_IDLE_IN_TX_TIMEOUT_MS"):
+        monkeypatch.delenv(name, raising=False)
+    pool.POOL_METRICS.reset()
+
+
+def test_postgres_options_size_pool_and_timeouts(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "15")
+    opts = pool.engine_options(PG_URL)
+
+    assert opts["poolclass"] is pool.TimedQueuePool
+    assert (opts["pool_size"], opts["max_overflow"]) == (15, 20)
+    assert opts["pool_pre_ping"] is False
+    assert opts["connect_args"]["options"] == (
+        "-c statement_timeout=30000 -c idle_in_transaction_session_timeout=60000"
+    )
+
+
+def test_pgbouncer_mode_uses_null_pool_without_prepared_statements(monkeypatch):
+    monkeypatch.setenv("DB_PGBOUNCER", "1")
+
+    opts = pool.engine_options(PG_URL)
+    assert opts["poolclass"] is NullPool
+    assert "options" not in opts["connect_args"]  # PgBouncer recusa startup options
+
+    opts = pool.engine_options("postgresql+psycopg://u:p@db/moto_store")
+    assert opts["connect_args"] == {"prepare_threshold": None}
+
+    # timeouts via SET LOCAL no begin de cada transação
+    engine = create_engine(PG_URL, **pool.engine_options(PG_URL))
+    pool.install_transaction_timeouts(engine)
+    assert len(engine.dispatch.begin) == 1
+
+
+def test_sqlite_keeps_default_pool():
+    assert pool.engine_options("sqlite://") == {"pool_pre_ping": True}
+
+
+def test_metrics_count_waits_and_timeouts(tmp_path):
+    engine = create_engine(
+        f"sqlite+pysqlite:///{tmp_path / 'pool.db'}",
+        poolclass=pool.TimedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.2,
+    )
+    held = engine.connect()
+    held.execute(text("SELECT 1"))
+
+    stats = pool.pool_stats(engine)
+    assert (stats["checked_out"], stats["checkouts"]) == (1, 1)
+
+    # pool cheio: o 2º espera o timeout e falha
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+    assert pool.pool_stats(engine)["timeouts"] == 1
+
+    # liberado por outra thread no meio da espera: entra na conta do wait
+    threading.Timer(0.05, held.close).start()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    stats = pool.pool_stats(engine)
+    assert stats["checkouts"] == 2
+    assert stats["wait_max_ms"] >= 40
+
+
+def test_health_endpoint_reports_pool(client):
+    r = client.get("/health/db")
+    assert r.status_code == 200
+    assert {"pool", "checkouts", "timeouts", "wait_max_ms"} <= r.json().keys()
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, event, func, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app.infra import db as db_module
+from app.infra.models import Base, ClientORM
+
+
+@pytest.fixture()
+def sessions(tmp_path, monkeypatch):
+    """
+    get_db de verdade num SQLite em arquivo; devolve (engine, eventos de
+    fim de transação).
+    """
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'session.db'}")
+    Base.metadata.create_all(bind=engine)
+
+    write = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    db_module.track_writes(write)
+    monkeypatch.setattr(db_module, "SessionLocal", write)
+    monkeypatch.setattr(db_module, "ReadSessionLocal", sessionmaker(bind=engine, autoflush=False))
+
+    ends = []
+    event.listen(engine, "commit", lambda conn: ends.append("commit"))
+    event.listen(engine, "rollback", lambda conn: ends.append("rollback"))
+    yield engine, ends
+    engine.dispose()
+
+
+def _run(method: str, handler):
+    gen = db_module.get_db(SimpleNamespace(method=method))
+    db = next(gen)
+    handler(db)
+    with pytest.raises(StopIteration):
+        next(gen)
+
+
+def _count(engine) -> int:
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(ClientORM)).scalar_one()
+
+
+def test_request_without_queries_does_not_touch_the_db(sessions):
+    engine, ends = sessions
+    _run("POST", lambda db: None)
+    _run("GET", lambda db: None)
+    assert ends == []
+
+
+def test_read_only_request_is_not_committed(sessions):
+    engine, ends = sessions
+    _run("POST", lambda db: db.execute(select(ClientORM)).all())
+    _run("GET", lambda db: db.get(ClientORM, 1))
+    assert ends == ["rollback", "rollback"]
+
+
+def test_writes_are_committed(sessions):
+    engine, ends = sessions
+    _run("POST", lambda db: db.add(ClientORM(name="Cliente", phone="83999990000")))
+    _run("PATCH", lambda db: db.execute(text("UPDATE clients SET notes = 'x'")))
+    assert ends == ["commit", "commit"]
+    assert _count(engine) == 1
+
+
+def test_get_never_commits(sessions):
+    engine, ends = sessions
+    _run("GET", lambda db: db.add(ClientORM(name="Cliente", phone="83999990000")))
+    assert "commit" not in ends
+    assert _count(engine) == 0
+
+
+def test_error_rolls_back(sessions):
+    engine, ends = sessions
+    gen = db_module.get_db(SimpleNamespace(method="POST"))
+    db = next(gen)
+    db.add(ClientORM(name="Cliente", phone="83999990000"))
+    db.flush()
+    with pytest.raises(RuntimeError):
+        gen.throw(RuntimeError("falhou"))
+    assert ends == ["rollback"]
+    assert _count(engine) == 0
+
+
+def test_read_engine_is_read_only_on_postgres():
+    assert db_module.read_engine.get_execution_options()["postgresql_readonly"] is True
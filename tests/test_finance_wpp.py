@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api import deps
+from app.api.routers import finance
+from app.infra.models import (
+    FINANCE_REMINDER_KIND,
+    Base,
+    FinanceORM,
+    FinanceStatus,
+    OutboundMessageORM,
+    UserORM,
+    UserRole,
+    WppSendStatus,
+)
+from app.services.jwt_service import create_access_token
+
+
+@pytest.fixture()
+def api(tmp_path):
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'finance.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    with SessionLocal() as db:
+        user = UserORM(name="Admin", email="a@a.com", password_hash="x", role=UserRole.ADMIN)
+        db.add(user)
+        db.commit()
+
+    app = FastAPI()
+    app.include_router(finance.router, prefix="/finance")
+
+    def _get_db():
+        db = SessionLocal()
+        try:
+            yield db
+            db.commit()
+        finally:
+            db.close()
+
+    app.dependency_overrides[deps.DBSession.dependency] = _get_db
+    token = create_access_token(sub=str(user.id), role=user.role.value)
+    with TestClient(app, headers={"Authorization": f"Bearer {token}"}) as c:
+        c.SessionLocal = SessionLocal
+        yield c
+    engine.dispose()
+
+
+def _create(api, due: date) -> dict:
+    r = api.post("/finance", json={"company": "Honda", "amount": "100", "due_date": str(due)})
+    assert r.status_code == 201, r.text
+    return r.json()
+
+
+def _reminder(api, finance_id: int, status: WppSendStatus, **kw) -> None:
+    with api.SessionLocal() as db:
+        db.add(OutboundMessageORM(
+            kind=FINANCE_REMINDER_KIND, ref_table="finance", ref_id=finance_id, recipient="5583999999999",
+            body="x", status=status, tries=kw.pop("tries", 0), next_attempt_at=datetime.now(timezone.utc), **kw,
+        ))
+        db.commit()
+
+
+def _wpp(row: dict) -> tuple:
+    return row["wpp_status"], row["wpp_sent_at"] is not None, row["wpp_last_error"], row["wpp_next_retry_at"]
+
+
+def test_new_bill_without_reminder_is_pending(api):
+    row = _create(api, date(2999, 1, 1))
+    assert _wpp(row) == ("PENDING", False, None, None)
+    assert row["wpp_tries"] == 0
+
+
+def test_paid_bill_reports_sent(api):
+    # pago antes do lembrete sair (na fila ficou CANCELED): como antes da fila, SENT
+    canceled = _create(api, date(2026, 1, 1))
+    _reminder(api, canceled["id"], WppSendStatus.CANCELED)
+    # pago sem nunca ter entrado na fila
+    never = _create(api, date(2999, 1, 1))
+    # pago com uma falha de envio pendente: erro/retry somem, como no pay antigo
+    failed = _create(api, date(2026, 1, 1))
+    _reminder(api, failed["id"], WppSendStatus.FAILED, tries=2, last_error="timeout")
+
+    for row in (canceled, never, failed):
+        r = api.post(f"/finance/{row['id']}/pay", json={})
+        assert r.status_code == 200
+        assert r.json()["status"] == "PAID"
+        assert _wpp(r.json()) == ("SENT", False, None, None)
+
+    assert api.get(f"/finance/{failed['id']}").json()["wpp_tries"] == 2
+    assert {r["wpp_status"] for r in api.get("/finance").json()} == {"SENT"}
+
+
+def test_unpaid_bill_follows_the_queue(api):
+    sent = _create(api, date(2026, 1, 1))
+    _reminder(api, sent["id"], WppSendStatus.SENT, tries=1, sent_at=datetime.now(timezone.utc))
+    failed = _create(api, date(2026, 1, 2))
+    _reminder(api, failed["id"], WppSendStatus.FAILED, tries=1, last_error="timeout")
+    # vencimento adiado antes do envio: cancelado na fila, PENDING na API
+    moved = _create(api, date(2026, 1, 3))
+    _reminder(api, moved["id"], WppSendStatus.CANCELED)
+
+    rows = {r["id"]: r for r in api.get("/finance").json()}
+    assert _wpp(rows[sent["id"]]) == ("SENT", True, None, None)
+    status, _, error, retry = _wpp(rows[failed["id"]])
+    assert (status, error) == ("FAILED", "timeout") and retry is not None
+    assert _wpp(rows[moved["id"]]) == ("PENDING", False, None, None)
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import io
+import random
+
+from PIL import Image
+
+from app.infra.storage import variant_key
+from app.services.image_pipeline import build_variants, fit_jpeg
+
+
+def test_build_variants_sizes_and_formats(monkeypatch):
+    monkeypatch.setenv("OFFERS_IMAGE_MAX_BYTES", "200000")
+
+    buf = io.BytesIO()
+    Image.new("RGB", (4000, 3000), (200, 30, 30)).save(buf, format="JPEG", quality=95)
+    buf.seek(0)
+
+    v = build_variants(buf)
+
+    thumb = Image.open(io.BytesIO(v["thumb"].content))
+    medium = Image.open(io.BytesIO(v["medium"].content))
+    offer = Image.open(io.BytesIO(v["offer"].content))
+
+    assert thumb.format == "WEBP" and max(thumb.size) == 320
+    assert medium.format == "WEBP" and max(medium.size) == 1024
+    assert offer.format == "JPEG" and max(offer.size) == 1280
+    assert len(v["offer"].content) <= 200000
+    # proporção preservada
+    assert thumb.size == (320, 240)
+
+
+def test_variant_key_sits_next_to_original():
+    assert variant_key("products/12/abc.jpg", "thumb", ".webp") == "products/12/abc.thumb.webp"
+
+
+def test_fit_jpeg_picks_highest_quality_that_fits():
+    # blocos de cor suavizados + granulado: comprime parecido com foto
+    rnd = random.Random(1)
+    small = Image.new("RGB", (32, 24))
+    small.putdata([(rnd.randrange(256), rnd.randrange(256), rnd.randrange(256)) for _ in range(32 * 24)])
+    grain = Image.effect_noise((1280, 960), 50).convert("RGB")
+    img = Image.blend(small.resize((1280, 960), Image.BICUBIC), grain, 0.25)
+
+    def size(q):
+        b = io.BytesIO()
+        img.save(b, format="JPEG", quality=q, optimize=True)
+        return len(b.getvalue())
+
+    target = (size(50) + size(51)) // 2  # q=50 cabe, q=51 não
+    r = fit_jpeg(img, quality=70, max_bytes=target)
+
+    assert len(r.content) <= target
+    # até `tolerance` (3) pontos abaixo do ótimo, com menos encodes que o loop de 10 em 10
+    assert 47 <= r.quality <= 50
+    assert r.encodes <= 3
+
+    # já cabe na qualidade máxima: um encode só
+    r = fit_jpeg(img, quality=70, max_bytes=10_000_000)
+    assert (r.quality, r.encodes, r.probe_encodes) == (70, 1, 0)
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api import deps
+from app.api.routers import installments
+from app.infra.models import (
+    Base,
+    ClientORM,
+    InstallmentORM,
+    InstallmentStatus,
+    PaymentType,
+    ProductORM,
+    ProductStatus,
+    PromissoryORM,
+    PromissoryStatus,
+    SaleORM,
+    SaleStatus,
+    UserORM,
+    UserRole,
+)
+from app.services.jwt_service import create_access_token
+
+TODAY = date.today()
+
+
+def _seed(db) -> UserORM:
+    """
+    Duas promissórias:
+    - Ana: product_id direto; parcelas vencida PENDING, vencida PAID, futura PENDING
+    - Bia: produto só pela venda; parcelas CANCELED (passada) e PENDING (futura)
+    """
+    user = UserORM(name="Vendedor", email="v@v.com", password_hash="x", role=UserRole.ADMIN)
+    ana, bia = ClientORM(name="Ana", phone="83990000001"), ClientORM(name="Bia", phone="83990000002")
+    cg = ProductORM(brand="Honda", model="CG", year=2024, chassi="CH00000001", color="Preta",
+                    cost_price=Decimal("1"), sale_price=Decimal("2"), status=ProductStatus.SOLD)
+    biz = ProductORM(brand="Honda", model="Biz", year=2023, chassi="CH00000002", color="Azul",
+                     cost_price=Decimal("1"), sale_price=Decimal("2"), status=ProductStatus.SOLD)
+    db.add_all([user, ana, bia, cg, biz])
+    db.flush()
+
+    sale = SaleORM(public_id="VEN-1", client=bia, user=user, product=biz, total=Decimal("900"),
+                   discount=Decimal("0"), entry_amount=Decimal("0"),
+                   payment_type=PaymentType.PROMISSORY, status=SaleStatus.CONFIRMED)
+    p_ana = PromissoryORM(public_id="PROM-A", client=ana, product=cg, total=Decimal("900"),
+                          entry_amount=Decimal("0"), status=PromissoryStatus.ISSUED)
+    p_bia = PromissoryORM(public_id="PROM-B", client=bia, sale=sale, total=Decimal("600"),
+                          entry_amount=Decimal("0"), status=PromissoryStatus.ISSUED)
+
+    def inst(n, days, status):
+        return InstallmentORM(number=n, due_date=TODAY + timedelta(days=days), amount=Decimal("300"), status=status)
+
+    p_ana.installments = [
+        inst(1, -20, InstallmentStatus.PENDING),
+        inst(2, -10, InstallmentStatus.PAID),
+        inst(3, 10, InstallmentStatus.PENDING),
+    ]
+    p_bia.installments = [
+        inst(1, -5, InstallmentStatus.CANCELED),
+        inst(2, 5, InstallmentStatus.PENDING),
+    ]
+    db.add_all([sale, p_ana, p_bia])
+    db.commit()
+    return user
+
+
+@pytest.fixture()
+def engine(tmp_path):
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'inst.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture()
+def api(engine):
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    with SessionLocal() as db:
+        user = _seed(db)
+
+    app = FastAPI()
+    app.include_router(installments.router, prefix="/installments")
+
+    def _get_db():
+        with SessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[deps.DBSession.dependency] = _get_db
+    token = create_access_token(sub=str(user.id), role=user.role.value)
+    with TestClient(app, headers={"Authorization": f"Bearer {token}"}) as c:
+        c.SessionLocal = SessionLocal
+        yield c
+
+
+def _get(api, **params) -> list[dict]:
+    r = api.get("/installments", params=params)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def _due(rows) -> list[int]:
+    return sorted((date.fromisoformat(r["due_date"]) - TODAY).days for r in rows)
+
+
+def test_status_filter(api):
+    assert _due(_get(api, status="PENDING")) == [-20, 5, 10]
+    assert _due(_get(api, status="PAID")) == [-10]
+    assert api.get("/installments", params={"status": "XX"}).status_code == 422
+
+
+def test_due_window(api):
+    rows = _get(api, due_from=str(TODAY - timedelta(days=10)), due_to=str(TODAY + timedelta(days=5)))
+    assert _due(rows) == [-10, -5, 5]
+
+
+def test_overdue_is_pending_before_today(api):
+    assert _due(_get(api, overdue="true")) == [-20]
+
+
+def test_client_filter(api):
+    with api.SessionLocal() as db:
+        bia = db.query(ClientORM).filter_by(name="Bia").one()
+    assert _due(_get(api, client_id=bia.id)) == [-5, 5]
+
+
+def test_include_expands_relations(api):
+    rows = _get(api, include="promissory,client,product", order="due_date")
+    by_prom = {r["promissory"]["public_id"]: r for r in rows}
+
+    assert by_prom["PROM-A"]["client"]["name"] == "Ana"
+    assert by_prom["PROM-A"]["product"]["model"] == "CG"
+    # sem product_id na promissória: produto vem da venda
+    assert by_prom["PROM-B"]["client"]["name"] == "Bia"
+    assert by_prom["PROM-B"]["product"]["model"] == "Biz"
+
+    plain = _get(api)
+    assert all("promissory" not in r and "client" not in r for r in plain)
+
+
+@pytest.mark.parametrize("params", [{"order": "xx"}, {"include": "client,foo"}, {"status": "pago"}])
+def test_invalid_order_include_or_status_is_422(api, params):
+    assert api.get("/installments", params=params).status_code == 422
+
+
+def test_cursor_continues_with_due_date_order(api):
+    seen, cursor = [], None
+    while True:
+        params = {"order": "due_date", "limit": 2, **({"cursor": cursor} if cursor else {})}
+        r = api.get("/installments", params=params)
+        assert r.status_code == 200
+        seen += [(x["due_date"], x["id"]) for x in r.json()]
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert len(seen) == 5
+    assert seen == sorted(seen)
+    # cursor de outra ordenação não vale aqui
+    first = api.get("/installments", params={"order": "promissory", "limit": 2})
+    other = first.headers["X-Next-Cursor"]
+    assert api.get("/installments", params={"order": "due_date", "cursor": other}).status_code == 400
+
+
+def test_without_limit_returns_everything(api):
+    with api.SessionLocal() as db:
+        prom = db.query(PromissoryORM).filter_by(public_id="PROM-A").one()
+        db.add_all([
+            InstallmentORM(promissory_id=prom.id, number=10 + i, due_date=TODAY + timedelta(days=30 + i),
+                           amount=Decimal("1"), status=InstallmentStatus.PENDING)
+            for i in range(200)
+        ])
+        db.commit()
+
+    # sem limit nem cursor: lista inteira, como antes da paginação
+    r = api.get("/installments")
+    assert len(r.json()) == 205
+    assert "X-Next-Cursor" not in r.headers
+    assert len(_get(api, promissory_id=prom.id)) == 203
+
+    # só o cursor: páginas de 200
+    first = api.get("/installments", params={"limit": 3})
+    rest = api.get("/installments", params={"cursor": first.headers["X-Next-Cursor"]})
+    assert len(rest.json()) == 200 and "X-Next-Cursor" in rest.headers
+
+    assert len(_get(api, limit=1000)) == 205
+    assert api.get("/installments", params={"limit": 1001}).status_code == 422
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import shutil
+
+import pytest
+from alembic import command
+from sqlalchemy import create_engine, inspect, text
+
+from app.infra import schema
+
+
+@pytest.fixture()
+def engine(tmp_path):
+    # arquivo (não :memory:): o batch_alter_table do SQLite recria tabelas
+    return create_engine(f"sqlite+pysqlite:///{tmp_path / 'migrations.db'}", future=True)
+
+
+def _alembic(engine, fn, *args):
+    cfg = schema.alembic_config()
+    cfg.attributes["configure_logger"] = False
+    with engine.begin() as conn:
+        cfg.attributes["connection"] = conn
+        fn(cfg, *args)
+
+
+def test_upgrade_head_matches_models(engine):
+    schema.upgrade_to_head(engine)
+
+    assert schema.current_revision(engine) == schema.head_revision()
+    # autogenerate sem diferenças entre o banco migrado e infra.models
+    _alembic(engine, command.check)
+
+
+def test_legacy_database_is_stamped_and_sent_reminders_backfilled(engine, monkeypatch):
+    monkeypatch.setenv("BLIBSEND_DEFAULT_TO", "5583999999999")
+    # banco "de antes": schema do create_all antigo, sem alembic_version
+    _alembic(engine, command.upgrade, "0001_baseline")
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE alembic_version"))
+        conn.execute(text(
+            "INSERT INTO finance (id, company, amount, due_date, status, wpp_status, wpp_tries, wpp_sent_at) VALUES "
+            "(1, 'Honda', 100, '2026-01-10', 'PENDING', 'SENT', 1, '2026-01-09 12:00:00'), "
+            "(2, 'Yamaha', 200, '2026-01-10', 'PENDING', 'FAILED', 3, NULL)"
+        ))
+
+    schema.upgrade_to_head(engine)
+
+    assert schema.current_revision(engine) == schema.head_revision()
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT kind, ref_table, ref_id, recipient, status FROM outbound_messages")).all()
+    assert [tuple(r) for r in rows] == [("finance_due", "finance", 1, "5583999999999", "SENT")]
+
+    cols = {c["name"] for c in inspect(engine).get_columns("finance")}
+    assert not {c for c in cols if c.startswith("wpp_")}
+    cols = {c["name"] for c in inspect(engine).get_columns("installments")}
+    assert not {c for c in cols if c.startswith("wa_")}
+
+
+def test_check_schema_strict_fails_until_upgraded(engine, monkeypatch):
+    monkeypatch.setenv("DB_SCHEMA_CHECK", "strict")
+    with pytest.raises(schema.SchemaOutOfDate):
+        schema.check_schema(engine)
+
+    monkeypatch.setenv("DB_SCHEMA_CHECK", "warn")
+    schema.check_schema(engine)
+
+    schema.upgrade_to_head(engine)
+    monkeypatch.setenv("DB_SCHEMA_CHECK", "strict")
+    schema.check_schema(engine)
+
+
+AUTOCOMMIT_REVISION = '''
+from alembic import op
+
+revision = "0099_autocommit"
+down_revision = "{down}"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # como o 0003 no Postgres (CREATE INDEX CONCURRENTLY)
+    with op.get_context().autocommit_block():
+        op.create_index("ix_test_autocommit", "clients", ["name"])
+
+
+def downgrade():
+    op.drop_index("ix_test_autocommit", table_name="clients")
+'''
+
+
+def test_upgrade_runs_revisions_with_autocommit_block(engine, tmp_path, monkeypatch):
+    # cópia das migrations + uma revisão com autocommit_block, que só
+    # funciona se a transação for do env.py (não de um engine.begin() de fora)
+    scripts = tmp_path / "migrations"
+    shutil.copytree(schema.APP_DIR / "migrations", scripts, ignore=shutil.ignore_patterns("__pycache__"))
+    (scripts / "versions" / "0099_autocommit.py").write_text(
+        AUTOCOMMIT_REVISION.format(down=schema.head_revision())
+    )
+    alembic_config = schema.alembic_config
+
+    def _config(url=None):
+        cfg = alembic_config(url)
+        cfg.set_main_option("script_location", str(scripts))
+        return cfg
+
+    monkeypatch.setattr(schema, "alembic_config", _config)
+
+    schema.upgrade_to_head(engine)
+
+    assert schema.current_revision(engine) == "0099_autocommit"
+    assert "ix_test_autocommit" in {ix["name"] for ix in inspect(engine).get_indexes("clients")}
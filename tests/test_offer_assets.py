@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import os
+import time
+
+from app.services.offer_assets import OfferAssetCache
+
+
+def test_offer_asset_cache_builds_once_per_key_and_params(tmp_path):
+    cache = OfferAssetCache(tmp_path, max_age_days=30)
+    calls = []
+
+    def build():
+        calls.append(1)
+        return "data:image/jpeg;base64,AAAA"
+
+    assert cache.get_or_build("products/1/a.jpg", "jpeg-1280-70", build) == "data:image/jpeg;base64,AAAA"
+    assert cache.get_or_build("products/1/a.jpg", "jpeg-1280-70", build) == "data:image/jpeg;base64,AAAA"
+    assert len(calls) == 1
+
+    # outros parâmetros de encoding = outra entrada
+    cache.get_or_build("products/1/a.jpg", "jpeg-800-60", build)
+    assert len(calls) == 2
+
+    # outro processo (novo objeto) lê do disco
+    assert OfferAssetCache(tmp_path).get("products/1/a.jpg", "jpeg-1280-70") is not None
+
+    cache.invalidate("products/1/a.jpg")
+    assert cache.get("products/1/a.jpg", "jpeg-1280-70") is None
+    assert cache.get("products/1/a.jpg", "jpeg-800-60") is None
+
+
+def test_offer_asset_cache_prune_by_age(tmp_path):
+    cache = OfferAssetCache(tmp_path, max_age_days=30)
+    cache.put("products/1/old.jpg", "variant", "x")
+    cache.put("products/1/new.jpg", "variant", "y")
+
+    old = cache._path("products/1/old.jpg", "variant")
+    past = time.time() - 31 * 86400
+    os.utime(old, (past, past))
+
+    assert cache.prune() == 1
+    assert cache.get("products/1/old.jpg", "variant") is None
+    assert cache.get("products/1/new.jpg", "variant") == "y"
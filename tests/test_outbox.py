@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import select
+
+from app import worker
+from app.infra.models import FinanceORM, FinanceStatus, OutboundMessageORM, WppSendStatus
+
+
+def _messages(db):
+    return db.execute(select(OutboundMessageORM).order_by(OutboundMessageORM.id)).scalars().all()
+
+
+def test_producer_enqueues_once_and_cancels_stale(fresh_sessionmaker, monkeypatch):
+    monkeypatch.setattr(worker, "dispatch_texts", lambda msgs: [(rows, None) for rows, _, _ in msgs])
+
+    with fresh_sessionmaker() as db:
+        db.add_all([
+            FinanceORM(company=f"F{i}", amount=Decimal("10"), due_date=date(2026, 1, 1), status=FinanceStatus.PENDING)
+            for i in range(3)
+        ])
+        db.add(FinanceORM(company="futura", amount=Decimal("10"), due_date=date(2999, 1, 1), status=FinanceStatus.PENDING))
+        db.commit()
+
+        assert worker.produce_finance(db, "5583999999999") == 3
+        # outra rodada (ou outra réplica) não duplica
+        assert worker.produce_finance(db, "5583999999999") == 0
+
+        msgs = _messages(db)
+        assert [m.body.splitlines()[0] for m in msgs] == ["Empresa: F0", "Empresa: F1", "Empresa: F2"]
+        assert all(m.ref_table == "finance" and m.status == WppSendStatus.PENDING for m in msgs)
+
+        # conta paga antes do envio: lembrete cancelado na próxima rodada
+        paid = db.get(FinanceORM, msgs[0].ref_id)
+        paid.status = FinanceStatus.PAID
+        db.commit()
+        worker.produce_finance(db, "5583999999999")
+
+        assert worker.process_outbound(db) == 2
+        db.expire_all()
+        assert [m.status for m in _messages(db)] == [WppSendStatus.CANCELED, WppSendStatus.SENT, WppSendStatus.SENT]
+
+        # a API continua expondo o estado do lembrete em wpp_*
+        f = db.get(FinanceORM, msgs[1].ref_id)
+        assert f.wpp_status == WppSendStatus.SENT and f.wpp_sent_at is not None
+
+
+def test_enqueue_skips_rows_another_replica_already_queued(fresh_sessionmaker):
+    msg = {"kind": "finance_due", "ref_table": "finance", "recipient": "5583999999999", "body": "x"}
+    with fresh_sessionmaker() as a, fresh_sessionmaker() as b:
+        assert worker.enqueue(a, [dict(msg, ref_id=1)]) == 1
+        assert worker.enqueue(b, [dict(msg, ref_id=1), dict(msg, ref_id=2)]) == 1
+        assert sorted(m.ref_id for m in _messages(a)) == [1, 2]
+
+
+def test_canceled_reminder_is_queued_again_when_due_again(fresh_sessionmaker, monkeypatch):
+    monkeypatch.setattr(worker, "dispatch_texts", lambda msgs: [(rows, None) for rows, _, _ in msgs])
+
+    with fresh_sessionmaker() as db:
+        f = FinanceORM(company="Honda", amount=Decimal("10"), due_date=date(2026, 1, 1), status=FinanceStatus.PENDING)
+        db.add(f)
+        db.commit()
+        assert worker.produce_finance(db, "5583999999999") == 1
+
+        # paga antes do envio: cancelado
+        f.status = FinanceStatus.PAID
+        db.commit()
+        worker.produce_finance(db, "5583999999999")
+        db.expire_all()
+        assert [m.status for m in _messages(db)] == [WppSendStatus.CANCELED]
+
+        # reaberta e com novo valor: a mesma linha volta para a fila, com o texto novo
+        f.status = FinanceStatus.PENDING
+        f.amount = Decimal("25")
+        db.commit()
+        assert worker.produce_finance(db, "5583999999999") == 1
+        assert worker.produce_finance(db, "5583999999999") == 0
+
+        db.expire_all()
+        (msg,) = _messages(db)
+        assert msg.status == WppSendStatus.PENDING and msg.tries == 0
+        assert "25" in msg.body
+
+        assert worker.process_outbound(db) == 1
+        db.expire_all()
+        assert _messages(db)[0].status == WppSendStatus.SENT
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+from sqlalchemy import select
+
+from app.infra.models import FinanceORM, ClientORM
+from app.services.pagination import encode_cursor, decode_cursor, keyset_page
+
+
+def test_cursor_roundtrip_and_tampering():
+    cols = [FinanceORM.due_date, FinanceORM.id]
+    cur = encode_cursor("finance", [date(2026, 1, 30), 42])
+
+    assert decode_cursor("finance", cur, cols) == [date(2026, 1, 30), 42]
+
+    # outro endpoint não aceita o mesmo cursor
+    with pytest.raises(ValueError):
+        decode_cursor("products", cur, cols)
+
+    _, sig = cur.split(".")
+    forged = encode_cursor("finance", [date(2026, 1, 30), 1]).split(".")[0]
+    with pytest.raises(ValueError):
+        decode_cursor("finance", f"{forged}.{sig}", cols)
+
+
+def test_keyset_page_walks_all_rows_once(db_session):
+    db_session.add_all([ClientORM(name=f"cliente {i}", phone=f"839{i:08d}") for i in range(12)])
+    db_session.flush()
+
+    stmt = select(ClientORM).where(ClientORM.name.like("cliente %")).order_by(ClientORM.id.desc())
+
+    seen, cursor = [], None
+    while True:
+        rows, cursor = keyset_page(db_session, stmt, scope="clients", cols=[ClientORM.id], limit=5, cursor=cursor)
+        seen += [c.id for c in rows]
+        if not cursor:
+            break
+
+    assert len(seen) == 12
+    assert seen == sorted(seen, reverse=True)
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from app.infra.storage import _PresignCache
+
+
+def test_presign_cache_lru_ttl_and_invalidate(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.infra.storage.time.monotonic", lambda: now[0])
+
+    cache = _PresignCache(maxsize=2, margin_seconds=300)
+    cache.put("a", 3600, "url-a")
+    cache.put("b", 3600, "url-b")
+
+    assert cache.get("a", 3600) == "url-a"
+    # outro expires é outra URL
+    assert cache.get("a", 60) is None
+
+    # "b" é o menos usado -> sai
+    cache.put("c", 3600, "url-c")
+    assert cache.get("b", 3600) is None
+    assert cache.get("c", 3600) == "url-c"
+
+    # expira antes do presign (3600 - 300)
+    now[0] += 3300
+    assert cache.get("a", 3600) is None
+
+    cache.put("d", 3600, "url-d")
+    cache.invalidate("d")
+    assert cache.get("d", 3600) is None
+
+    st = cache.stats()
+    assert st["hits"] == 2
+    assert st["misses"] == 4
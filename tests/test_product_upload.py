@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.api import deps
+from app.api.routers import products
+from app.infra.models import Base, ProductImageORM, ProductORM, UserORM, UserRole
+from app.services.jwt_service import create_access_token
+
+FORM = {"brand": "Honda", "model": "CG 160", "year": "2024", "chassi": "CHASSI0001", "color": "Preta"}
+
+
+class FakeBucket:
+    """
+    put/delete em memória; `slow` segura o put da original dessas keys
+    (prefixo do nome do arquivo) por `delay` segundos.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.objects: set[str] = set()
+        self.deleted: list[str] = []
+        self.in_flight = 0
+        self.slow: dict[int, float] = {}
+        self.calls = 0
+
+    def put_fileobj(self, *, fileobj, content_type, key):
+        with self.lock:
+            self.calls += 1
+            n = self.calls
+            self.in_flight += 1
+        try:
+            fileobj.read()  # falha se o UploadFile já tiver sido fechado
+            time.sleep(self.slow.get(n, 0))
+            with self.lock:
+                self.objects.add(key)
+            return key
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def put_bytes(self, *, content, content_type, key):
+        with self.lock:
+            self.objects.add(key)
+        return key
+
+    def delete_object(self, key):
+        with self.lock:
+            self.objects.discard(key)
+            self.deleted.append(key)
+
+
+@pytest.fixture()
+def bucket(monkeypatch):
+    b = FakeBucket()
+    monkeypatch.setattr(products, "put_fileobj", b.put_fileobj)
+    monkeypatch.setattr(products, "put_bytes", b.put_bytes)
+    monkeypatch.setattr(products, "delete_object", b.delete_object)
+    monkeypatch.setattr(products, "presign_get_url", lambda key, expires_seconds: f"https://cdn.test/{key}")
+    monkeypatch.setattr(products, "build_variants", lambda f: {
+        "thumb": SimpleNamespace(content=b"t", content_type="image/webp", ext=".webp"),
+    })
+    return b
+
+
+@pytest.fixture()
+def api(tmp_path):
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'upload.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    with SessionLocal() as db:
+        user = UserORM(name="Admin", email="a@a.com", password_hash="x", role=UserRole.ADMIN)
+        db.add(user)
+        db.commit()
+
+    app = FastAPI()
+    app.include_router(products.router, prefix="/products")
+
+    def _get_db():
+        db = SessionLocal()
+        try:
+            yield db
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    app.dependency_overrides[deps.DBSession.dependency] = _get_db
+    token = create_access_token(sub=str(user.id), role=user.role.value)
+    with TestClient(app, headers={"Authorization": f"Bearer {token}"}) as c:
+        yield c, SessionLocal
+    engine.dispose()
+
+
+def _images(n: int) -> list:
+    return [("images", (f"{i}.jpg", b"\xff\xd8fake-jpeg", "image/jpeg")) for i in range(n)]
+
+
+def _count(SessionLocal, model) -> int:
+    with SessionLocal() as db:
+        return db.scalar(select(func.count()).select_from(model))
+
+
+def test_upload_success_stores_keys(api, bucket):
+    client, SessionLocal = api
+
+    r = client.post("/products", data=FORM, files=_images(3))
+
+    assert r.status_code == 201
+    body = r.json()
+    assert len(body["images"]) == 3
+    assert all(im["thumb_url"].startswith("https://cdn.test/") for im in body["images"])
+    assert bucket.deleted == []
+    # 3 originais + 3 thumbs, todas referenciadas no banco
+    assert len(bucket.objects) == 6
+    assert _count(SessionLocal, ProductImageORM) == 3
+
+
+def test_upload_deadline_drains_and_cleans_up(api, bucket, monkeypatch):
+    client, SessionLocal = api
+    monkeypatch.setenv("UPLOAD_DEADLINE_SECONDS", "0.2")
+    bucket.slow = {2: 0.6}  # uma das originais passa do prazo
+
+    r = client.post("/products", data=FORM, files=_images(3))
+
+    assert r.status_code == 504
+    # nada rodando depois da resposta (UploadFile fechado) e nada órfão no bucket
+    assert bucket.in_flight == 0
+    assert bucket.objects == set()
+    assert bucket.deleted
+    assert _count(SessionLocal, ProductORM) == 0
+
+
+def test_upload_deadline_does_not_wait_for_hung_put(api, bucket, monkeypatch):
+    client, SessionLocal = api
+    monkeypatch.setenv("UPLOAD_DEADLINE_SECONDS", "0.2")
+    monkeypatch.setenv("UPLOAD_ABORT_GRACE_SECONDS", "0.1")
+    bucket.slow = {2: 1.5}  # PUT "pendurado" bem além do prazo + folga
+
+    started = time.monotonic()
+    r = client.post("/products", data=FORM, files=_images(3))
+
+    assert r.status_code == 504
+    assert time.monotonic() - started < 1.0
+    assert bucket.in_flight == 1
+
+    # a key que o PUT atrasado gravar é apagada em background quando ele volta
+    for _ in range(50):
+        if bucket.in_flight == 0 and not bucket.objects:
+            break
+        time.sleep(0.05)
+    assert bucket.in_flight == 0
+    assert bucket.objects == set()
+    assert _count(SessionLocal, ProductORM) == 0
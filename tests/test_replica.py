@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.infra import db as db_module
+from app.infra.models import Base, ClientORM
+from app.infra.replica import ReplicaHealth, RoutingSession
+
+
+def _database(path, name: str):
+    engine = create_engine(f"sqlite+pysqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add(ClientORM(name=name, phone="83999990000"))
+        db.commit()
+    return engine
+
+
+@pytest.fixture()
+def primary(tmp_path):
+    engine = _database(tmp_path / "primary.db", "primario")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture()
+def replica(tmp_path):
+    engine = _database(tmp_path / "replica.db", "replica")
+    yield engine
+    engine.dispose()
+
+
+def _factory(primary, replica, health, **kw):
+    return sessionmaker(class_=RoutingSession, primary=primary, replica=replica, health=health, **kw)
+
+
+def _read_name(factory, **kw) -> tuple[str, str]:
+    with factory(**kw) as db:
+        name = db.execute(select(ClientORM.name)).scalar_one()
+        return name, db.info["db_route"]
+
+
+def test_reads_go_to_healthy_replica(primary, replica):
+    health = ReplicaHealth(replica, check_seconds=60)
+    assert _read_name(_factory(primary, replica, health)) == ("replica", "replica")
+    assert health.stats()["routed"] == 1
+
+
+def test_without_replica_reads_go_to_primary(primary):
+    factory = _factory(primary, None, ReplicaHealth(None))
+    assert _read_name(factory) == ("primario", "primary")
+
+
+def test_lag_over_tolerance_falls_back(primary, replica, monkeypatch):
+    health = ReplicaHealth(replica, check_seconds=60)
+    monkeypatch.setattr(health, "_measure", lambda: 30.0)
+    factory = _factory(primary, replica, health, max_lag_seconds=10)
+
+    assert _read_name(factory) == ("primario", "primary")
+    # relatório aceita mais atraso
+    assert _read_name(factory, max_lag_seconds=300) == ("replica", "replica")
+    assert health.stats()["fallbacks"] == 1
+
+
+def test_lag_is_measured_once_per_interval(primary, replica, monkeypatch):
+    health = ReplicaHealth(replica, check_seconds=60)
+    calls = []
+    monkeypatch.setattr(health, "_measure", lambda: calls.append(1) or 0.0)
+    factory = _factory(primary, replica, health)
+    for _ in range(5):
+        _read_name(factory)
+    assert len(calls) == 1
+
+
+def test_unavailable_replica_falls_back_to_primary(primary, tmp_path):
+    down = create_engine(f"sqlite+pysqlite:///{tmp_path / 'nao' / 'existe.db'}")
+    health = ReplicaHealth(down, check_seconds=60)
+
+    assert _read_name(_factory(primary, down, health)) == ("primario", "primary")
+    stats = health.stats()
+    assert stats["lag_seconds"] is None
+    assert stats["connect_errors"] == 1
+    # só a classe do erro (o endpoint é público), nada do caminho/host
+    assert stats["last_error"] == "OperationalError"
+
+
+def test_connection_error_marks_replica_down(primary, tmp_path, monkeypatch):
+    # a medição passou, mas a conexão do request falha: o próximo vai pro primário
+    down = create_engine(f"sqlite+pysqlite:///{tmp_path / 'nao' / 'existe.db'}")
+    health = ReplicaHealth(down, check_seconds=60)
+    monkeypatch.setattr(health, "_measure", lambda: 0.0)
+    factory = _factory(primary, down, health)
+
+    with pytest.raises(Exception):
+        _read_name(factory)
+    assert _read_name(factory) == ("primario", "primary")
+
+
+def test_get_requests_use_the_routing_session(primary, replica, monkeypatch):
+    health = ReplicaHealth(replica, check_seconds=60)
+    monkeypatch.setattr(db_module, "ReadSessionLocal", _factory(primary, replica, health))
+
+    gen = db_module.get_db(SimpleNamespace(method="GET"))
+    db = next(gen)
+    assert db.execute(select(ClientORM.name)).scalar_one() == "replica"
+    with pytest.raises(StopIteration):
+        next(gen)
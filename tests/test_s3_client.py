@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import pytest
+
+from app.infra import storage
+
+
+@pytest.fixture(autouse=True)
+def s3_env(monkeypatch):
+    monkeypatch.setenv("S3_ENDPOINT", "http://127.0.0.1:9000")
+    monkeypatch.setenv("S3_ACCESS_KEY_ID", "test")
+    monkeypatch.setenv("S3_SECRET_ACCESS_KEY", "test-secret")
+    monkeypatch.setenv("S3_BUCKET", "test")
+    monkeypatch.setenv("S3_MAX_POOL_CONNECTIONS", "7")
+    monkeypatch.setenv("S3_CONNECT_TIMEOUT_SECONDS", "2")
+    storage.reset_s3_client()
+    yield
+    storage.reset_s3_client()
+
+
+def test_client_is_created_once():
+    first = storage._s3_client()
+
+    assert storage._s3_client() is first
+    assert first.meta.config.max_pool_connections == 7
+    assert first.meta.config.connect_timeout == 2
+
+
+def test_reset_rebuilds_with_new_settings(monkeypatch):
+    old = storage._s3_client()
+    storage._PRESIGN_CACHE.put("products/1/a.jpg", 3600, "url-antiga")
+
+    monkeypatch.setenv("S3_ENDPOINT", "http://127.0.0.1:9001")
+    monkeypatch.setenv("S3_MAX_POOL_CONNECTIONS", "3")
+    monkeypatch.setenv("S3_READ_TIMEOUT_SECONDS", "9")
+    monkeypatch.setenv("S3_MAX_ATTEMPTS", "5")
+    # sem reset continua o client antigo
+    assert storage._s3_client() is old
+
+    storage.reset_s3_client()
+    new = storage._s3_client()
+
+    assert new is not old
+    assert new.meta.endpoint_url == "http://127.0.0.1:9001"
+    assert new.meta.config.max_pool_connections == 3
+    assert new.meta.config.read_timeout == 9
+    # botocore guarda como total (retries + a tentativa inicial)
+    assert new.meta.config.retries["total_max_attempts"] == 6
+    # URLs assinadas pelo client antigo saem junto
+    assert storage._PRESIGN_CACHE.get("products/1/a.jpg", 3600) is None
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+from app.infra.models import OutboundMessageORM, WppSendStatus
+from app.services import outbox
+from app.services.job_lock import try_acquire_daily, finish_daily, is_done
+
+
+def _queue(db, n: int) -> None:
+    now = outbox.now_utc()
+    db.add_all([
+        OutboundMessageORM(
+            kind="finance_due", ref_table="finance", ref_id=i, recipient="5583999999999",
+            body=f"F{i}", status=WppSendStatus.PENDING, tries=0, next_attempt_at=now,
+        )
+        for i in range(n)
+    ])
+    db.commit()
+
+
+def _claim(db, owner: str = "w1"):
+    return outbox.claim(db, owner=owner, limit=50)
+
+
+def test_claim_skips_claimed_rows_and_recovers_expired_lease(fresh_sessionmaker):
+    with fresh_sessionmaker() as db:
+        _queue(db, 3)
+
+    with fresh_sessionmaker() as a, fresh_sessionmaker() as b:
+        claimed = _claim(a)
+        assert len(claimed) == 3
+        assert all(r.status == WppSendStatus.SENDING and r.claimed_by == "w1" for r in claimed)
+
+        # outra réplica não pega nada enquanto o lease vale
+        assert _claim(b, "w2") == []
+
+        # réplica "a" morreu no meio: lease vencido volta para a fila
+        stuck = claimed[0]
+        stuck.next_attempt_at = outbox.now_utc() - timedelta(seconds=1)
+        a.commit()
+
+        assert [r.id for r in _claim(b, "w2")] == [stuck.id]
+
+
+def test_at_most_once_never_reclaims_in_flight_rows(fresh_sessionmaker, monkeypatch):
+    monkeypatch.setenv("WORKER_DELIVERY_MODE", "at_most_once")
+    with fresh_sessionmaker() as db:
+        _queue(db, 1)
+
+        (row,) = _claim(db)
+        row.next_attempt_at = outbox.now_utc() - timedelta(days=1)
+        db.commit()
+
+        assert _claim(db) == []
+
+    monkeypatch.setenv("WORKER_DELIVERY_MODE", "at_least_once")
+    with fresh_sessionmaker() as db:
+        assert len(_claim(db)) == 1
+
+
+def test_daily_job_lock_between_replicas(fresh_sessionmaker):
+    day = date(2026, 1, 30)
+    with fresh_sessionmaker() as db:
+        assert try_acquire_daily(db, "daily_offers", day=day, owner="w1", lease_seconds=600)
+        assert not try_acquire_daily(db, "daily_offers", day=day, owner="w2", lease_seconds=600)
+
+        # nada enviado: solta sem marcar o dia
+        finish_daily(db, "daily_offers", day=day, owner="w1", done=False)
+        assert not is_done(db, "daily_offers", day=day)
+
+        # lease vencido (réplica morreu) também libera
+        assert try_acquire_daily(db, "daily_offers", day=day, owner="w2", lease_seconds=-1)
+        assert try_acquire_daily(db, "daily_offers", day=day, owner="w1", lease_seconds=600)
+
+        finish_daily(db, "daily_offers", day=day, owner="w1", done=True)
+        assert is_done(db, "daily_offers", day=day)
+        assert not try_acquire_daily(db, "daily_offers", day=day, owner="w2", lease_seconds=600)
+
+        assert try_acquire_daily(db, "daily_offers", day=day + timedelta(days=1), owner="w2", lease_seconds=600)
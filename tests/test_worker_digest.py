@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from app import worker
+from app.infra.models import WppSendStatus
+from app.integrations import blibsend_dispatch
+
+
+class _DB:
+    commits = 0
+
+    def flush(self):
+        pass
+
+    def commit(self):
+        self.commits += 1
+
+
+def _row(i: int):
+    body = f"Empresa: Fornecedor {i}\nValor: R$ 1500.00\nVenc.: 2026-01-{i % 28 + 1:02d}\n" + "x" * 120
+    return SimpleNamespace(
+        kind=worker.FINANCE_REMINDER_KIND, recipient="5583999999999", body=body,
+        status=None, sent_at=None, last_error=None, next_attempt_at=None, tries=0,
+    )
+
+
+def test_digest_groups_rows_into_few_messages(monkeypatch):
+    monkeypatch.setenv("WORKER_DIGEST_MODE", "1")
+    monkeypatch.setenv("BLIBSEND_RATE_PER_SECOND", "1000")
+    blibsend_dispatch.reset_rate_limits()
+
+    bodies = []
+
+    def fake_send(*, to, body):
+        bodies.append(body)
+        if len(bodies) == 2:
+            raise blibsend_dispatch.BlibsendError("Falha no envio (502)")
+        return {"ok": True}
+
+    monkeypatch.setattr(
+        worker, "dispatch_texts",
+        lambda msgs: blibsend_dispatch.dispatch_texts(msgs, send=fake_send, max_workers=1),
+    )
+
+    rows = [_row(i) for i in range(40)]
+
+    db = _DB()
+    sent = worker.send_messages(db, rows)
+
+    assert 2 <= len(bodies) <= 5
+    # resultado commitado por mensagem
+    assert db.commits == len(bodies)
+    assert all(len(b) <= worker.MESSAGE_MAX_CHARS for b in bodies)
+    assert bodies[0].startswith("📌 Contas a pagar vencidas/pendentes (40) [1/")
+    # nenhuma linha quebrada entre mensagens
+    assert sum(b.count("Empresa: ") for b in bodies) == 40
+
+    # a 2ª mensagem falhou: todas as linhas dela ficam FAILED juntas
+    failed = [r for r in rows if r.status == WppSendStatus.FAILED]
+    assert failed and all(r.tries == 1 and r.next_attempt_at for r in failed)
+    assert sent == 40 - len(failed) == sum(r.status == WppSendStatus.SENT for r in rows)
+    assert len(failed) == bodies[1].count("Empresa: ")
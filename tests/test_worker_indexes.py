@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from sqlalchemy import create_mock_engine, event, inspect
+from sqlalchemy.orm import sessionmaker
+
+from app import worker
+from app.infra.models import Base
+from app.services import outbox
+
+WORKER_TABLES = ("installments", "finance", "outbound_messages")
+
+
+def _worker_statements(engine) -> list:
+    captured = []
+
+    def _capture(conn, cursor, statement, params, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE")):
+            captured.append((statement, params))
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        with sessionmaker(bind=engine)() as db:
+            worker.produce_finance(db, "5583999999999")
+            worker.produce_installments_due_soon(db, "5583999999999")
+            worker.produce_installments_overdue(db, "5583999999999")
+            outbox.claim(db, owner="w1", limit=10)
+            outbox.next_due(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+    return captured
+
+
+def test_worker_scans_use_indexes(fresh_engine):
+    statements = _worker_statements(fresh_engine)
+    assert len(statements) >= 8
+
+    with fresh_engine.connect() as conn:
+        for statement, params in statements:
+            plan = [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, params)]
+            full_scans = [p for p in plan if p.startswith("SCAN") and p.split()[1] in WORKER_TABLES]
+            assert not full_scans, (statement, plan)
+
+
+def test_partial_indexes_on_postgres_and_fallbacks_on_sqlite(fresh_engine):
+    ddl = []
+    pg = create_mock_engine("postgresql+psycopg2://", lambda sql, *a, **kw: ddl.append(str(sql.compile(dialect=pg.dialect))))
+    Base.metadata.create_all(pg, checkfirst=False)
+    ddl = "\n".join(ddl)
+
+    assert "ix_installments_pending_due ON installments (due_date) WHERE status = 'PENDING'" in ddl
+    assert "ix_finance_pending_due ON finance (due_date) WHERE status = 'PENDING'" in ddl
+    assert "ix_outbound_messages_pending ON outbound_messages (next_attempt_at) WHERE status IN" in ddl
+    assert "ix_installments_status_due" not in ddl and "ix_outbound_messages_status_kind" not in ddl
+
+    sqlite_indexes = {ix["name"] for t in WORKER_TABLES for ix in inspect(fresh_engine).get_indexes(t)}
+    assert {"ix_installments_status_due", "ix_finance_status_due", "ix_outbound_messages_status_kind"} <= sqlite_indexes
+    assert not sqlite_indexes & {"ix_installments_pending_due", "ix_finance_pending_due", "ix_outbound_messages_pending"}
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import time
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from app.infra.models import FinanceORM, FinanceStatus, OutboundMessageORM, WppSendStatus
+from app.infra.notify import WakeupListener, wakeup_tables
+
+
+def test_wakeup_ignores_worker_outbox_writes(db_session):
+    f = FinanceORM(company="ACME", amount=Decimal("10"), due_date=date(2026, 1, 1), status=FinanceStatus.PENDING)
+    db_session.add(f)
+    assert wakeup_tables(db_session) == {"finance"}
+    db_session.flush()
+
+    # o próprio worker enfileirando/marcando SENT não pode acordar o worker
+    msg = OutboundMessageORM(
+        kind="finance_due", ref_table="finance", ref_id=f.id, recipient="5583999999999",
+        body="x", status=WppSendStatus.PENDING, tries=0, next_attempt_at=datetime.now(timezone.utc),
+    )
+    db_session.add(msg)
+    assert wakeup_tables(db_session) == set()
+    db_session.flush()
+    msg.status = WppSendStatus.SENT
+    assert wakeup_tables(db_session) == set()
+    db_session.flush()
+
+    # mudança de negócio acorda
+    f.due_date = date(2026, 2, 1)
+    assert wakeup_tables(db_session) == {"finance"}
+
+
+def test_listener_falls_back_to_sleep_outside_postgres(engine):
+    listener = WakeupListener(engine)
+    assert not listener.enabled
+
+    t0 = time.monotonic()
+    assert listener.wait(0.05) == []
+    assert time.monotonic() - t0 >= 0.05
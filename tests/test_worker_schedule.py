@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from app import worker
+from app.infra.models import OutboundMessageORM, WppSendStatus
+
+
+def _schedule(db) -> dict:
+    far = worker.now_utc() + timedelta(days=10)
+    heap = worker.build_schedule(db, offer_hour=9, offers_not_before=far)
+    return {reason: at for at, reason in heap}
+
+
+_ids = iter(range(1, 10_000))
+
+
+def _msg(status: WppSendStatus, at) -> OutboundMessageORM:
+    return OutboundMessageORM(
+        kind="finance_due", ref_table="finance", ref_id=next(_ids), recipient="5583999999999",
+        body="x", status=status, tries=0, next_attempt_at=at,
+    )
+
+
+def test_empty_queue_sleeps_until_midnight(fresh_sessionmaker):
+    with fresh_sessionmaker() as db:
+        events = _schedule(db)
+
+    assert set(events) == {"midnight", "offers"}
+    assert events["midnight"] == worker.next_midnight()
+
+
+def test_next_due_comes_from_retry_and_lease(fresh_sessionmaker):
+    now = worker.now_utc()
+    with fresh_sessionmaker() as db:
+        db.add_all([
+            _msg(WppSendStatus.FAILED, now + timedelta(minutes=20)),
+            _msg(WppSendStatus.FAILED, now + timedelta(minutes=5)),
+            _msg(WppSendStatus.SENT, now - timedelta(days=1)),
+            _msg(WppSendStatus.CANCELED, now - timedelta(days=1)),
+        ])
+        db.commit()
+        assert abs((_schedule(db)["outbound"] - (now + timedelta(minutes=5))).total_seconds()) < 1
+
+        # SENDING cujo lease vence em 1 min volta para a fila
+        db.add(_msg(WppSendStatus.SENDING, now + timedelta(minutes=1)))
+        db.commit()
+        assert abs((_schedule(db)["outbound"] - (now + timedelta(minutes=1))).total_seconds()) < 1
+
+        # mensagem nova: sai agora
+        db.add(_msg(WppSendStatus.PENDING, now))
+        db.commit()
+        assert _schedule(db)["outbound"] <= worker.now_utc()
+
+
+def test_at_most_once_ignores_in_flight_lease(fresh_sessionmaker, monkeypatch):
+    monkeypatch.setenv("WORKER_DELIVERY_MODE", "at_most_once")
+    with fresh_sessionmaker() as db:
+        db.add(_msg(WppSendStatus.SENDING, worker.now_utc()))
+        db.commit()
+        assert "outbound" not in _schedule(db)
+
+
+def test_seconds_until_next_is_clamped():
+    now = worker.now_utc()
+    heap = [(now + timedelta(hours=5), "midnight")]
+    assert worker.seconds_until_next(heap, max_sleep=3600) == (3600, "max_sleep")
+
+    heap = [(now - timedelta(seconds=30), "outbound")]
+    assert worker.seconds_until_next(heap, max_sleep=3600) == (1.0, "outbound")
+
+    sleep_for, reason = worker.seconds_until_next([(now + timedelta(seconds=90), "offers")], max_sleep=3600)
+    assert reason == "offers" and 88 < sleep_for <= 90
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from app.integrations import blibsend_dispatch as dispatch
+
+
+def test_token_bucket_limits_rate_after_burst():
+    bucket = dispatch.TokenBucket(rate_per_second=50, burst=5)
+
+    t0 = time.monotonic()
+    for _ in range(15):
+        bucket.acquire()
+    elapsed = time.monotonic() - t0
+
+    # 5 saem na hora, os outros 10 a 50/s
+    assert 0.17 <= elapsed < 1.0
+
+
+def test_dispatch_texts_runs_concurrently_and_maps_errors(monkeypatch):
+    monkeypatch.setenv("BLIBSEND_RATE_PER_SECOND", "1000")
+    monkeypatch.setenv("BLIBSEND_RATE_BURST", "1000")
+    dispatch.reset_rate_limits()
+
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def fake_send(*, to, body):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        if body == "falha":
+            raise dispatch.BlibsendError("Falha no envio (500)")
+        if body == "rede":
+            raise ConnectionError("reset")
+        return {"ok": True}
+
+    messages = [(i, "5583999999999", "ok") for i in range(8)]
+    messages += [(100, "5583999999999", "falha"), (101, "5583999999999", "rede")]
+
+    results = dict(dispatch.dispatch_texts(messages, send=fake_send, max_workers=5))
+
+    assert peak[0] == 5
+    assert all(results[i] is None for i in range(8))
+    assert isinstance(results[100], dispatch.BlibsendError)
+    # erro de rede vira falha da linha
+    assert isinstance(results[101], dispatch.BlibsendError)
+    assert "reset" in str(results[101])
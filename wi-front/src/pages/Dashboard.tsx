@@ -2,11 +2,7 @@ import { Card, Col, Divider, Row, Statistic, Typography } from "antd";
 import { useMemo } from "react";
 import { useQuery } from "@tanstack/react-query";
 
-import { listClients } from "../services/clients";
-import { listProducts } from "../services/products";
-import { listSales } from "../services/sales";
-import { listPromissories } from "../services/promissories";
-import { listInstallments } from "../services/installments";
+import { getDashboardSummary } from "../services/dashboard";
 
 const { Text } = Typography;
 
@@ -34,105 +30,46 @@ const cardBodyStyle: React.CSSProperties = {
 };
 
 export default function Dashboard() {
-  const clientsQ = useQuery({ queryKey: ["clients"], queryFn: listClients });
-  const productsQ = useQuery({ queryKey: ["products"], queryFn: listProducts });
-  const salesQ = useQuery({ queryKey: ["sales"], queryFn: listSales });
-  const promQ = useQuery({ queryKey: ["promissories"], queryFn: listPromissories });
-  const instQ = useQuery({ queryKey: ["installments"], queryFn: listInstallments });
+  const summaryQ = useQuery({ queryKey: ["dashboard-summary"], queryFn: () => getDashboardSummary() });
 
-  const loading =
-    clientsQ.isLoading ||
-    productsQ.isLoading ||
-    salesQ.isLoading ||
-    promQ.isLoading ||
-    instQ.isLoading;
-
-  const clients = (clientsQ.data ?? []) as any[];
-  const products = (productsQ.data ?? []) as any[];
-
-  const salesRaw = salesQ.data as any;
-  const sales: any[] = useMemo(() => {
-    if (Array.isArray(salesRaw)) return salesRaw;
-    if (salesRaw && typeof salesRaw === "object") {
-      const arr = Object.values(salesRaw).find((v) => Array.isArray(v));
-      if (Array.isArray(arr)) return arr as any[];
-    }
-    return [];
-  }, [salesRaw]);
-
-  const promissories = (promQ.data ?? []) as any[];
-  const installments = (instQ.data ?? []) as any[];
+  const loading = summaryQ.isLoading;
+  const summary = summaryQ.data;
 
   const metrics = useMemo(() => {
-    const clientsTotal = clients.length;
-
-    const productsTotal = products.length;
-    const inStock = products.filter((p) => String(p?.status) === "IN_STOCK").length;
-    const reserved = products.filter((p) => String(p?.status) === "RESERVED").length;
-    const sold = products.filter((p) => String(p?.status) === "SOLD").length;
-
-    const sumStockValue = products
-      .filter((p) => String(p?.status) === "IN_STOCK")
-      .reduce((acc, p) => acc + safeNum(p?.sale_price), 0);
-
-    const salesTotal = sales.length;
-    const salesConfirmed = sales.filter((s) => String(s?.status) === "CONFIRMED").length;
-    const salesDraft = sales.filter((s) => String(s?.status) === "DRAFT").length;
-    const salesCanceled = sales.filter((s) => String(s?.status) === "CANCELED").length;
-
-    const revenueConfirmed = sales
-      .filter((s) => String(s?.status) === "CONFIRMED")
-      .reduce((acc, s) => acc + safeNum(s?.total), 0);
-
-    const discountSum = sales.reduce((acc, s) => acc + safeNum(s?.discount), 0);
-    const entrySum = sales.reduce((acc, s) => acc + safeNum(s?.entry_amount), 0);
-
-    const promTotal = promissories.length;
-    const promDraft = promissories.filter((p) => String(p?.status) === "DRAFT").length;
-    const promIssued = promissories.filter((p) => String(p?.status) === "ISSUED").length;
-    const promPaid = promissories.filter((p) => String(p?.status) === "PAID").length;
-    const promCanceled = promissories.filter((p) => String(p?.status) === "CANCELED").length;
-
-    const instTotal = installments.length;
-    const instPending = installments.filter((i) => String(i?.status) === "PENDING").length;
-    const instPaid = installments.filter((i) => String(i?.status) === "PAID").length;
-    const instCanceled = installments.filter((i) => String(i?.status) === "CANCELED").length;
-
-    const instPendingValue = installments
-      .filter((i) => String(i?.status) === "PENDING")
-      .reduce((acc, i) => acc + safeNum(i?.amount), 0);
-
-    const instPaidValue = installments
-      .filter((i) => String(i?.status) === "PAID")
-      .reduce((acc, i) => acc + safeNum(i?.paid_amount), 0);
+    const products = summary?.products;
+    const sales = summary?.sales;
+    const prom = summary?.promissories;
+    const inst = summary?.installments;
 
     return {
-      clientsTotal,
-      productsTotal,
-      inStock,
-      reserved,
-      sold,
-      sumStockValue,
-      salesTotal,
-      salesConfirmed,
-      salesDraft,
-      salesCanceled,
-      revenueConfirmed,
-      discountSum,
-      entrySum,
-      promTotal,
-      promDraft,
-      promIssued,
-      promPaid,
-      promCanceled,
-      instTotal,
-      instPending,
-      instPaid,
-      instCanceled,
-      instPendingValue,
-      instPaidValue,
+      clientsTotal: summary?.clients_total ?? 0,
+      productsTotal: products?.total ?? 0,
+      inStock: products?.by_status?.IN_STOCK ?? 0,
+      reserved: products?.by_status?.RESERVED ?? 0,
+      sold: products?.by_status?.SOLD ?? 0,
+      sumStockValue: safeNum(products?.stock_value),
+      salesTotal: sales?.total ?? 0,
+      salesConfirmed: sales?.by_status?.CONFIRMED ?? 0,
+      salesDraft: sales?.by_status?.DRAFT ?? 0,
+      salesCanceled: sales?.by_status?.CANCELED ?? 0,
+      revenueConfirmed: safeNum(sales?.revenue_confirmed),
+      discountSum: safeNum(sales?.discount_sum),
+      entrySum: safeNum(sales?.entry_sum),
+      promTotal: prom?.total ?? 0,
+      promDraft: prom?.by_status?.DRAFT ?? 0,
+      promIssued: prom?.by_status?.ISSUED ?? 0,
+      promPaid: prom?.by_status?.PAID ?? 0,
+      promCanceled: prom?.by_status?.CANCELED ?? 0,
+      instTotal: inst?.total ?? 0,
+      instPending: inst?.by_status?.PENDING ?? 0,
+      instPaid: inst?.by_status?.PAID ?? 0,
+      instCanceled: inst?.by_status?.CANCELED ?? 0,
+      instPendingValue: safeNum(inst?.pending_amount),
+      instPaidValue: safeNum(inst?.paid_amount),
+      instOverdueCount: inst?.overdue?.count ?? 0,
+      instOverdueValue: safeNum(inst?.overdue?.amount),
     };
-  }, [clients, products, sales, promissories, installments]);
+  }, [summary]);
 
   return (
     <div
@@ -250,6 +187,14 @@ export default function Dashboard() {
                 <Statistic title="Pago" value={moneyBR(metrics.instPaidValue)} />
               </Col>
             </Row>
+            <Row gutter={12} style={{ marginTop: 8 }}>
+              <Col span={12}>
+                <Statistic title="Vencidas" value={metrics.instOverdueCount} />
+              </Col>
+              <Col span={12}>
+                <Statistic title="Em atraso" value={moneyBR(metrics.instOverdueValue)} />
+              </Col>
+            </Row>
             <div style={{ flex: 1 }} />
           </Card>
         </Col>
@@ -16,17 +16,13 @@ import type { ColumnsType } from "antd/es/table";
 import { useMemo, useState } from "react";
 import { useMutation, useQuery, useQueryClient } from "@tanstack/react-query";
 
-import { listInstallments, payInstallment } from "../services/installments";
-import type { Installment } from "../services/installments";
-
-import { listPromissories } from "../services/promissories";
-import type { Promissory } from "../services/promissories";
-
-import { listClients } from "../services/clients";
-import type { Client } from "../services/clients";
-
-import { listProducts } from "../services/products";
-import type { Product } from "../services/products";
+import { listAllInstallments, payInstallment } from "../services/installments";
+import type {
+  Installment,
+  InstallmentClient,
+  InstallmentProduct,
+  InstallmentPromissory,
+} from "../services/installments";
 
 const STATUS_COLOR: Record<string, any> = {
   // installment
@@ -136,31 +132,37 @@ export default function Installments() {
   const [note, setNote] = useState<string>("");
 
   // base
-  const instQ = useQuery({ queryKey: ["installments"], queryFn: listInstallments });
-
-  const promQ = useQuery({ queryKey: ["promissories"], queryFn: listPromissories });
-  const clientsQ = useQuery({ queryKey: ["clients"], queryFn: listClients });
-  const productsQ = useQuery({ queryKey: ["products"], queryFn: listProducts });
+  // uma requisição: parcelas já com promissória/cliente/produto expandidos
+  const instQ = useQuery({
+    queryKey: ["installments"],
+    queryFn: () => listAllInstallments({ include: "promissory,client,product" }),
+  });
 
   const list = useMemo(() => instQ.data ?? [], [instQ.data]);
 
   const promMap = useMemo(() => {
-    const m = new Map<number, Promissory>();
-    (promQ.data ?? []).forEach((p) => m.set(Number((p as any).id), p));
+    const m = new Map<number, InstallmentPromissory>();
+    list.forEach((it) => {
+      if (it.promissory) m.set(it.promissory.id, it.promissory);
+    });
     return m;
-  }, [promQ.data]);
+  }, [list]);
 
   const clientMap = useMemo(() => {
-    const m = new Map<number, Client>();
-    (clientsQ.data ?? []).forEach((c) => m.set(Number((c as any).id), c));
+    const m = new Map<number, InstallmentClient>();
+    list.forEach((it) => {
+      if (it.client) m.set(it.client.id, it.client);
+    });
     return m;
-  }, [clientsQ.data]);
+  }, [list]);
 
   const productMap = useMemo(() => {
-    const m = new Map<number, Product>();
-    (productsQ.data ?? []).forEach((p) => m.set(Number((p as any).id), p));
+    const m = new Map<number, InstallmentProduct>();
+    list.forEach((it) => {
+      if (it.product) m.set(it.product.id, it.product);
+    });
     return m;
-  }, [productsQ.data]);
+  }, [list]);
 
   // 🔥 agrupa por promissory_id
   const groups = useMemo<GroupRow[]>(() => {
@@ -189,6 +191,9 @@ export default function Installments() {
       g.items.push(it);
       g.total_installments += 1;
 
+      // produto pode vir da venda quando a promissória não tem product_id
+      if (it.product && !g.product_id) g.product_id = it.product.id;
+
       const status = String((it as any).status ?? "");
       if (status === "PENDING") g.pending += 1;
       else if (status === "PAID") g.paid += 1;
@@ -217,7 +222,7 @@ export default function Installments() {
       const prom = promMap.get(g.promissory_id);
       if (prom) {
         g.client_id = (prom as any).client_id ?? undefined;
-        g.product_id = (prom as any).product_id ?? undefined;
+        g.product_id = (prom as any).product_id ?? g.product_id;
         g.promissory_status = (prom as any).status ?? undefined;
       }
     }
@@ -412,7 +417,7 @@ export default function Installments() {
     >
       <Table
         rowKey={(row) => String(row.promissory_id)}
-        loading={instQ.isLoading || promQ.isLoading || clientsQ.isLoading || productsQ.isLoading}
+        loading={instQ.isLoading}
         dataSource={filteredGroups}
         columns={groupColumns}
         pagination={{ pageSize: 10 }}
@@ -230,7 +230,8 @@ export default function Products() {
     >
       <div style={{ display: "grid", gridTemplateColumns: "repeat(auto-fill, minmax(260px, 1fr))", gap: 12 }}>
         {(filtered ?? []).map((p) => {
-          const mainImg = p.images?.[0]?.url ? imgUrl(p.images[0].url) : "";
+          const cover = p.images?.[0];
+          const mainImg = cover?.url ? imgUrl(cover.thumb_url || cover.url) : "";
           const s = String(p.status) as ProductStatus;
 
           return (
@@ -317,7 +318,8 @@ export default function Products() {
                       .map((img) => (
                         <Image
                           key={img.id ?? img.url}
-                          src={imgUrl(img.url)}
+                          src={imgUrl(img.medium_url || img.url)}
+                          preview={{ src: imgUrl(img.url) }}
                           style={{ width: "100%", height: 150, objectFit: "cover", borderRadius: 8 }}
                         />
                       ))}
@@ -0,0 +1,54 @@
+import { api } from "./api";
+
+export type AmountBucket = {
+  count: number;
+  amount: string; // decimal vira string no backend
+};
+
+export type DashboardSummary = {
+  date_from: string | null;
+  date_to: string | null;
+  today: string;
+
+  clients_total: number;
+  products: {
+    total: number;
+    by_status: Record<string, number>;
+    stock_value: string;
+  };
+  sales: {
+    total: number;
+    by_status: Record<string, number>;
+    by_payment_type: Record<string, AmountBucket>;
+    revenue_confirmed: string;
+    discount_sum: string;
+    entry_sum: string;
+  };
+  promissories: {
+    total: number;
+    by_status: Record<string, number>;
+  };
+  installments: {
+    total: number;
+    by_status: Record<string, number>;
+    pending_amount: string;
+    paid_amount: string;
+    overdue: AmountBucket;
+  };
+  // só vem preenchido para ADMIN
+  finance: {
+    pending: AmountBucket;
+    overdue: AmountBucket;
+    paid: AmountBucket;
+  } | null;
+};
+
+export type DashboardRange = {
+  date_from?: string;
+  date_to?: string;
+};
+
+export async function getDashboardSummary(range: DashboardRange = {}): Promise<DashboardSummary> {
+  const { data } = await api.get<DashboardSummary>("/dashboard/summary", { params: range });
+  return data;
+}
@@ -13,13 +13,77 @@ export type Installment = {
   paid_at?: string | null;
   paid_amount?: string | null;
   note?: string | null;
+
+  // só vêm quando pedidos via include=
+  promissory?: InstallmentPromissory | null;
+  client?: InstallmentClient | null;
+  product?: InstallmentProduct | null;
+};
+
+export type InstallmentPromissory = {
+  id: number;
+  public_id: string;
+  status: string;
+  total: string;
+  entry_amount: string;
+  client_id: number;
+  product_id: number | null;
+  sale_id: number | null;
+};
+
+export type InstallmentClient = {
+  id: number;
+  name: string;
+  phone: string;
+  cpf: string | null;
+};
+
+export type InstallmentProduct = {
+  id: number;
+  brand: string;
+  model: string;
+  year: number;
+  plate: string | null;
+  chassi: string;
+  color: string;
+};
+
+export type InstallmentListParams = {
+  promissory_id?: number;
+  client_id?: number;
+  status?: InstallmentStatus;
+  due_from?: string;
+  due_to?: string;
+  overdue?: boolean;
+  include?: string; // "promissory,client,product"
+  order?: "promissory" | "due_date";
+  limit?: number;
+  cursor?: string;
 };
 
-export async function listInstallments(): Promise<Installment[]> {
-  const { data } = await api.get<Installment[]>("/installments");
+export async function listInstallments(params: InstallmentListParams = {}): Promise<Installment[]> {
+  const { data } = await api.get<Installment[]>("/installments", { params });
   return data;
 }
 
+/**
+ * Percorre todas as páginas usando o cursor do header X-Next-Cursor.
+ */
+export async function listAllInstallments(params: InstallmentListParams = {}): Promise<Installment[]> {
+  const all: Installment[] = [];
+  let cursor: string | undefined;
+
+  do {
+    const resp = await api.get<Installment[]>("/installments", {
+      params: { limit: 1000, ...params, cursor },
+    });
+    all.push(...resp.data);
+    cursor = resp.headers["x-next-cursor"] || undefined;
+  } while (cursor);
+
+  return all;
+}
+
 /**
  * POST /installments/{inst_id}/pay
  * Backend espera BODY (JSON). Se mandar vazio => 422 "body field required".
@@ -5,6 +5,8 @@ export type ProductStatus = "IN_STOCK" | "RESERVED" | "SOLD";
 export type ProductImage = {
   id: number;
   url: string;
+  thumb_url?: string | null; // listagem (WebP pequeno)
+  medium_url?: string | null; // detalhe (WebP)
   position: number;
   created_at?: string;
 };